@@ -1,69 +1,24 @@
 import streamlit as st
-import requests
 import re
 import os
 from dotenv import load_dotenv
-from openpyxl import load_workbook
 import pandas as pd
-import time
-
-# Import the extractors
-from extractors import (
-    extract_purchase_order,
-    extract_packing_list,
-    extract_order_confirmation,
-    extract_proforma_invoice,
-    extract_coa,
-    extract_packing_list_f
-)
-from utils import convert_regex_results_to_strings
 
-# Load environment variables
+# Load environment variables first: the modules below read their settings when imported
 load_dotenv()
 
-def extract_items(text, format_type):
-    """
-    Main extraction function that routes to appropriate extractor
-    """
-    data = {}
-    
-    if format_type == "A":  # Purchase Order Terms & Conditions   PO
-        data = extract_purchase_order(text)
-        
-    elif format_type == "B":  # Packing List  Shipping Docs
-        data = extract_packing_list(text)
-    
-    elif format_type == "C":  # Order Confirmation
-        data = extract_order_confirmation(text)
-        
-    elif format_type == "D":  # PROFORMA INVOICE (Excel)
-        data = extract_proforma_invoice(text)
-
-    elif format_type == "E":  # COA
-        data = extract_coa(text)
-
-    elif format_type == "F":  # Packing List
-        data = extract_packing_list_f(text)
-
-    # Convert regex results to strings
-    data = convert_regex_results_to_strings(data)
-    
-    return data
-
-# Load Tika URL from .env
-TIKA_URL = TIKA_URL = os.getenv("TIKA_URL")
-
+import metrics
+from export import FORMATS as EXPORT_FORMATS, MIME_TYPES, export_bytes
+from jobs import PENDING, get_job_queue
+from pipeline import DOCUMENT_TYPES
+from renderer import TABLE_STYLE, cached_tables
+from service_client import LocalExtraction, extraction_backend
+from shipments import ABBREVIATIONS, UNASSIGNED, Shipment, group_documents, overview_rows, shipment_key
+from store import EXTRACTOR_VERSION, get_result_store
+from tika_client import get_tika_client, TikaError
 
-# -------------------
-# Helper to call Tika
-# -------------------
-def extract_text_from_file(file):
-    response = requests.put(
-        TIKA_URL,
-        headers={"Accept": "text/plain"},
-        data=file.read()
-    )
-    return response.text
+# Prometheus /metrics endpoint, when METRICS_PORT is set (started once per process)
+metrics.serve()
 
 # -------------------
 # Streamlit UI
@@ -86,19 +41,109 @@ st.markdown(
 # --- Sidebar for file uploads ---
 
 st.sidebar.header("📁 File Upload")
-st.sidebar.write("Upload your documents by type, then click **Process All**.")
 
-# File uploaders in sidebar
-proforma_invoice_file = st.sidebar.file_uploader("💰 **Proforma Invoice**", type=["pdf", "xlsx"], key="proforma")
-order_confirmation_file = st.sidebar.file_uploader("📝 **Order Confirmation**", type=["pdf"], key="oc")
-purchase_order_file = st.sidebar.file_uploader("📑 **Purchase Order**", type=["pdf"], key="po")
-invoice_file = st.sidebar.file_uploader("📦 **Invoice - Shipping Document**", type=["pdf"], key="invoice")
-coa_file = st.sidebar.file_uploader("📑 **Certificate of Analysis**", type=["pdf"], key="coa")
-packing_list_file = st.sidebar.file_uploader("📦 **Packing List**", type=["pdf"], key="packing_list")
+# One shipment (a document per uploader) or many (every file classified and
+# grouped by PO number, see shipments.py); kept in the URL with the job id
+MODES = ("One shipment", "Many shipments")
+
+
+def remember_mode():
+    st.query_params["mode"] = "many" if st.session_state["mode"] == MODES[1] else "one"
+
+
+mode = st.sidebar.radio(
+    "Mode", MODES, index=1 if st.query_params.get("mode") == "many" else 0,
+    horizontal=True, key="mode", on_change=remember_mode,
+)
+many_shipments = mode == MODES[1]
+
+proforma_invoice_file = order_confirmation_file = purchase_order_file = None
+invoice_file = coa_file = packing_list_file = None
+unsorted_files = bulk_files = []
+if many_shipments:
+    st.sidebar.write("Upload the documents of every shipment together, then click **Process All**.")
+    bulk_files = st.sidebar.file_uploader(
+        "📚 **Shipment documents**", type=["pdf", "xlsx"], accept_multiple_files=True, key="bulk"
+    )
+else:
+    st.sidebar.write("Upload your documents by type, then click **Process All**.")
+    
+    # File uploaders in sidebar
+    proforma_invoice_file = st.sidebar.file_uploader("💰 **Proforma Invoice**", type=["pdf", "xlsx"], key="proforma")
+    order_confirmation_file = st.sidebar.file_uploader("📝 **Order Confirmation**", type=["pdf"], key="oc")
+    purchase_order_file = st.sidebar.file_uploader("📑 **Purchase Order**", type=["pdf"], key="po")
+    invoice_file = st.sidebar.file_uploader("📦 **Invoice - Shipping Document**", type=["pdf"], key="invoice")
+    coa_file = st.sidebar.file_uploader("📑 **Certificate of Analysis**", type=["pdf"], key="coa")
+    packing_list_file = st.sidebar.file_uploader("📦 **Packing List**", type=["pdf"], key="packing_list")
+    unsorted_files = st.sidebar.file_uploader(
+        "🔎 **Any document (format detected)**", type=["pdf", "xlsx"], accept_multiple_files=True, key="unsorted"
+    )
 
 # Process button in sidebar
 process_button = st.sidebar.button("🚀 **Process All**", use_container_width=True)
 
+# Documents go to the extraction service when EXTRACTION_SERVICE_URL is set,
+# otherwise through Tika from this process
+backend = extraction_backend()
+
+# Tika text cache status and reset
+try:
+    tika_client = get_tika_client() if backend is LocalExtraction else None
+except TikaError:
+    tika_client = None
+tika_cache = tika_client.cache if tika_client is not None else None
+
+if tika_cache is not None:
+    with st.sidebar.expander("🗄️ Text cache"):
+        cache_stats = tika_cache.stats()
+        st.caption(
+            f"Hits: {cache_stats['hits']} · Misses: {cache_stats['misses']} · "
+            f"Size: {cache_stats['size_bytes'] / (1024 * 1024):.1f} / "
+            f"{cache_stats['max_bytes'] / (1024 * 1024):.0f} MB"
+        )
+        if st.button("Clear cache", use_container_width=True):
+            tika_cache.clear()
+            st.rerun()
+
+# Tika endpoints, when there are several to balance over
+if tika_client is not None and len(tika_client.pool.nodes) > 1:
+    with st.sidebar.expander("🖥️ Tika nodes"):
+        st.dataframe(pd.DataFrame(tika_client.pool.stats()), hide_index=True, use_container_width=True)
+
+# Earlier extractions kept in the results store (store.py)
+result_store = get_result_store()
+history_query = ""
+if result_store is not None:
+    with st.sidebar.expander("📜 History"):
+        history_query = st.text_input("PO number, order number or product code", key="history").strip()
+
+# Stage latencies recorded by this server process so far
+stage_summary = metrics.summary()
+if stage_summary:
+    with st.sidebar.expander("⏱️ Stage timings"):
+        st.dataframe(
+            pd.DataFrame([
+                {
+                    "Stage": row["stage"], "Format": row.get("format", ""), "Docs": row["count"],
+                    "p50 ms": row["p50"] * 1000, "p99 ms": row["p99"] * 1000,
+                }
+                for row in stage_summary
+            ]),
+            hide_index=True, use_container_width=True,
+        )
+        limited_docs, saved_seconds = metrics.totals(metrics.TEXT_SAVED_SECONDS)
+        full_reads, wasted_seconds = metrics.totals(metrics.TEXT_WASTED_SECONDS)
+        if limited_docs or full_reads:
+            st.caption(
+                f"Page limits: {limited_docs} documents read from their first pages "
+                f"(~{saved_seconds:.1f} s of parsing saved), {full_reads} read in full after all "
+                f"({wasted_seconds:.1f} s spent on the first pages)"
+            )
+        st.download_button(
+            "Prometheus metrics", metrics.render_prometheus(), file_name="metrics.prom",
+            mime="text/plain", use_container_width=True,
+        )
+
 # Add custom CSS for green process button
 st.markdown("""
 <style>
@@ -123,342 +168,33 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+# Results table stylesheet (static/results_table.css), sent once per run
+st.markdown(TABLE_STYLE, unsafe_allow_html=True)
 
-# Define categories
-def get_field_categories():
-    return {
-        "🛒 Order Details": [
-            "Order Number", "Order Type", "Purchase Order Number", "Price / Unit", 
-            "Order Value", "Customer Reference", "Product Description", "Product Code", 
-            "Material Number", "Specification Number", "Net Weight (Kg)","Sold To", "Sold To Code", "Total Value"
-        ],
-        "🚢 Commercial & Shipping Details": [
-            "Currency", "Payment Terms", "Incoterms", "Transport Mode"
-        ],
-        "🏦 Bank Details": [
-            "Bank Name", "Bank Address", "Bank City", "Contact", "Cell Phone", "Email"
-        ],
-        
-    }
 
 def render_categorized_table(results):
-    categories = get_field_categories()
-    
-    # Collect all possible fields across all docs
-    all_fields = set()
-    for data in results.values():
-        all_fields.update(data.keys())
-    
-    # --- Custom CSS for Modern Attractive Look with Expandable Sections ---
-    st.markdown("""
-        <style>
-        .table-container {
-            width: 100%;
-            overflow-x: auto;
-            border-radius: 8px;
-            box-shadow: 0 2px 10px rgba(0,0,0,0.06);
-            margin: 5px 0;
-        }
-        .main-header {
-            background: linear-gradient(135deg, #076e5d 0%, #075649 100%);
-            color: white;
-            padding: 6px;
-            border-radius: 8px;
-            margin: 5px 0;
-            font-weight: bold;
-            font-size: 18px;
-            text-align: center;
-            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-            position: sticky;
-            top: 0;
-            z-index: 100;
-        }
-        .main-header-table {
-            width: 1400px; /* Reduced from 2000px */
-            min-width: 1400px;
-            border-collapse: separate;
-            border-spacing: 0;
-            table-layout: fixed;
-        }
-        .main-header-table th {
-            padding: 4px 2px;
-            border: none;
-            text-align: center;
-            vertical-align: middle;
-            word-wrap: break-word;
-            color: white;
-            font-weight: bold;
-            font-size: 16px; /* Reduced from 20px */
-            line-height: 1.2;
-        }
-        .main-header-table th:first-child {
-            width: 140px; /* Reduced from 200px */
-            text-align: center;
-        }
-        .main-header-table th:not(:first-child) {
-            width: 210px; /* Reduced from 300px */
-        }
-        .category-header {
-            background: linear-gradient(135deg, #28a745 0%, #20c997 100%);
-            color: white;
-            padding: 8px 12px; /* Reduced padding */
-            border-radius: 8px;
-            margin: 8px 0 5px 0;
-            font-weight: bold;
-            font-size: 16px; /* Reduced from 18px */
-            cursor: pointer;
-            transition: all 0.3s ease;
-            box-shadow: 0 2px 8px rgba(0,0,0,0.08);
-        }
-        .category-header:hover {
-            transform: translateY(-1px);
-            box-shadow: 0 3px 12px rgba(0,0,0,0.12);
-        }
-        .data-cell {
-           display: inline-flex;           /* Was: flex */
-            align-items: center;            
-            justify-content: center;        
-            gap: 4px;                       /* Space between text and icon */
-            padding: 4px 8px;
-            border-radius: 12px;
-            min-width: 50px;
-            max-width: 140px;
-            font-size: 14px;
-            background-color: #ffffff;
-            color: #495057;
-            border: 1px solid #dee2e6;
-            box-shadow: 0 1px 3px rgba(0,0,0,0.08);
-            word-break: break-word;
-        }
-        .data-cell .text-content {
-            flex: 1;
-            margin-right: 5px;
-        }
-        .status-icon {
-            display: inline-block;          /* Added this line */
-            vertical-align: middle;         /* Ensures vertical alignment */
-            margin-left: 4px;
-            width: 16px;
-            height: 16px;
-            min-width: 16px;
-            min-height: 16px;
-            max-width: 16px;
-            max-height: 16px;
-        }
-        .field-column {
-            font-weight: bold;
-            padding: 6px 8px; /* Reduced padding */
-            background: linear-gradient(135deg, #f8f9fa 0%, #e9ecef 100%);
-            border-radius: 6px;
-            text-align: left;
-            border-left: 3px solid #007bff;
-            width: 140px; /* Reduced from 200px */
-            font-size: 11px; /* Added smaller font size */
-            line-height: 1.3;
-        }
-        .comparison-table {
-            width: 1350px; /* Reduced from 2000px */
-            min-width: 1350px;
-            border-collapse: separate;
-            border-spacing: 0 4px; /* Reduced from 8px */
-            margin: 8px 0; /* Reduced margin */
-            table-layout: fixed;
-            background: white;
-            border-radius: 8px;
-            overflow: hidden;
-            box-shadow: 0 2px 10px rgba(0,0,0,0.06); # Shadow
-        }
-        .comparison-table th, .comparison-table td {
-            padding: 6px 4px; /* Reduced from 12px 8px */
-            border: none;
-            text-align: center;
-            vertical-align: middle;
-            word-wrap: break-word;
-            overflow: hidden;
-            font-size: 14px; /* Added smaller font size */
-            line-height: 1.2;
-        }
-        .comparison-table th:first-child, .comparison-table td:first-child {
-            width: 130px; /* Reduced from 200px */
-            text-align: center;
-        }
-        .comparison-table th:not(:first-child), .comparison-table td:not(:first-child) {
-            width: 210px; /* Reduced from 300px */
-        }
-        .comparison-table th {
-            background: linear-gradient(90deg, #f8f9fa, #e9ecef);
-            color: #495057;
-            font-weight: bold;
-            border-bottom: 1px solid #dee2e6; /* Reduced from 2px */
-            font-size: 15px; /* Even smaller for headers */
-        }
-        .comparison-table tr:nth-child(even) {
-            background-color: #f8f9fa;
-        }
-        .comparison-table tr:hover {
-            background-color: #e3f2fd;
-            transform: scale(1.002); /* Reduced from 1.005 */
-            transition: all 0.2s ease-in-out;
-            box-shadow: 0 1px 5px rgba(0,0,0,0.08);
-        }
-        .no-data-message {
-            text-align: center;
-            padding: 20px; /* Reduced from 30px */
-            color: #6c757d;
-            font-style: italic;
-            background: linear-gradient(135deg, #f8f9fa 0%, #e9ecef 100%);
-            border-radius: 6px;
-            margin: 8px 0; /* Reduced margin */
-            font-size: 12px; /* Added smaller font size */
-        }
-
-        /* Scrollbar styling */
-        .table-container::-webkit-scrollbar {
-            height: 8px; /* Reduced from 12px */
-        }
-        .table-container::-webkit-scrollbar-track {
-            background: #f1f1f1;
-            border-radius: 4px;
-        }
-        .table-container::-webkit-scrollbar-thumb {
-            background: linear-gradient(90deg, #076e5d, #075649);
-            border-radius: 4px;
-        }
-        .table-container::-webkit-scrollbar-thumb:hover {
-            background: linear-gradient(90deg, #075649, #076e5d);
-        }
-
-        /* Additional compact styling */
-        .stExpander > div > div > div {
-            padding-top: 0.5rem !important;
-            padding-bottom: 0.5rem !important;
-        }
-        </style>
-        """, unsafe_allow_html=True)
-    
-    # Display main header first with scroll container
-    main_header_html = '''
-    <div class="table-container">
-        <div class="main-header">
-            <table class="main-header-table">
-                <tr>
-                    <th>Data Field</th>
-                    <th>💰 Proforma Invoice<br>(PI)</th>
-                    <th>📝 Order Confirmation<br>(OC)</th>
-                    <th>📑 Purchase Order<br>(PO)</th>
-                    <th>📦 Invoice</th>
-                    <th>📑 Certificate of Analysis<br>(COA)</th>
-                    <th>📦 Packing List<br>(PL)</th>
-                </tr>
-            </table>
-        </div>
-    </div>
-    '''
-    st.markdown(main_header_html, unsafe_allow_html=True)
-    
-    # Process each category
-    for category_name, category_fields in categories.items():
-        # Check if this category has any data
-        category_has_data = False
-        category_data = []
-        
-        for field in category_fields:
-            if field in all_fields:
-                category_has_data = True
-                
-                proforma_value = results.get("Proforma Invoice", {}).get(field, "")
-                order_conf_value = results.get("Order Confirmation", {}).get(field, "")
-                purchase_order_value = results.get("Purchase Order", {}).get(field, "")
-                invoice_value = results.get("Invoice - Shipping Document", {}).get(field, "")
-                coa_value = results.get("Certificate of Analysis", {}).get(field, "")
-                packing_list_value = results.get("Packing List", {}).get(field, "")
-                
-                category_data.append({
-                    'field': field,
-                    'proforma': proforma_value,
-                    'order_conf': order_conf_value,
-                    'purchase_order': purchase_order_value,
-                    'invoice': invoice_value,
-                    'coa': coa_value,
-                    'packing_list': packing_list_value
-                })
+    with metrics.stage("render") as timing:
+        header_html, tables = cached_tables(results)
+        st.markdown(header_html, unsafe_allow_html=True)
         
-        # Only show category if it has data - START COLLAPSED (expanded=False)
-        if category_has_data:
+        # One collapsed expander per category that has data
+        for category_name, table_html in tables:
             with st.expander(category_name, expanded=False):
-                if category_data:
-                    # Build HTML table for this category with scroll container
-                    html_content = '<div class="table-container"><table class="comparison-table">'
-                    
-                    for row_data in category_data:
-                        field = row_data['field']
-                        proforma_value = row_data['proforma']
-                        order_conf_value = row_data['order_conf']
-                        purchase_order_value = row_data['purchase_order']
-                        invoice_value = row_data['invoice']
-                        coa_value = row_data['coa']
-                        packing_list_value = row_data['packing_list']
-                        
-                        html_content += f'<tr><td class="field-column">{field}</td>'
-                        
-                        # Helper function to determine cell styling with icons
-                        def get_cell_display(value, reference_value, secondary_reference=None):
-                            # Simple and reliable SVG icons
-                            tick_icon = '''<svg class="status-icon" width="16" height="16" viewBox="0 0 16 16" style="display: inline-block; vertical-align: middle;">
-                                <circle cx="8" cy="8" r="8" fill="#28a745"/>
-                                <polyline points="4.5,8 7,10.5 11.5,6" fill="none" stroke="white" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"/>
-                            </svg>'''
-                            
-                            cross_icon = '''<svg class="status-icon" width="16" height="16" viewBox="0 0 16 16" style="display: inline-block; vertical-align: middle;">
-                                <circle cx="8" cy="8" r="8" fill="#dc3545"/>
-                                <line x1="5" y1="5" x2="11" y2="11" stroke="white" stroke-width="2" stroke-linecap="round"/>
-                                <line x1="11" y1="5" x2="5" y2="11" stroke="white" stroke-width="2" stroke-linecap="round"/>
-                            </svg>'''
-                            
-                            if value:
-                                if reference_value and value == reference_value:
-                                    return f'<div class="data-cell"><span class="text-content">{value}</span>{tick_icon}</div>'
-                                elif not reference_value and secondary_reference and value == secondary_reference:
-                                    return f'<div class="data-cell"><span class="text-content">{value}</span>{tick_icon}</div>'
-                                elif reference_value and value != reference_value:
-                                    return f'<div class="data-cell"><span class="text-content">{value}</span>{cross_icon}</div>'
-                                elif not reference_value and secondary_reference and value != secondary_reference:
-                                    return f'<div class="data-cell"><span class="text-content">{value}</span>{cross_icon}</div>'
-                                else:
-                                    return f'<div class="data-cell"><span class="text-content">{value}</span>{tick_icon}</div>'
-                            else:
-                                return '-'
-                        
-                        # Proforma Invoice column (base reference) - add tick icon
-                        tick_icon = '''<svg class="status-icon" viewBox="0 0 24 24" fill="none" xmlns="http://www.w3.org/2000/svg">
-                            <circle cx="12" cy="12" r="10" fill="#28a745"/>
-                            <path d="M8 12l3 3 5-6" stroke="white" stroke-width="2.5" stroke-linecap="round" stroke-linejoin="round" fill="none"/>
-                        </svg>'''
-                        proforma_display = f'<div class="data-cell"><span class="text-content">{proforma_value}</span>{tick_icon}</div>' if proforma_value else '-'
-                        html_content += f'<td>{proforma_display}</td>'
-                        
-                        # Other columns compared against proforma (or purchase order if proforma is empty)
-                        order_conf_display = get_cell_display(order_conf_value, proforma_value, purchase_order_value)
-                        html_content += f'<td>{order_conf_display}</td>'
-                        
-                        purchase_order_display = get_cell_display(purchase_order_value, proforma_value)
-                        html_content += f'<td>{purchase_order_display}</td>'
-                        
-                        invoice_display = get_cell_display(invoice_value, proforma_value, purchase_order_value)
-                        html_content += f'<td>{invoice_display}</td>'
-                        
-                        coa_display = get_cell_display(coa_value, proforma_value, purchase_order_value)
-                        html_content += f'<td>{coa_display}</td>'
-                        
-                        packing_list_display = get_cell_display(packing_list_value, proforma_value, purchase_order_value)
-                        html_content += f'<td>{packing_list_display}</td>'
-                        
-                        html_content += '</tr>'
-                    
-                    html_content += '</table></div>'
-                    st.markdown(html_content, unsafe_allow_html=True)
-                else:
-                    st.markdown('<div class="no-data-message">No data available for this category</div>', unsafe_allow_html=True)
+                st.markdown(table_html, unsafe_allow_html=True)
+        timing.bytes = len(header_html) + sum(len(table_html) for _, table_html in tables)
+
+
+def export_download(shipments, files, file_stem, key):
+    """Format picker and download button for the results and their field checks (export.py)"""
+    format_column, button_column = st.columns([1, 3])
+    file_format = format_column.selectbox(
+        "Export format", EXPORT_FORMATS, key=f"{key}_format", label_visibility="collapsed"
+    )
+    # The file is only written when the button is clicked, off the script thread
+    button_column.download_button(
+        "⬇️ Export results and checks", lambda: export_bytes(file_format, shipments, files),
+        file_name=f"{file_stem}.{file_format}", mime=MIME_TYPES[file_format], on_click="ignore", key=key,
+    )
 
 st.markdown("""
 <style>
@@ -564,8 +300,44 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+def processing_status_html(progress_percentage, status_text):
+    return f"""
+    <div class="processing-container">
+        <div class="processing-title">Processing Documents</div>
+        <div class="processing-subtitle">Extracting data from your uploaded files<span class="dots"></span></div>
+        <div class="spinner"></div>
+        <div class="progress-container">
+            <div class="progress-bar">
+                <div class="progress-fill" style="width: {progress_percentage}%"></div>
+            </div>
+            <div class="progress-text">{progress_percentage}%</div>
+            <div class="current-file">{status_text}</div>
+        </div>
+    </div>
+    """
+
+# --- Results kept across reruns ---
+# Process All queues the uploads as a background job (jobs.py) and keeps the
+# job id in the page URL, so the script thread never waits on Tika and a
+# browser refresh finds the job again. Each rerun reads the job back into
+# session state; documents extracted by an earlier job reuse that result.
+#   slot_results:  doc_type -> {"digest", "data", "file_name"}
+#   unsorted_results: digest -> (format_type, confidence, data)
+slot_results = st.session_state.setdefault("slot_results", {})
+unsorted_results = st.session_state.setdefault("unsorted_results", {})
+job_queue = get_job_queue()
+JOB_POLL_SECONDS = float(os.getenv("JOB_POLL_SECONDS", "1"))
+
 # --- Process button logic ---
-if process_button:
+if process_button and many_shipments:
+    if not bulk_files:
+        st.error("No documents were uploaded!")
+        st.query_params.pop("job", None)
+    else:
+        # Every file is classified; shipments are formed from the results
+        st.query_params["job"] = job_queue.submit([(None, None, file.name, file) for file in bulk_files])
+        st.query_params["mode"] = "many"
+elif process_button:
     # Count total files to process
     files_to_process = []
     if proforma_invoice_file:
@@ -581,84 +353,198 @@ if process_button:
     if packing_list_file:
         files_to_process.append(("Packing List", packing_list_file, "F"))
     
-    if not files_to_process:
+    if not files_to_process and not unsorted_files:
         st.error("No documents were uploaded!")
+        slot_results.clear()
+        unsorted_results.clear()
+        st.query_params.pop("job", None)
     else:
-        total_files = len(files_to_process)
-        
-        # Create containers for the processing animation
-        processing_container = st.empty()
-        
-        # Show initial processing state
-        processing_html = f"""
-        <div class="processing-container">
-            <div class="processing-title">Processing Documents</div>
-            <div class="processing-subtitle">Extracting data from your uploaded files<span class="dots"></span></div>
-            <div class="spinner"></div>
-            <div class="progress-container">
-                <div class="progress-bar">
-                    <div class="progress-fill" style="width: 0%"></div>
-                </div>
-                <div class="progress-text">0%</div>
-                <div class="current-file">Initializing...</div>
-            </div>
-        </div>
-        """
-        processing_container.markdown(processing_html, unsafe_allow_html=True)
-        
-        # Process files one by one
-        results = {}
-        
-        for i, (doc_type, file, format_type) in enumerate(files_to_process):
-            # Update progress
-            progress_percentage = int((i / total_files) * 100)
-            
-            # Update processing display
-            processing_html = f"""
-            <div class="processing-container">
-                <div class="processing-title">Processing Documents</div>
-                <div class="processing-subtitle">Extracting data from your uploaded files<span class="dots"></span></div>
-                <div class="spinner"></div>
-                <div class="progress-container">
-                    <div class="progress-bar">
-                        <div class="progress-fill" style="width: {progress_percentage}%"></div>
-                    </div>
-                    <div class="progress-text">{progress_percentage}%</div>
-                    <div class="current-file">Processing: {doc_type}...</div>
-                </div>
-            </div>
-            """
-            processing_container.markdown(processing_html, unsafe_allow_html=True)
-            
-            # Add a small delay to make the animation visible
-            import time
-            time.sleep(0.5)
-            
-            # Extract text and process
-            text = extract_text_from_file(file)
-            results[doc_type] = extract_items(text, format_type)
-        
-        # Show completion
-        processing_html = f"""
-        <div class="processing-container">
-            <div class="processing-title">✅ Processing Complete!</div>
-            <div class="processing-subtitle">Successfully extracted data from {total_files} document(s)</div>
-            <div class="progress-container">
-                <div class="progress-bar">
-                    <div class="progress-fill" style="width: 100%"></div>
-                </div>
-                <div class="progress-text">100%</div>
-                <div class="current-file">All documents processed successfully!</div>
-            </div>
-        </div>
-        """
-        processing_container.markdown(processing_html, unsafe_allow_html=True)
-        
-        # Small delay before showing results
-        time.sleep(1)
-        
-        # Clear the processing container and show results
-        processing_container.empty()
-        
-        # Render the results table
-        render_categorized_table(results)
\ No newline at end of file
+        st.query_params["job"] = job_queue.submit(
+            [(doc_type, format_type, file.name, file) for doc_type, file, format_type in files_to_process]
+            # Files from the detect-format uploader are classified first
+            + [(None, None, file.name, file) for file in unsorted_files]
+        )
+
+
+def collect_results(documents):
+    """Fill slot_results and unsorted_results from a job's finished documents"""
+    completed = {}
+    detected = []
+    unsorted_results.clear()
+    for document in documents:
+        slot, status = document["slot"], document["status"]
+        if status == "failed":
+            st.warning(f"{slot or document['file_name']}: {document['error']}")
+            if slot is not None:
+                completed[slot] = {"digest": None, "data": {}, "file_name": document["file_name"]}
+        elif status != "done":
+            continue
+        elif slot is not None:
+            completed[slot] = {"digest": document["digest"], "data": document["result"], "file_name": document["file_name"]}
+        else:
+            unsorted_results[document["digest"]] = (document["format_type"], document["confidence"], document["result"])
+            detected.append(document)
+    
+    # Detected documents fill the slots that have no upload of their own
+    uploaded_slots = {document["slot"] for document in documents}
+    for document in detected:
+        file_name = document["file_name"]
+        doc_type = DOCUMENT_TYPES[document["format_type"]]
+        st.caption(f"🔎 {file_name} → {doc_type} ({document['confidence']:.0%} confidence)")
+        if doc_type in uploaded_slots or doc_type in completed:
+            st.warning(f"{file_name}: detected as {doc_type}, but that slot already has a document")
+        else:
+            completed[doc_type] = {"digest": document["digest"], "data": document["result"], "file_name": file_name}
+    
+    slot_results.clear()
+    slot_results.update(completed)
+
+
+def show_shipments(job_id, counts):
+    """Overview grid of a many-shipments job and the comparison table of the selected shipment"""
+    # Grouping is redone only when more documents have finished
+    key = (job_id, tuple(sorted(counts.items())))
+    cached = st.session_state.get("shipments")
+    if cached is None or cached[0] != key:
+        shipments, unassigned = group_documents(job_queue.get(job_id))
+        cached = st.session_state["shipments"] = (key, shipments, unassigned, overview_rows(shipments))
+    _, shipments, unassigned, rows = cached
+    
+    if unassigned:
+        with st.expander(f"⚠️ Not matched to a shipment: {len(unassigned)}"):
+            st.dataframe(pd.DataFrame(unassigned, columns=["File", "Reason"]), hide_index=True, use_container_width=True)
+    if not shipments:
+        return
+    
+    only_mismatches = st.checkbox("Only shipments with mismatches", key="only_mismatches")
+    visible = [
+        (po_key, row) for po_key, row in zip(shipments, rows)
+        if row["Mismatches"] or not only_mismatches
+    ]
+    st.caption(f"{len(visible)} of {len(shipments)} shipments · select one to compare its documents")
+    export_download(
+        {shipment.po_number: shipment.results for shipment in shipments.values()},
+        {shipment.po_number: shipment.files for shipment in shipments.values()},
+        "shipments", key="export_shipments",
+    )
+    # st.dataframe draws only the rows and columns in view, so the grid stays
+    # responsive with hundreds of shipments
+    grid = st.dataframe(
+        pd.DataFrame([row for _, row in visible], columns=list(rows[0])),
+        hide_index=True, use_container_width=True, key="shipment_grid",
+        on_select="rerun", selection_mode="single-row",
+        column_config={
+            abbreviation: st.column_config.CheckboxColumn(abbreviation, width="small")
+            for abbreviation in ABBREVIATIONS.values()
+        },
+    )
+    selected = grid.selection.rows
+    if not selected or selected[0] >= len(visible):
+        return
+    shipment = shipments[visible[selected[0]][0]]
+    st.markdown(f"#### PO {shipment.po_number}")
+    st.caption(" · ".join(f"{ABBREVIATIONS[doc_type]}: {file_name}" for doc_type, file_name in shipment.files.items()))
+    render_categorized_table(shipment.results)
+
+
+def show_job(job_id, polling):
+    """Progress and results so far of a job; reruns the app once it stops running"""
+    counts = job_queue.counts(job_id)
+    if counts is None:
+        st.warning("These results have expired. Upload the documents and process them again.")
+        slot_results.clear()
+        unsorted_results.clear()
+        return
+    
+    total = sum(counts.values())
+    pending = sum(counts.get(status, 0) for status in PENDING)
+    documents = None if many_shipments else job_queue.get(job_id)
+    if pending:
+        progress_percentage = int((total - pending) / total * 100)
+        if documents is None:
+            status_text = f"{total - pending} of {total} documents done"
+        else:
+            working_on = ", ".join(
+                document["slot"] or document["file_name"] for document in documents if document["status"] in PENDING
+            )
+            status_text = f"Waiting for: {working_on}"
+        st.markdown(processing_status_html(progress_percentage, status_text), unsafe_allow_html=True)
+    elif polling:
+        # Finished since the last poll: rerun the whole app so polling stops
+        st.rerun()
+    
+    if many_shipments:
+        show_shipments(job_id, counts)
+        return
+    
+    collect_results(documents)
+    if not pending and not slot_results:
+        st.error("None of the documents could be processed.")
+    
+    # --- Results table (partial while the job runs) ---
+    if slot_results:
+        results = {doc_type: entry["data"] for doc_type, entry in slot_results.items()}
+        render_categorized_table(results)
+        po_number = next((data["Purchase Order Number"] for data in results.values()
+                          if data.get("Purchase Order Number")), "shipment")
+        export_download(
+            {po_number: results}, {po_number: {doc_type: entry["file_name"] for doc_type, entry in slot_results.items()}},
+            re.sub(r"[^\w-]+", "_", po_number), key="export_shipment",
+        )
+
+
+def show_history(query):
+    """
+    Stored extractions matching a PO number, order number or product code,
+    and per shipment (PO number) the newest of each type compared
+    """
+    extractions = result_store.find(query, query, query)
+    st.markdown(f"#### History: {query}")
+    if not extractions:
+        st.info("No stored extraction matches.")
+        return
+    st.dataframe(
+        pd.DataFrame([
+            {
+                "Extracted": pd.Timestamp(extraction["created"], unit="s").strftime("%Y-%m-%d %H:%M"),
+                "Document": DOCUMENT_TYPES[extraction["format_type"]],
+                "File": extraction["file_name"],
+                "PO Number": extraction["fields"].get("Purchase Order Number"),
+                "Order Number": extraction["fields"].get("Order Number"),
+                "Product Code": extraction["fields"].get("Product Code"),
+                "Source": extraction["source"],
+                "Current extractors": extraction["version"] == EXTRACTOR_VERSION,
+            }
+            for extraction in extractions
+        ]),
+        hide_index=True, use_container_width=True,
+    )
+    # Newest first, so the first of each type in a shipment is its latest extraction
+    shipments = {}
+    for extraction in extractions:
+        po_number = extraction["fields"].get("Purchase Order Number")
+        key = shipment_key(po_number)
+        shipment = shipments.get(key)
+        if shipment is None:
+            shipment = shipments[key] = Shipment(key, po_number or UNASSIGNED)
+        doc_type = DOCUMENT_TYPES[extraction["format_type"]]
+        if doc_type not in shipment.results:
+            shipment.add(doc_type, extraction["file_name"], extraction["fields"])
+    for shipment in shipments.values():
+        st.markdown(f"##### PO {shipment.po_number}" if shipment.key else f"##### {shipment.po_number}")
+        render_categorized_table(shipment.results)
+    export_download(
+        {shipment.po_number: shipment.results for shipment in shipments.values()},
+        {shipment.po_number: shipment.files for shipment in shipments.values()},
+        re.sub(r"[^\w-]+", "_", query), key="export_history",
+    )
+
+
+if history_query:
+    show_history(history_query)
+
+job_id = st.query_params.get("job")
+if job_id:
+    job_counts = job_queue.counts(job_id) or {}
+    polling = any(job_counts.get(status) for status in PENDING)
+    st.fragment(show_job, run_every=JOB_POLL_SECONDS if polling else None)(job_id, polling)
@@ -0,0 +1,280 @@
+"""
+Headless batch extraction
+
+Walks a directory tree (or reads a CSV manifest) of shipment document
+sets, sends every file through Tika and extract_items on a process or
+thread pool, and writes one row per document to CSV or Parquet.
+
+Directory layout: the first folder below the root is used as the shipment
+id. The format letter (A-F) or document type name may appear as a folder
+in a file's path; files without one are classified from their text, e.g.
+
+    shipments/PO4500123456/C/order_confirmation.pdf
+    shipments/PO4500123456/Proforma Invoice/pi.xlsx
+    shipments/PO4500123456/scan_0042.pdf          (classified)
+
+Manifest CSV columns: path[, format][, shipment]; an empty format is
+classified too.
+
+Usage:
+    python batch.py shipments/ -o results.csv --workers 8
+    python batch.py manifest.csv -o results.parquet --executor thread
+    python batch.py shipments/ -o results.csv --metrics batch.prom
+    python batch.py shipments/ -o results.csv --export shipments.xlsx
+
+Every extracted document is also added to the results store (store.py,
+RESULTS_DB). --export writes the results with every shipment's fields checked across
+its documents (reconcile.py), as the app's export button does: .xlsx for
+a Results and a Checks sheet, .csv or .parquet for the checks, one row per
+shipment, field and document with match / mismatch / reference.
+"""
+
+import argparse
+import csv
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+from dotenv import load_dotenv
+
+# Before the modules below, which read their settings when imported
+load_dotenv()
+
+import metrics
+from pipeline import DOCUMENT_TYPES, process_document, process_unsorted_document
+from store import get_result_store
+from streams import content_digest
+from export import export, export_format, write_parquet
+
+DOCUMENT_EXTENSIONS = (".pdf", ".xlsx")
+METADATA_COLUMNS = ["shipment", "path", "digest", "format", "confidence", "document_type", "status", "error", "seconds"]
+
+# Folder names that tag a file with its format
+_FORMAT_TAGS = {letter.lower(): letter for letter in DOCUMENT_TYPES}
+_FORMAT_TAGS.update({name.lower(): letter for letter, name in DOCUMENT_TYPES.items()})
+
+
+def format_from_path(rel_path):
+    for part in reversed(rel_path.split(os.sep)[:-1]):
+        letter = _FORMAT_TAGS.get(part.strip().lower())
+        if letter:
+            return letter
+    return None
+
+
+def discover_directory(root, default_format=None):
+    """
+    Yield (shipment, path, format) for every document below root
+    """
+    for dirpath, _, filenames in os.walk(root):
+        for filename in sorted(filenames):
+            if not filename.lower().endswith(DOCUMENT_EXTENSIONS):
+                continue
+            path = os.path.join(dirpath, filename)
+            rel_path = os.path.relpath(path, root)
+            parts = rel_path.split(os.sep)
+            shipment = parts[0] if len(parts) > 1 else ""
+            yield shipment, path, default_format or format_from_path(rel_path)
+
+
+def discover_manifest(manifest_path, default_format=None):
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    with open(manifest_path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            path = row["path"]
+            if not os.path.isabs(path):
+                path = os.path.join(base_dir, path)
+            format_type = (row.get("format") or default_format or "").strip().upper() or None
+            if format_type and format_type not in DOCUMENT_TYPES:
+                format_type = _FORMAT_TAGS.get(format_type.lower(), format_type)
+            yield row.get("shipment", ""), path, format_type
+
+
+def process_path(shipment, path, format_type):
+    """
+    Run one document through the pipeline and return its output row
+    (runs inside a pool worker)
+    """
+    row = {
+        "shipment": shipment,
+        "path": path,
+        "digest": "",
+        "format": format_type,
+        "confidence": "",
+        "document_type": DOCUMENT_TYPES.get(format_type, ""),
+        "status": "ok",
+        "error": "",
+    }
+    start = time.perf_counter()
+    try:
+        with open(path, "rb") as f:
+            row["digest"] = content_digest(f)
+            if format_type is None:
+                format_type, confidence, data = process_unsorted_document(f)
+                row.update(format=format_type, confidence=round(confidence, 3),
+                           document_type=DOCUMENT_TYPES[format_type])
+            elif format_type in DOCUMENT_TYPES:
+                data = process_document(f, format_type)
+            else:
+                raise ValueError(f"unknown format {format_type!r}")
+        row.update(data)
+    except Exception as e:
+        row["status"] = "failed"
+        row["error"] = f"{type(e).__name__}: {e}"
+    row["seconds"] = round(time.perf_counter() - start, 4)
+    return row
+
+
+def process_path_in_worker(shipment, path, format_type):
+    """
+    process_path in a pool process, returning (row, metrics snapshot) so the
+    parent can add the worker's stage timings to its own
+    """
+    # A worker process runs one task at a time
+    metrics.reset()
+    row = process_path(shipment, path, format_type)
+    return row, metrics.snapshot()
+
+
+def write_rows(rows, output_path):
+    columns = list(METADATA_COLUMNS)
+    for row in rows:
+        for key in row:
+            if key not in columns:
+                columns.append(key)
+
+    if output_path.lower().endswith(".parquet"):
+        write_parquet(output_path, columns, ([row.get(column) for column in columns] for row in rows),
+                      numeric=("confidence", "seconds"))
+    else:
+        with open(output_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=columns)
+            writer.writeheader()
+            writer.writerows(rows)
+
+
+def row_fields(row):
+    """The extracted fields of an output row"""
+    return {key: value for key, value in row.items() if key not in METADATA_COLUMNS}
+
+
+def store_rows(rows, store):
+    """Add the extracted rows to the results store and wait until they are written"""
+    for row in rows:
+        if row["status"] == "ok":
+            confidence = row["confidence"] if row["confidence"] != "" else None
+            store.record(row["digest"], row["format"], row_fields(row), row["path"], confidence, "batch")
+    store.flush()
+
+
+def shipment_results(rows):
+    """
+    ({shipment: {document type: fields}}, {shipment: {document type: path}})
+    for the extracted rows; the first document of a type in a shipment is used
+    """
+    shipments, files = {}, {}
+    for row in rows:
+        if row["status"] != "ok":
+            continue
+        results = shipments.setdefault(row["shipment"], {})
+        if row["document_type"] not in results:
+            results[row["document_type"]] = row_fields(row)
+            files.setdefault(row["shipment"], {})[row["document_type"]] = row["path"]
+    return shipments, files
+
+
+def run_batch(documents, workers, executor="process", progress=None):
+    """
+    Process (shipment, path, format) tuples on a pool and return the rows
+    in input order
+    """
+    in_processes = executor == "process"
+    pool_class = ProcessPoolExecutor if in_processes else ThreadPoolExecutor
+    task = process_path_in_worker if in_processes else process_path
+    documents = list(documents)
+    rows = [None] * len(documents)
+
+    with pool_class(max_workers=workers) as pool:
+        futures = {
+            pool.submit(task, *document): i
+            for i, document in enumerate(documents)
+        }
+        for done_count, future in enumerate(as_completed(futures), start=1):
+            if in_processes:
+                rows[futures[future]], snapshot = future.result()
+                metrics.merge(snapshot)
+            else:
+                rows[futures[future]] = future.result()
+            if progress:
+                progress(done_count, len(documents), rows[futures[future]])
+
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Batch-extract shipment documents without the Streamlit UI",
+        epilog=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("source", help="directory tree of documents or a CSV manifest")
+    parser.add_argument("-o", "--output", default="results.csv", help="output .csv or .parquet file")
+    parser.add_argument("-f", "--format", choices=sorted(DOCUMENT_TYPES), help="format for every file (overrides tags)")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count(), help="pool size")
+    parser.add_argument("--executor", choices=("process", "thread"), default="process")
+    parser.add_argument("--metrics", help="write stage timings here in Prometheus text format")
+    parser.add_argument("--export", help="write the results and field checks here (.xlsx, .csv or .parquet)")
+    args = parser.parse_args(argv)
+
+    if args.export:
+        try:
+            export_file_format = export_format(args.export)
+        except ValueError as e:
+            parser.error(str(e))
+
+    if os.path.isdir(args.source):
+        documents = list(discover_directory(args.source, args.format))
+    else:
+        documents = list(discover_manifest(args.source, args.format))
+
+    if not documents:
+        print(f"No documents found in {args.source}", file=sys.stderr)
+        return 1
+
+    def report(done, total, row):
+        status = "" if row["status"] == "ok" else f"  FAILED {row['error']}"
+        print(f"[{done}/{total}] {row['path']}{status}", file=sys.stderr)
+
+    start = time.perf_counter()
+    rows = run_batch(documents, args.workers, args.executor, progress=report)
+    elapsed = time.perf_counter() - start
+
+    write_rows(rows, args.output)
+    store = get_result_store()
+    if store is not None:
+        store_rows(rows, store)
+    if args.export:
+        export(args.export, export_file_format, *shipment_results(rows))
+
+    if args.metrics:
+        with open(args.metrics, "w", encoding="utf-8") as f:
+            f.write(metrics.render_prometheus())
+        for row in metrics.summary():
+            print(
+                f"  {row['stage']:<8} {row.get('format', ''):<8} n={row['count']:<6} "
+                f"p50={row['p50'] * 1000:.1f}ms p99={row['p99'] * 1000:.1f}ms",
+                file=sys.stderr,
+            )
+
+    failures = sum(1 for row in rows if row["status"] != "ok")
+    print(
+        f"Processed {len(rows)} document(s) in {elapsed:.2f}s "
+        f"({len(rows) / elapsed:.1f} docs/s), {failures} failure(s) -> {args.output}",
+        file=sys.stderr,
+    )
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+"""
+Backend parity check: do the extractors get the same fields from the
+local PDF text layer as from Tika?
+
+Takes the same directory layout as batch.py (format letter or document
+type as a folder in each path) and needs a reachable TIKA_URL.
+
+Usage:
+    python -m benchmarks.backend_parity shipments/ [--show-diffs]
+
+A format is safe to switch to the local backend (TEXT_BACKENDS=X=local)
+when every readable document shows full parity.
+"""
+
+import argparse
+import sys
+import time
+from collections import defaultdict
+
+from dotenv import load_dotenv
+
+from batch import discover_directory
+from pipeline import DOCUMENT_TYPES, extract_items
+from text_backends import BACKENDS
+
+
+def compare_document(path, format_type):
+    with open(path, "rb") as f:
+        data = f.read()
+
+    start = time.perf_counter()
+    tika_text = BACKENDS["tika"].extract(data)
+    tika_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    local_text = BACKENDS["local"].extract(data)
+    local_seconds = time.perf_counter() - start
+
+    if local_text is None:
+        return None, tika_seconds, local_seconds
+
+    tika_fields = extract_items(tika_text, format_type)
+    local_fields = extract_items(local_text, format_type)
+    diffs = {
+        field: (tika_fields.get(field), local_fields.get(field))
+        for field in set(tika_fields) | set(local_fields)
+        if tika_fields.get(field) != local_fields.get(field)
+    }
+    return diffs, tika_seconds, local_seconds
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("source", help="directory tree of tagged documents")
+    parser.add_argument("--show-diffs", action="store_true", help="print every differing field")
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+
+    stats = defaultdict(lambda: {"docs": 0, "local": 0, "parity": 0, "tika_s": 0.0, "local_s": 0.0})
+    for _, path, format_type in discover_directory(args.source):
+        if format_type not in DOCUMENT_TYPES:
+            continue
+        diffs, tika_seconds, local_seconds = compare_document(path, format_type)
+        row = stats[format_type]
+        row["docs"] += 1
+        row["tika_s"] += tika_seconds
+        row["local_s"] += local_seconds
+        if diffs is None:
+            continue
+        row["local"] += 1
+        if not diffs:
+            row["parity"] += 1
+        elif args.show_diffs:
+            print(f"{path}:")
+            for field, (tika_value, local_value) in sorted(diffs.items()):
+                print(f"    {field}: tika={tika_value!r} local={local_value!r}")
+
+    print(f"\n{'Format':<8}{'Docs':>6}{'Local':>7}{'Parity':>8}{'Tika ms/doc':>13}{'Local ms/doc':>14}")
+    all_parity = True
+    for format_type in sorted(stats):
+        row = stats[format_type]
+        all_parity &= row["parity"] == row["local"]
+        print(
+            f"{format_type:<8}{row['docs']:>6}{row['local']:>7}{row['parity']:>8}"
+            f"{row['tika_s'] / row['docs'] * 1000:>13.1f}{row['local_s'] / row['docs'] * 1000:>14.1f}"
+        )
+    return 0 if all_parity else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,178 @@
+"""
+Offline extractor benchmark on the synthetic corpus (no Tika needed)
+
+For every format (A-F) and document size it measures:
+  * the extractor function, under a document budget as extract_items
+    runs it, and as_record (a no-op for the records the specs fill)
+  * every registered pattern on its own (per-field timings, including the
+    document index it searches through)
+  * throughput (documents/s and MB/s of text)
+  * peak traced memory while extracting one document
+
+Results are written to benchmarks/results/<label>.json (label defaults to
+the current git commit) so two runs can be compared:
+
+    python -m benchmarks.bench_extractors
+    python -m benchmarks.bench_extractors --compare benchmarks/results/<old>.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+import tracemalloc
+
+from benchmarks.corpus import SIZES, generate
+from extractors.guard import document_budget
+from extractors.index import document_index
+from extractors.patterns import PATTERNS
+from extractors.records import as_record
+from pipeline import DOCUMENT_TYPES, EXTRACTORS
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+
+def _median_seconds(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def _budgeted(extractor):
+    """The extractor as extract_items runs it, under a document budget"""
+    def run(text):
+        with document_budget():
+            return extractor(text)
+    return run
+
+
+def _search_indexed(pattern, text):
+    with document_budget(), document_index(text):
+        return pattern.search(text)
+
+
+def bench_document(format_type, text, repeat):
+    extractor = _budgeted(EXTRACTORS[format_type])
+
+    extract_s = _median_seconds(lambda: extractor(text), repeat)
+
+    convert_samples = []
+    for _ in range(repeat):
+        data = extractor(text)
+        start = time.perf_counter()
+        as_record(format_type, data)
+        convert_samples.append(time.perf_counter() - start)
+
+    fields = {
+        field: _median_seconds(lambda pattern=pattern: _search_indexed(pattern, text), repeat) * 1e6
+        for field, pattern in PATTERNS[format_type].items()
+    }
+
+    tracemalloc.start()
+    as_record(format_type, extractor(text))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "extract_us": extract_s * 1e6,
+        "convert_us": statistics.median(convert_samples) * 1e6,
+        "fields_us": fields,
+        "peak_kib": peak / 1024,
+        "text_bytes": len(text.encode("utf-8")),
+    }
+
+
+def run(sizes, docs, repeat):
+    results = {}
+    for format_type in DOCUMENT_TYPES:
+        for line_items in sizes:
+            runs = [
+                bench_document(format_type, generate(format_type, line_items, seed), repeat)
+                for seed in range(docs)
+            ]
+            total_s = sum((r["extract_us"] + r["convert_us"]) for r in runs) / 1e6
+            text_mb = sum(r["text_bytes"] for r in runs) / 1e6
+            fields = {
+                field: statistics.mean(r["fields_us"][field] for r in runs)
+                for field in runs[0]["fields_us"]
+            }
+            results[f"{format_type}/{line_items}"] = {
+                "format": format_type,
+                "line_items": line_items,
+                "extract_us": statistics.mean(r["extract_us"] for r in runs),
+                "convert_us": statistics.mean(r["convert_us"] for r in runs),
+                "docs_per_s": len(runs) / total_s,
+                "mb_per_s": text_mb / total_s,
+                "peak_kib": max(r["peak_kib"] for r in runs),
+                "text_bytes": statistics.mean(r["text_bytes"] for r in runs),
+                "fields_us": fields,
+            }
+    return results
+
+
+def git_label():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return time.strftime("%Y%m%d-%H%M%S")
+
+
+def print_report(results, baseline=None, slowest_fields=3):
+    header = f"{'Case':<10}{'KiB':>8}{'extract µs':>13}{'convert µs':>12}{'docs/s':>10}{'MB/s':>8}{'peak KiB':>10}"
+    if baseline:
+        header += f"{'vs base':>10}"
+    print(header)
+    for case, row in results.items():
+        line = (
+            f"{case:<10}{row['text_bytes'] / 1024:>8.1f}{row['extract_us']:>13.1f}{row['convert_us']:>12.1f}"
+            f"{row['docs_per_s']:>10.0f}{row['mb_per_s']:>8.1f}{row['peak_kib']:>10.1f}"
+        )
+        base = (baseline or {}).get(case)
+        if base:
+            line += f"{(row['extract_us'] / base['extract_us'] - 1) * 100:>+9.1f}%"
+        print(line)
+        slowest = sorted(row["fields_us"].items(), key=lambda item: item[1], reverse=True)[:slowest_fields]
+        print("          slowest fields: " + ", ".join(f"{field} {us:.1f}µs" for field, us in slowest))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES), help="line items per document")
+    parser.add_argument("--docs", type=int, default=3, help="documents per format and size")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per document")
+    parser.add_argument("--label", default=None, help="results file name (default: git commit)")
+    parser.add_argument("--compare", default=None, help="earlier results JSON to compare against")
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.docs, args.repeat)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+    print_report(results, baseline)
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    label = args.label or git_label()
+    path = os.path.join(RESULTS_DIR, f"{label}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({
+            "label": label,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "settings": vars(args),
+            "results": results,
+        }, f, indent=2)
+    print(f"\nSaved {path}")
+
+
+if __name__ == "__main__":
+    main()
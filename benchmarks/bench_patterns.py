@@ -0,0 +1,58 @@
+"""
+Micro-benchmark: precompiled pattern registry vs. module-level re.search
+
+Runs every pattern registered for a format against that format's sample
+text three ways:
+
+  * compiled  - PATTERNS[fmt][field].search(text) (what the extractors use)
+  * re-cache  - re.search(pattern_string, text, flags) with re's cache warm
+  * cold      - the same after re.purge(), i.e. what a thrashed cache costs
+
+Usage:
+    python -m benchmarks.bench_patterns [--repeat N]
+"""
+
+import argparse
+import re
+import timeit
+
+from extractors.patterns import PATTERNS
+from benchmarks.samples import SAMPLES
+
+
+def run_compiled(patterns, text):
+    for pattern in patterns:
+        pattern.search(text)
+
+
+def run_re_cache(patterns, text):
+    for pattern in patterns:
+        re.search(pattern.pattern, text, pattern.flags)
+
+
+def run_cold(patterns, text):
+    re.purge()
+    run_re_cache(patterns, text)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=2000, help="documents per measurement")
+    args = parser.parse_args()
+
+    print(f"{'Format':<8}{'Patterns':>9}{'compiled µs':>14}{'re-cache µs':>14}{'cold µs':>12}{'speedup':>10}")
+    for fmt, text in SAMPLES.items():
+        patterns = list(PATTERNS[fmt].values())
+        timings = {}
+        for name, fn in (("compiled", run_compiled), ("re-cache", run_re_cache), ("cold", run_cold)):
+            seconds = min(timeit.repeat(lambda: fn(patterns, text), number=args.repeat, repeat=3))
+            timings[name] = seconds / args.repeat * 1e6
+        speedup = timings["cold"] / timings["compiled"]
+        print(
+            f"{fmt:<8}{len(patterns):>9}{timings['compiled']:>14.1f}{timings['re-cache']:>14.1f}"
+            f"{timings['cold']:>12.1f}{speedup:>9.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
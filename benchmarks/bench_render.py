@@ -0,0 +1,131 @@
+"""
+Results-table renderer benchmark (no Streamlit or Tika needed)
+
+Renders synthetic results with 6 to 600 document columns and measures
+
+  * render_tables(), reconciling the columns (reconcile.py) and building
+    the HTML from scratch
+  * cached_tables() on a cache hit (hashing the results + lookup), which is
+    what a Streamlit rerun with unchanged results pays
+  * the previous in-app renderer, rebuilt here (a per-cell helper and icon
+    strings recreated for every row, html_content grown with +=)
+  * the size of the generated HTML
+
+    python -m benchmarks.bench_render
+    python -m benchmarks.bench_render --columns 6 60 600 --repeat 20
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+import renderer
+from renderer import COLUMNS, FIELD_CATEGORIES, cached_tables, render_tables
+
+DEFAULT_COLUMNS = (6, 60, 150, 300, 600)
+
+
+def make_columns(count):
+    """count columns cycling through the six document types"""
+    columns = []
+    for i in range(count):
+        key, label = COLUMNS[i % len(COLUMNS)]
+        copy = i // len(COLUMNS)
+        columns.append((f"{key} #{copy + 1}" if copy else key, label))
+    return tuple(columns)
+
+
+def make_results(columns, seed=0):
+    """Every field filled for every column, agreeing with the reference most of the time"""
+    rng = random.Random(seed)
+    fields = [field for fields in FIELD_CATEGORIES.values() for field in fields]
+    results = {}
+    for key, _ in columns:
+        results[key] = {
+            field: rng.choice([f"{field} value", f"{field} value", f"{field} other & <more>", None])
+            for field in fields
+        }
+    return results
+
+
+def legacy_render(results, columns):
+    """The renderer as it was inlined in app.py, generalised to N columns"""
+    out = []
+    all_fields = set()
+    for data in results.values():
+        all_fields.update(data.keys())
+    keys = [key for key, _ in columns]
+    for category_fields in FIELD_CATEGORIES.values():
+        html_content = '<div class="table-container"><table class="comparison-table">'
+        for field in category_fields:
+            if field not in all_fields:
+                continue
+            values = [results.get(key, {}).get(field, "") for key in keys]
+            proforma_value, purchase_order_value = values[0], values[2] if len(values) > 2 else ""
+            html_content += f'<tr><td class="field-column">{field}</td>'
+
+            def get_cell_display(value, reference_value, secondary_reference=None):
+                tick_icon = '''<svg class="status-icon" width="16" height="16" viewBox="0 0 16 16" style="display: inline-block; vertical-align: middle;">
+                    <circle cx="8" cy="8" r="8" fill="#28a745"/>
+                    <polyline points="4.5,8 7,10.5 11.5,6" fill="none" stroke="white" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"/>
+                </svg>'''
+                cross_icon = '''<svg class="status-icon" width="16" height="16" viewBox="0 0 16 16" style="display: inline-block; vertical-align: middle;">
+                    <circle cx="8" cy="8" r="8" fill="#dc3545"/>
+                    <line x1="5" y1="5" x2="11" y2="11" stroke="white" stroke-width="2" stroke-linecap="round"/>
+                    <line x1="11" y1="5" x2="5" y2="11" stroke="white" stroke-width="2" stroke-linecap="round"/>
+                </svg>'''
+                if not value:
+                    return '-'
+                basis = reference_value or secondary_reference
+                icon = cross_icon if basis and value != basis else tick_icon
+                return f'<div class="data-cell"><span class="text-content">{value}</span>{icon}</div>'
+
+            for i, value in enumerate(values):
+                html_content += f'<td>{get_cell_display(value, proforma_value, purchase_order_value if i != 2 else None)}</td>'
+            html_content += '</tr>'
+        html_content += '</table></div>'
+        out.append(html_content)
+    return out
+
+
+def _median_us(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1e6
+
+
+def bench(count, repeat):
+    columns = make_columns(count)
+    results = make_results(columns)
+    renderer._cache.clear()
+    cached_tables(results, columns)
+    header, tables = render_tables(results, columns)
+    return {
+        "render_us": _median_us(lambda: render_tables(results, columns), repeat),
+        "cached_us": _median_us(lambda: cached_tables(results, columns), repeat),
+        "legacy_us": _median_us(lambda: legacy_render(results, columns), repeat),
+        "html_kib": (len(header) + sum(len(table) for _, table in tables)) / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--columns", type=int, nargs="+", default=list(DEFAULT_COLUMNS), help="document columns")
+    parser.add_argument("--repeat", type=int, default=10, help="timed runs per case")
+    args = parser.parse_args()
+
+    print(f"{'Columns':>8}{'render µs':>12}{'cached µs':>12}{'legacy µs':>12}{'speed-up':>10}{'HTML KiB':>10}")
+    for count in args.columns:
+        row = bench(count, args.repeat)
+        print(
+            f"{count:>8}{row['render_us']:>12.0f}{row['cached_us']:>12.0f}{row['legacy_us']:>12.0f}"
+            f"{row['legacy_us'] / row['render_us']:>9.1f}x{row['html_kib']:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,294 @@
+"""
+Synthetic Tika-style text corpus for formats A-F
+
+Each generator lays out a document the way Tika returns it for that
+format (same labels, line breaks and tab-separated cells the extractors
+expect), with randomised values, `line_items` item rows and boilerplate
+pages in between. Generation is deterministic for a given seed.
+
+Usage:
+    python -m benchmarks.corpus --out corpus/ --sizes 1 10 100 500
+"""
+
+import argparse
+import os
+import random
+
+SIZES = (1, 10, 100, 500)
+
+_PRODUCTS = [
+    "LINALOOL SYNTH", "CITRAL NATURAL", "VANILLIN CRYSTALS", "BENZYL ACETATE",
+    "GERANIOL EXTRA", "ETHYL MALTOL", "LIMONENE DEXTRO", "HEDIONE HC",
+]
+_CUSTOMERS = ["Multiform Chemicals (Pvt) Ltd", "Multiform Chemicals Lanka", "MCL Trading (Pvt) Ltd"]
+_BANKS = [
+    ("Standard Chartered Bank", "Trade Operations Dept.", "No 65C, Dharmapala Mawatha,", "Colombo 7"),
+    ("Hatton National Bank", "Corporate Banking Unit", "No 479, T B Jayah Mawatha,", "Colombo 10"),
+]
+_BOILERPLATE = [
+    "The supplier shall deliver the goods in accordance with the agreed schedule and quality standards.",
+    "All goods remain the property of the seller until full settlement of the invoice amount.",
+    "Claims regarding quantity or visible defects must be notified in writing within ten days.",
+    "This document is generated electronically and is valid without signature.",
+    "Storage: keep containers tightly closed in a cool, well-ventilated place away from light.",
+]
+
+
+def _fmt_qty(value, decimals=3):
+    return f"{value:,.{decimals}f}"
+
+
+class _Values:
+    """Random but internally consistent values for one shipment"""
+
+    def __init__(self, rng):
+        self.order_number = f"SO-{rng.randint(10000, 99999)}"
+        self.po_number = str(rng.randint(4500000000, 4599999999))
+        self.customer = rng.choice(_CUSTOMERS)
+        self.customer_code = str(rng.randint(100000, 999999))
+        self.material = str(rng.randint(1000000, 9999999))
+        self.spec = str(rng.randint(100000, 999999))
+        self.product = rng.choice(_PRODUCTS)
+        self.code = f"{rng.randint(100000, 999999)}{rng.choice('ABC')}"
+        self.quantity = rng.choice([200, 500, 1000, 2400, 5000]) * 1.0
+        self.price = round(rng.uniform(2, 80), 2)
+        self.value = round(self.quantity * self.price, 2)
+        self.bank = rng.choice(_BANKS)
+        self.contact = rng.choice(["John Perera", "Anne Silva", "Kamal Fernando"])
+        self.email = self.contact.lower().replace(" ", ".") + "@example.com"
+        self.phone = f"+94 77 {rng.randint(100, 999)} {rng.randint(1000, 9999)}"
+
+
+def _boilerplate(rng, lines):
+    return "\n".join(rng.choice(_BOILERPLATE) for _ in range(lines))
+
+
+def _item_quantities(rng, v, line_items):
+    for i in range(line_items):
+        qty = v.quantity if i == 0 else rng.choice([200, 400, 1000]) * 1.0
+        price = v.price if i == 0 else round(rng.uniform(2, 80), 2)
+        yield i, qty, price, qty * price
+
+
+def purchase_order(rng, line_items=1):
+    v = _Values(rng)
+    items = []
+    for i, qty, price, value in _item_quantities(rng, v, line_items):
+        product = v.product if i == 0 else rng.choice(_PRODUCTS)
+        items.append(
+            f"{(i + 1) * 10} {v.material if i == 0 else rng.randint(1000000, 9999999)} {product} GIVAUDAN {v.code}\n"
+            f" {_fmt_qty(qty)} kg {price:.2f} {value:,.2f}"
+        )
+        if i % 20 == 19:
+            items.append(_boilerplate(rng, 25))
+    return f"""PURCHASE ORDER
+Purchase order : {v.po_number}
+Invoice To: {v.customer}
+No 12, Main Street
+Colombo 03
+
+Currency: USD
+Terms of Payment : 60 days from invoice date
+Item Material Description Quantity Price Net value
+{chr(10).join(items)}
+Total net value excl. tax {v.value:,.2f}
+PO against Contract: 46{rng.randint(10000000, 99999999)}
+As per specification number: {v.spec}
+
+{_boilerplate(rng, 30)}
+"""
+
+
+def _bank_block(v, labelled=True):
+    name, dept, street, city = v.bank
+    return ("BANK NAME:\n" if labelled else "") + f"{name}\n{dept}\n{street}\n{city}\nSri Lanka"
+
+
+def shipping_document(rng, line_items=1):
+    v = _Values(rng)
+    items = []
+    for i, qty, price, value in _item_quantities(rng, v, line_items):
+        items.append(f"{qty:.3f} KG {price:.4f} {value:,.2f}")
+        items.append(f"Sales number: {v.product if i == 0 else rng.choice(_PRODUCTS)} {v.code} Tax 0%")
+        items.append(f"Packed: {rng.randint(1, 20)} drums")
+        if i % 20 == 19:
+            items.append(_boilerplate(rng, 25))
+    return f"""INVOICE
+Customer Company {v.customer}
+No 12, Main Street
+Colombo 03
+
+Code: {v.customer_code}
+Incoterms: CIF Colombo
+Payment terms: 60 days net
+O/Order number Shipment date
+{rng.randint(10000, 99999)} / {rng.randint(1, 99)} / 1 {rng.randint(1, 28)} Mar 2025
+Y/Order number
+{v.order_number}. PO {v.po_number}
+{chr(10).join(items)}
+{_bank_block(v)}
+Contact: Attn: {v.contact}
+{v.email}
+Cell Phone: {v.phone}
+Total net weight: {_fmt_qty(v.quantity)} KG
+Amount
+USD
+Sub Total {v.value:,.2f}
+Total Amount USD {v.value:,.2f}
+Mode of transport: Sea
+Material numbers = {v.material}
+Specification number = {v.spec}
+
+{_boilerplate(rng, 30)}
+"""
+
+
+def order_confirmation(rng, line_items=1):
+    v = _Values(rng)
+    items = []
+    for i, qty, price, value in _item_quantities(rng, v, line_items):
+        items.append(f"{(i + 1) * 10} {_fmt_qty(qty)} KG {price:.4f} {value:,.2f}")
+        if i == 0:
+            items.append(f"Sales number: {v.code}\n{v.product}™\nIncoterms: CIF Colombo")
+        if i % 20 == 19:
+            items.append(_boilerplate(rng, 25))
+    return f"""ORDER CONFIRMATION
+Order number: {v.order_number} - PO {v.po_number}
+Customer Company {v.customer}
+No 12, Main Street
+
+Code: {v.customer_code}/01
+Mode of Transport: Sea
+Total Amount USD {v.value:,.2f}
+Payment Terms: 60 days net
+Item Description Qty Price Value
+{chr(10).join(items)}
+Total net weight: {_fmt_qty(v.quantity)} KG
+{_bank_block(v)}
+Attn: {v.contact}
+Email: {v.email}
+Cell Phone: {v.phone}
+
+{_boilerplate(rng, 30)}
+"""
+
+
+def proforma_invoice(rng, line_items=1):
+    v = _Values(rng)
+    header = "\t".join([
+        "Sales Org", "Del Plant", "DG Status", "Product Description", "Form", "Pk Size (KG)",
+        "Product Code", "Net Weight (Kg)", "Sales Currency", "Price / Unit", "Sales Incoterm",
+        "Order Value", "Cust. Reference", "ETA Destination",
+    ])
+    rows = []
+    for i, qty, price, value in _item_quantities(rng, v, line_items):
+        rows.append("\t".join([
+            "SG01", "SG02", "Non DG", v.product if i == 0 else rng.choice(_PRODUCTS), "Liquid", "200",
+            v.code, f"{qty:.0f}", "USD", f"{price:.2f}", "CIF", f"{value:,.2f}", v.po_number, "2025-04-01",
+        ]))
+    name, dept, street, city = v.bank
+    return f"""PROFORMA INVOICE
+Order No {v.order_number} - PO {v.po_number}
+Order Type: Standard Order\tCustomer Ref: {v.po_number}
+Sold To: {v.customer}
+Colombo 03\tTransport Mode: Sea
+Sold To Code {v.customer_code}
+Incoterm: CIF Colombo
+Currency: USD
+Payment: 60 days net
+{header}
+{chr(10).join(rows)}
+Total Value {v.value:,.2f}
+Name: {name}\tPacking List
+Address: {dept} SWIFT SCBLLKLX {street} City: {city}
+Contact: Attn: {v.contact}
+Email: {v.email}
+Cell Phone {v.phone}
+"""
+
+
+def certificate_of_analysis(rng, line_items=1):
+    v = _Values(rng)
+    tests = []
+    for i in range(line_items):
+        tests.append(f"Test {i + 1:03d} Refractive index at 20C 1.4{rng.randint(100, 999)} conforms")
+        if i % 20 == 19:
+            tests.append(_boilerplate(rng, 25))
+    return f"""Certificate of Analysis {v.code} {v.product} Order Information
+Customer Reference {v.order_number} - PO {v.po_number}
+Material number = {v.material}
+Specification number = {v.spec}
+Quantity {_fmt_qty(v.quantity)} KG
+{chr(10).join(tests)}
+
+{_boilerplate(rng, 30)}
+"""
+
+
+def packing_list(rng, line_items=1):
+    v = _Values(rng)
+    packages = []
+    for i in range(line_items):
+        packages.append(f"Drum {i + 1:04d} Batch {rng.randint(100000, 999999)} Gross 230.000 KG Tare 30.000 KG")
+        if i % 20 == 19:
+            packages.append(_boilerplate(rng, 25))
+    return f"""PACKING LIST
+Consignee: Code: {v.customer_code}
+Company {v.customer}
+Customer Ref.: {v.order_number} - PO {v.po_number}
+Incoterms: CIF Colombo
+Mode of transport: Sea Import licence: N/A
+{chr(10).join(packages)}
+Total: {max(line_items, 1)} Packages {_fmt_qty(v.quantity)}
+
+{_boilerplate(rng, 30)}
+"""
+
+
+GENERATORS = {
+    "A": purchase_order,
+    "B": shipping_document,
+    "C": order_confirmation,
+    "D": proforma_invoice,
+    "E": certificate_of_analysis,
+    "F": packing_list,
+}
+
+
+def generate(format_type, line_items=1, seed=0):
+    """Return one synthetic document of the given format"""
+    rng = random.Random(f"{format_type}-{line_items}-{seed}")
+    return GENERATORS[format_type](rng, line_items)
+
+
+def generate_corpus(sizes=SIZES, docs_per_size=5, seed=0):
+    """
+    Yield (format, line_items, text) for every format and size
+    """
+    for format_type in GENERATORS:
+        for line_items in sizes:
+            for i in range(docs_per_size):
+                yield format_type, line_items, generate(format_type, line_items, seed + i)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", default="corpus", help="output directory (one folder per format)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES), help="line items per document")
+    parser.add_argument("--docs", type=int, default=5, help="documents per format and size")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    count = 0
+    for format_type, line_items, text in generate_corpus(args.sizes, args.docs, args.seed):
+        folder = os.path.join(args.out, format_type)
+        os.makedirs(folder, exist_ok=True)
+        path = os.path.join(folder, f"{line_items:04d}_items_{count:05d}.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        count += 1
+    print(f"Wrote {count} documents to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+Fuzz harness: find worst-case inputs for every registered pattern
+
+For each pattern it times a family of adversarial inputs at growing sizes
+and estimates how the cost grows (1.0 = linear, 2.0 = quadratic):
+
+  * runs of the characters the pattern's classes accept ("1111", "a a a",
+    blank lines, digit/space mixes ...)
+  * the pattern's leading label repeated many times with no valid value
+    after it (e.g. "Customer Customer ..." or "BANK NAME:\\n" x N)
+  * random mutations of a synthetic corpus document, hill-climbed towards
+    whichever input makes the pattern slowest
+
+Searches run on the raw compiled regex (not the guard) under a hard
+per-call timer, so a runaway pattern shows up as a timeout instead of a hang.
+
+Usage:
+    python -m benchmarks.fuzz_patterns [--format B] [--field "Sold To"] [--save-dir worst/]
+"""
+
+import argparse
+import math
+import os
+import random
+import re
+import signal
+import time
+
+from benchmarks.corpus import generate
+from extractors.patterns import PATTERNS
+
+SIZES = (1_000, 2_000, 4_000, 8_000)
+TIMEOUT = 1.0
+
+_RUNS = ["1", "a", " ", "\n", " \n", "1 ", "1\n", "1,", "1.", "a.", "a@", "-", "\t", "A1-", "\n\n "]
+
+
+class _Timeout(Exception):
+    pass
+
+
+def _on_alarm(signum, frame):
+    raise _Timeout()
+
+
+def time_search(regex, text):
+    """Seconds for one search, or None when it hits TIMEOUT"""
+    signal.setitimer(signal.ITIMER_REAL, TIMEOUT)
+    start = time.perf_counter()
+    try:
+        regex.search(text)
+        return time.perf_counter() - start
+    except _Timeout:
+        return None
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+def leading_label(pattern):
+    """Literal text the pattern starts with (e.g. 'Customer' or 'BANK NAME:')"""
+    match = re.match(r"(?:\\[^\w]|[^\\.^$*+?()\[\]{}|])+", pattern)
+    if not match:
+        return ""
+    return re.sub(r"\\(.)", r"\1", match.group(0)).strip()
+
+
+def input_families(regex):
+    label = leading_label(regex.pattern)
+    families = {f"run {run!r}": (lambda n, run=run: (run * n)[:n]) for run in _RUNS}
+    if label:
+        families[f"label {label!r} x N"] = lambda n, label=label: ((label + " ") * n)[:n]
+        families[f"label {label!r} + lines"] = lambda n, label=label: ((label + "\n1 a\n") * n)[:n]
+        families[f"label {label!r} + run"] = lambda n, label=label: label + " " + ("1 a " * n)[:n]
+    return families
+
+
+def growth(timings):
+    """Log-log slope between the smallest and largest size"""
+    (n0, t0), (n1, t1) = timings[0], timings[-1]
+    if t0 is None or t1 is None:
+        return math.inf
+    return math.log(max(t1, 1e-7) / max(t0, 1e-7)) / math.log(n1 / n0)
+
+
+def measure(regex, make_input):
+    return [(n, time_search(regex, make_input(n))) for n in SIZES]
+
+
+def _mutate(rng, text):
+    lines = text.split("\n")
+    op = rng.randrange(4)
+    i = rng.randrange(len(lines))
+    if op == 0:
+        lines.insert(i, lines[rng.randrange(len(lines))])
+    elif op == 1 and len(lines) > 1:
+        del lines[i]
+    elif op == 2:
+        lines[i] += rng.choice(_RUNS) * rng.randint(10, 200)
+    else:
+        lines[i] = lines[i].replace(" ", rng.choice(["", "  ", "\n", "\t"]))
+    return "\n".join(lines)
+
+
+def hill_climb(regex, format_type, iterations, rng):
+    """Mutate a corpus document towards the slowest input for this pattern"""
+    best = generate(format_type, 10, rng.randrange(1000))[:SIZES[-1]]
+    best_time = time_search(regex, best) or TIMEOUT
+    for _ in range(iterations):
+        candidate = _mutate(rng, best)[:SIZES[-1]]
+        elapsed = time_search(regex, candidate)
+        if elapsed is None:
+            return candidate, None
+        if elapsed > best_time:
+            best, best_time = candidate, elapsed
+    return best, best_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--format", choices=sorted(PATTERNS), help="only this format")
+    parser.add_argument("--field", help="only this field")
+    parser.add_argument("--iterations", type=int, default=200, help="hill-climb mutations per pattern")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save-dir", help="write each pattern's worst input here")
+    args = parser.parse_args()
+
+    signal.signal(signal.SIGALRM, _on_alarm)
+    rng = random.Random(args.seed)
+
+    print(f"{'Pattern':<34}{'growth':>8}{'worst ms @8k':>14}  worst input")
+    flagged = 0
+    for format_type, fields in PATTERNS.items():
+        if args.format and format_type != args.format:
+            continue
+        for field, guarded in fields.items():
+            if args.field and field != args.field:
+                continue
+            regex = guarded.regex
+            worst = ("", -1.0, 0.0, "")
+            for name, make_input in input_families(regex).items():
+                timings = measure(regex, make_input)
+                slope = growth(timings)
+                last = timings[-1][1]
+                if slope > worst[1] or (slope == worst[1] and (last or TIMEOUT) > worst[2]):
+                    worst = (name, slope, last if last is not None else math.inf, make_input(SIZES[-1]))
+
+            text, elapsed = hill_climb(regex, format_type, args.iterations, rng)
+            if elapsed is None or elapsed > worst[2]:
+                worst = ("mutated corpus document", worst[1] if elapsed else math.inf,
+                         elapsed if elapsed is not None else math.inf, text)
+
+            name, slope, last, text = worst
+            marker = "  <-- super-linear" if slope > 1.5 else ""
+            flagged += bool(marker)
+            last_ms = "timeout" if math.isinf(last) else f"{last * 1000:.2f}"
+            print(f"{format_type + '/' + field:<34}{slope:>8.2f}{last_ms:>14}  {name}{marker}")
+
+            if args.save_dir:
+                os.makedirs(args.save_dir, exist_ok=True)
+                safe = re.sub(r"[^\w]+", "_", f"{format_type}_{field}").strip("_")
+                with open(os.path.join(args.save_dir, safe + ".txt"), "w", encoding="utf-8") as f:
+                    f.write(text)
+
+    print(f"\n{flagged} pattern(s) grow faster than linear on their worst input")
+
+
+if __name__ == "__main__":
+    main()
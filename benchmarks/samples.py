@@ -0,0 +1,121 @@
+"""
+Representative Tika text output for each document format (A-F)
+"""
+
+PURCHASE_ORDER = """PURCHASE ORDER
+Purchase order : 4500123456
+Invoice To: Multiform Chemicals (Pvt) Ltd
+No 12, Main Street
+Colombo 03
+
+Currency: USD
+Terms of Payment : 60 days from invoice date
+Item Material Description Quantity Price Net value
+10 1002345 LINALOOL SYNTH GIVAUDAN 610192A
+ 1,000.000 kg 12.50 12,500.00
+Total net value excl. tax 12,500.00
+PO against Contract: 4600001234
+As per specification number: 123456
+"""
+
+SHIPPING_DOCUMENT = """INVOICE
+Customer Company Multiform Chemicals (Pvt) Ltd
+No 12, Main Street
+Colombo 03
+
+Code: 100234
+Incoterms: CIF Colombo
+Payment terms: 60 days net
+O/Order number Shipment date
+12345 / 10 / 1 12 Mar 2025
+Y/Order number
+SO-99887. PO 4500123456
+1000.000 KG 12.5000 12,500.00
+Sales number: LINALOOL SYNTH 610192A Tax 0%
+Packed: 4 drums
+BANK NAME:
+Standard Chartered Bank
+Trade Operations Dept.
+No 65C, Dharmapala Mawatha,
+Colombo 7
+Contact: Attn: John Perera
+john.perera@example.com
+Cell Phone: +94 77 123 4567
+Total net weight: 1,000.000 KG
+Amount
+USD
+Sub Total 12,500.00
+Total Amount USD 12,500.00
+Mode of transport: Sea
+Material numbers = 1002345
+Specification number = 123456
+"""
+
+ORDER_CONFIRMATION = """ORDER CONFIRMATION
+Order number: SO-99887 - PO 4500123456
+Customer Company Multiform Chemicals (Pvt) Ltd
+No 12, Main Street
+
+Code: 100234/01
+Mode of Transport: Sea
+Total Amount USD 12,500.00
+Payment Terms: 60 days net
+Item Description Qty Price Value
+10 1,000.000 KG 12.5000 12,500.00
+Sales number: 610192A
+LINALOOL SYNTH™
+Incoterms: CIF Colombo
+Total net weight: 1,000.000 KG
+BANK NAME:
+Standard Chartered Bank
+Trade Operations Dept.
+No 65C, Dharmapala Mawatha,
+Colombo 7
+Attn: John Perera
+Email: john.perera@example.com
+Cell Phone: +94 77 123 4567
+"""
+
+PROFORMA_INVOICE = """PROFORMA INVOICE
+Order No SO-99887 - PO 4500123456
+Order Type: Standard Order\tCustomer Ref: 4500123456
+Sold To: Multiform Chemicals (Pvt) Ltd
+Colombo 03\tTransport Mode: Sea
+Sold To Code 100234
+Incoterm: CIF Colombo
+Currency: USD
+Payment: 60 days net
+Sales Org\tDel Plant\tDG Status\tProduct Description\tForm\tPk Size (KG)\tProduct Code\tNet Weight (Kg)\tSales Currency\tPrice / Unit\tSales Incoterm\tOrder Value\tCust. Reference\tETA Destination
+SG01\tSG02\tNon DG\tLINALOOL SYNTH\tLiquid\t200\t610192A\t1000\tUSD\t12.50\tCIF\t12,500.00\t4500123456\t2025-04-01
+Total Value 12,500.00
+Name: Standard Chartered Bank\tPacking List
+Address: Trade Operations Dept. SWIFT SCBLLKLX No 65C, Dharmapala Mawatha , City: Colombo 7
+Contact: Attn: John Perera
+Email: john.perera@example.com
+Cell Phone +94 77 123 4567
+"""
+
+CERTIFICATE_OF_ANALYSIS = """Certificate of Analysis 610192A LINALOOL SYNTH Order Information
+Customer Reference SO-99887 - PO 4500123456
+Material number = 1002345
+Specification number = 123456
+Quantity 1,000.000 KG
+"""
+
+PACKING_LIST = """PACKING LIST
+Consignee: Code: 100234
+Company Multiform Chemicals (Pvt) Ltd
+Customer Ref.: SO-99887 - PO 4500123456
+Incoterms: CIF Colombo
+Mode of transport: Sea Import licence: N/A
+Total: 4 Packages 1,000.000
+"""
+
+SAMPLES = {
+    "A": PURCHASE_ORDER,
+    "B": SHIPPING_DOCUMENT,
+    "C": ORDER_CONFIRMATION,
+    "D": PROFORMA_INVOICE,
+    "E": CERTIFICATE_OF_ANALYSIS,
+    "F": PACKING_LIST,
+}
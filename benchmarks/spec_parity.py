@@ -0,0 +1,95 @@
+"""
+Field-spec parity check (no Tika needed)
+
+Runs every format's field specs two ways and reports any document where
+they disagree:
+
+  * as the extractors run them: guarded patterns searched through the
+    shared DocumentIndex (see extractors/index.py), under a document budget
+    (documents that run over it are counted and skipped)
+  * the same rules compiled over the raw compiled regexes, each pattern a
+    plain search() from offset 0
+
+on the synthetic corpus, the benchmark samples and randomly mutated
+copies of them (lines duplicated, dropped, padded with character runs or
+re-spaced). --index-all also indexes short documents, so the index is
+exercised on every case.
+
+    python -m benchmarks.spec_parity
+    python -m benchmarks.spec_parity --mutations 2000 --index-all
+"""
+
+import argparse
+import random
+
+from benchmarks.corpus import SIZES, generate
+from benchmarks.fuzz_patterns import _mutate
+from benchmarks.samples import SAMPLES
+from extractors import index, spec
+from extractors.fields import FIELDS, SPECS
+from extractors.guard import document_budget
+from extractors.patterns import PATTERNS
+
+
+def plain_specs():
+    """The field specs compiled over the unguarded, unindexed regexes"""
+    return {
+        format_type: spec.compile_spec(
+            format_type, fields, {name: pattern.regex for name, pattern in PATTERNS[format_type].items()}
+        )
+        for format_type, fields in FIELDS.items()
+    }
+
+
+def documents(format_type, mutations, rng):
+    yield from SAMPLES.values()
+    for line_items in SIZES:
+        yield generate(format_type, line_items)
+    seeds = [SAMPLES[format_type], generate(format_type, 3, seed=1), generate(format_type, 60, seed=2)]
+    for _ in range(mutations):
+        text = rng.choice(seeds)
+        for _ in range(rng.randint(1, 6)):
+            text = _mutate(rng, text)
+        yield text
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mutations", type=int, default=300, help="mutated documents per format")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--index-all", action="store_true", help="index documents of any length")
+    args = parser.parse_args()
+
+    if args.index_all:
+        index.INDEX_MIN_CHARS = spec.INDEX_MIN_CHARS = 0
+
+    plain = plain_specs()
+    rng = random.Random(args.seed)
+    failures = 0
+    for format_type in FIELDS:
+        checked = timed_out = 0
+        for text in documents(format_type, args.mutations, rng):
+            with document_budget() as budget:
+                found = list(SPECS[format_type].extract(text).items())
+            if budget.timeouts:
+                # Over budget the guard reports fields as missing; nothing to compare
+                timed_out += 1
+                continue
+            expected = list(plain[format_type].extract(text).items())
+            checked += 1
+            if found != expected:
+                failures += 1
+                plain_data, indexed_data = dict(expected), dict(found)
+                diff = {
+                    key: (plain_data.get(key), indexed_data.get(key))
+                    for key in plain_data.keys() | indexed_data.keys()
+                    if plain_data.get(key) != indexed_data.get(key)
+                }
+                print(f"{format_type}: {len(text)} chars, (plain, indexed) differ: {diff or 'key order'}")
+        print(f"{format_type}: {checked} documents checked, {timed_out} over the regex budget")
+    print(f"\n{failures} mismatches")
+    raise SystemExit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
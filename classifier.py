@@ -0,0 +1,111 @@
+"""
+Document-format classifier
+
+Picks the format letter (A-F) for a document from the first few KB of its
+text, using the labels the extractors themselves rely on. Each anchor found
+adds its weight to its format; the best-scoring format wins and the
+confidence is its share of all the weight found, so a document carrying
+anchors of one format only scores 1.0.
+
+Only substring checks on a lower-cased head of the text are involved. The
+first 2 KB settle most documents (their header carries the strongest
+anchors); the head is widened only when they do not, so a document costs
+tens of microseconds.
+"""
+
+import os
+
+# Heads of the text looked at in turn, until one settles the format
+HEADS = (2048, 8192)
+
+# Anchor weight that settles a document without looking further
+DECISIVE_SCORE = 5.0
+
+# Below this confidence (or with no anchors at all) the format is reported as unknown
+MIN_CONFIDENCE = float(os.getenv("CLASSIFIER_MIN_CONFIDENCE", "0.6"))
+
+# (anchor, weight) per format; anchors shared by several formats are left out
+ANCHORS = {
+    # Purchase Order
+    "A": [
+        ("purchase order :", 3.0),
+        ("terms of payment", 2.0),
+        ("invoice to:", 2.0),
+        ("total net value excl. tax", 2.0),
+        ("po against contract", 1.5),
+        ("as per specification number", 1.5),
+    ],
+    # Invoice - Shipping Document
+    "B": [
+        ("o/order number", 3.0),
+        ("y/order number", 3.0),
+        ("shipment date", 1.5),
+        ("packed:", 1.5),
+        ("material numbers", 1.5),
+        ("sub total", 1.0),
+    ],
+    # Order Confirmation
+    "C": [
+        ("order confirmation", 3.0),
+        ("order number:", 1.5),
+        ("mode of transport:", 1.0),
+        ("total amount usd", 0.5),
+    ],
+    # Proforma Invoice
+    "D": [
+        ("proforma invoice", 3.0),
+        ("eta destination", 3.0),
+        ("sold to code", 2.0),
+        ("order type:", 1.5),
+        ("cust. reference", 1.5),
+        ("transport mode:", 1.0),
+    ],
+    # Certificate of Analysis
+    "E": [
+        ("certificate of analysis", 4.0),
+        ("order information", 2.0),
+        ("customer reference", 1.5),
+    ],
+    # Packing List
+    "F": [
+        ("packing list", 2.0),
+        ("consignee:", 2.5),
+        ("customer ref.:", 2.0),
+        ("import licence", 1.5),
+        ("packages", 1.0),
+    ],
+}
+
+
+def scores(text, head_chars=HEADS[-1]):
+    """Summed anchor weight per format for the head of the text"""
+    head = text[:head_chars].lower()
+    return {
+        format_type: sum(weight for anchor, weight in anchors if anchor in head)
+        for format_type, anchors in ANCHORS.items()
+    }
+
+
+def classify(text, min_confidence=None):
+    """
+    Return (format_type, confidence); format_type is None when no format
+    reaches min_confidence (default CLASSIFIER_MIN_CONFIDENCE)
+    """
+    text = text or ""
+    if min_confidence is None:
+        min_confidence = MIN_CONFIDENCE
+    best, confidence = None, 0.0
+    for head_chars in HEADS:
+        found = scores(text, head_chars)
+        total = sum(found.values())
+        if not total:
+            continue
+        best = max(found, key=found.get)
+        confidence = found[best] / total
+        if found[best] >= DECISIVE_SCORE and confidence >= min_confidence:
+            break
+        if head_chars >= len(text):
+            break
+    if best is None or confidence < min_confidence:
+        return None, confidence
+    return best, confidence
@@ -0,0 +1,190 @@
+"""
+Export of extraction results and their field checks
+
+Shipments given as {shipment: {document type: record}} are written as
+
+  xlsx      a "Results" sheet, one row per document (shipment, document
+            type, file name and its fields), and a "Checks" sheet, one row
+            per shipment, field and document with the value, its
+            normalised form and its status (reconcile.py)
+  csv       the Checks table
+  parquet   the Checks table, in row groups of EXPORT_ROW_GROUP_ROWS rows
+            (needs pyarrow)
+
+Rows are generated while they are written and every writer streams them
+(openpyxl's write-only mode keeps finished rows in a temp file), so the
+memory an export takes does not grow with its row count beyond the
+results themselves.
+"""
+
+import contextlib
+import csv
+import importlib.util
+import io
+import itertools
+import os
+from decimal import Decimal
+
+from reconcile import reconcile
+from renderer import COLUMNS
+
+ROW_GROUP_ROWS = int(os.getenv("EXPORT_ROW_GROUP_ROWS", "10000"))
+
+PARQUET = importlib.util.find_spec("pyarrow") is not None
+FORMATS = ("xlsx", "csv", "parquet") if PARQUET else ("xlsx", "csv")
+MIME_TYPES = {
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+CHECK_COLUMNS = ["Shipment", "Field", "Document", "Value", "Normalized", "Status"]
+
+# Documents in the comparison table's column order
+DOCUMENTS = [key for key, _ in COLUMNS]
+
+
+# -------------------
+# Tables: (columns, row iterator)
+# -------------------
+def result_table(shipments, files=None):
+    """One row per document: shipment, document type, file name, then every field any document has"""
+    files = files or {}
+    fields = {}
+    for results in shipments.values():
+        for data in results.values():
+            fields.update(dict.fromkeys(data))
+    columns = ["Shipment", "Document", "File", *fields]
+
+    def rows():
+        for shipment, results in shipments.items():
+            names = files.get(shipment, {})
+            for doc_type, data in sorted(results.items(), key=lambda item: _document_order(item[0])):
+                yield [shipment, doc_type, names.get(doc_type), *(data.get(field) for field in fields)]
+
+    return columns, rows()
+
+
+def _document_order(doc_type):
+    return DOCUMENTS.index(doc_type) if doc_type in DOCUMENTS else len(DOCUMENTS)
+
+
+def check_table(reconciliation):
+    """One row per filled cell of a reconcile.Reconciliation"""
+    return CHECK_COLUMNS, reconciliation.cells()
+
+
+# -------------------
+# Writers (target: a path or a binary file)
+# -------------------
+@contextlib.contextmanager
+def _binary(target):
+    """A path opened for writing, or a binary file passed through"""
+    if isinstance(target, (str, os.PathLike)):
+        with open(target, "wb") as f:
+            yield f
+    else:
+        yield target
+
+
+def _text(value):
+    """A value as CSV / Parquet text (Decimals as their plain digits)"""
+    if value is None:
+        return None
+    return value if isinstance(value, str) else str(value)
+
+
+def write_csv(target, columns, rows):
+    with _binary(target) as out:
+        text = io.TextIOWrapper(out, encoding="utf-8", newline="", write_through=True)
+        try:
+            writer = csv.writer(text)
+            writer.writerow(columns)
+            writer.writerows([_text(value) for value in row] for row in rows)
+        finally:
+            text.detach()
+
+
+def write_xlsx(target, sheets):
+    """sheets: [(sheet name, columns, rows)]"""
+    from openpyxl import Workbook
+    from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+
+    def cell(value):
+        if isinstance(value, str):
+            # Control characters from PDF text are not allowed in the XML
+            return ILLEGAL_CHARACTERS_RE.sub("", value)
+        if isinstance(value, (Decimal, int, float)) or value is None:
+            return value
+        return str(value)
+
+    workbook = Workbook(write_only=True)
+    for name, columns, rows in sheets:
+        sheet = workbook.create_sheet(name)
+        sheet.append(columns)
+        for row in rows:
+            sheet.append([cell(value) for value in row])
+    with _binary(target) as out:
+        workbook.save(out)
+
+
+def write_parquet(target, columns, rows, numeric=(), row_group=None):
+    """Columns as strings, those in numeric as float64; one row group per row_group rows"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([(column, pa.float64() if column in numeric else pa.string()) for column in columns])
+    convert = [
+        (lambda value: None if value in (None, "") else float(value)) if column in numeric else _text
+        for column in columns
+    ]
+    row_group = row_group or ROW_GROUP_ROWS
+    rows = iter(rows)
+    with _binary(target) as out, pq.ParquetWriter(out, schema) as writer:
+        while True:
+            chunk = list(itertools.islice(rows, row_group))
+            if not chunk:
+                break
+            arrays = [
+                pa.array([fn(row[i]) for row in chunk], type=schema.field(i).type)
+                for i, fn in enumerate(convert)
+            ]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+
+
+# -------------------
+# Export
+# -------------------
+def export(target, file_format, shipments, files=None):
+    """
+    Write the shipments' results and field checks to target in file_format
+    (see FORMATS); files optionally gives {shipment: {document type: file name}}
+    """
+    if file_format not in MIME_TYPES:
+        raise ValueError(f"unknown export format {file_format!r}")
+    if file_format == "parquet" and not PARQUET:
+        raise ValueError("Parquet export needs pyarrow")
+    checks = check_table(reconcile(shipments, DOCUMENTS))
+    if file_format == "xlsx":
+        write_xlsx(target, [("Results", *result_table(shipments, files)), ("Checks", *checks)])
+    elif file_format == "csv":
+        write_csv(target, *checks)
+    else:
+        write_parquet(target, *checks)
+
+
+def export_format(path):
+    """Export format for a file name by its extension"""
+    file_format = os.path.splitext(path)[1].lower().lstrip(".")
+    if file_format not in MIME_TYPES:
+        raise ValueError(f"{path}: export to .xlsx, .csv or .parquet")
+    if file_format == "parquet" and not PARQUET:
+        raise ValueError("Parquet export needs pyarrow")
+    return file_format
+
+
+def export_bytes(file_format, shipments, files=None):
+    """export() into memory, for a download"""
+    out = io.BytesIO()
+    export(out, file_format, shipments, files)
+    return out.getvalue()
@@ -5,7 +5,7 @@ Document extractors package
 from .purchase_order import extract_purchase_order
 from .shipping_document import extract_packing_list
 from .order_confirmation import extract_order_confirmation
-from .proforma_invoice import extract_proforma_invoice
+from .proforma_invoice import extract_proforma_invoice, extract_proforma_invoice_xlsx
 from .certificate_of_analysis import extract_coa
 from .packing_list import extract_packing_list_f
 
@@ -14,6 +14,7 @@ __all__ = [
     'extract_packing_list', 
     'extract_order_confirmation',
     'extract_proforma_invoice',
+    'extract_proforma_invoice_xlsx',
     'extract_coa',
     'extract_packing_list_f'
 ]
\ No newline at end of file
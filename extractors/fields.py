@@ -0,0 +1,225 @@
+"""
+Field specs for every format
+
+One list of Field rules per format letter (see spec.py), in the order the
+fields are reported. Normalizers that only one format needs live here;
+the patterns themselves are in patterns.py.
+"""
+
+from .patterns import PATTERNS
+from .spec import OMIT, Field, collapse_spaces, compile_spec, const, drop_commas, joined, quantity, strip, without
+
+# Columns of the Proforma Invoice line-item table, in sheet order
+LINE_ITEM_HEADERS = ["Sales Org","Del Plant","DG Status","Product Description","Form","Pk Size (KG)",
+                     "Product Code","Net Weight (Kg)","Sales Currency","Price / Unit","Sales Incoterm","Order Value",
+                     "Cust. Reference","ETA Destination"]
+# Line-item columns we do not report
+DROPPED_HEADERS = ["Sales Org","Del Plant","DG Status","Form","Pk Size (KG)",
+                   "Sales Currency","Sales Incoterm",
+                   "Cust. Reference","ETA Destination"]
+
+
+# Labelled bank block, or failing that the lines under a "... Bank" line (B and C)
+BANK_DETAILS = Field(
+    "Bank Name", {"Bank Name": 1},
+    then=[Field("Bank Address", {"Bank Address": joined(1, 2), "Bank City": 3})],
+    otherwise=Field("Bank Section", {"Bank Name": 1, "Bank Address": joined(2, 3), "Bank City": 4}),
+)
+
+
+# --- Purchase Order Terms & Conditions (Format A) ---
+A = [
+    Field("Purchase Order Number", {"Purchase Order Number": 1}),
+    Field("Sold To", {"Sold To": 1}),
+    Field("Currency", {"Currency": 1}),
+    Field("Payment Terms", {"Payment Terms": 1}),
+    Field("Material Number", {"Material Number": 1}, missing=OMIT),
+    Field("Quantity Unit", {"Net Weight (Kg)": (1, quantity)}, missing=OMIT),
+    Field("Price Value", {"Price / Unit": 1, "Order Value": 2}, missing=OMIT),
+    Field("Total Value", {"Total Value": 1}),
+    # Description (between Material No. and Price columns), with or without Givaudan
+    Field(
+        "Description Givaudan", {"Product Description": 1, "Product Code": 3},
+        otherwise=Field(
+            "Description", {},
+            then=[Field(
+                "Product Code Suffix", {"Product Description": 1, "Product Code": 2},
+                source=1,
+                # No code at the end: the whole text is the description
+                otherwise=Field(None, {"Product Description": 1, "Product Code": const("")}),
+            )],
+            missing=OMIT,
+        ),
+    ),
+    Field("Specification Number", {"Specification Number": 1}),
+]
+
+
+# --- Packing List Shipping Docs (Format B) ---
+def _transport_mode(value):
+    # The label is sometimes followed by the next column instead of a value
+    return value if value and not value.startswith(("Import", "NÂ°", "N°")) else None
+
+
+B = [
+    Field("Sold To", {"Sold To": 1}),
+    Field("Sold To Code", {"Sold To Code": 1}),
+    Field("Incoterms", {"Incoterms": 1}),
+    Field("Payment Terms", {"Payment Terms": 1}),
+    Field("O/Order number", {"O/Order number": 1}),
+    Field("Shipment Date", {"Shipment Date": 2}),
+    Field("Order Number", {
+        "Order Number": (1, strip, lambda value: value.rstrip("-.")),
+        "Purchase Order Number": 2,
+    }),
+    Field("Order Net quantity", {"Order Net quantity": 1}),
+    # Quantity, price and amount from the line after Y/Order number
+    Field(
+        "Quantity Price Amount", {"Order Net quantity": 1, "Price / Unit": (2, quantity), "Amount": 3},
+        missing={"Price / Unit": None},
+    ),
+    # Description and code on the sales number line, or the code alone with
+    # the description on the lines below
+    Field(
+        "Sales Line", {},
+        then=[Field(
+            "Sales Description Code", {"Product Description": 1, "Product Code": 2},
+            source=1, anchored=True,
+            otherwise=Field(
+                None, {"Product Code": 1},
+                then=[Field("Product Description", {"Product Description": (1, collapse_spaces)}, missing=OMIT)],
+            ),
+        )],
+        missing=OMIT,
+    ),
+    BANK_DETAILS,
+    Field("Contact", {"Contact": (1, strip, without(PATTERNS["B"]["Attn Prefix"]))}),
+    Field("Email", {"Email": 1}),
+    Field("Cell Phone", {"Cell Phone": 1}),
+    Field("Net Weight (Kg)", {"Net Weight (Kg)": (1, quantity)}),
+    Field("Currency", {"Currency": 1}),
+    Field("Order Value", {"Order Value": 1}),
+    Field("Total Value", {"Total Value": 1}),
+    Field("Transport Mode", {"Transport Mode": (1, strip, _transport_mode)}, missing=OMIT),
+    Field("Material Number", {"Material Number": 1}),
+    Field("Specification Number", {"Specification Number": 1}),
+]
+
+
+# --- Order Confirmation (Format C) ---
+def _clean_description(text):
+    """Remove unwanted characters from product description"""
+    if not text:
+        return None
+    # Remove specific problematic characters
+    cleaned = text.replace('Â', '').replace('°', '').replace('™', '').replace('®', '')
+    # Remove any remaining non-ASCII characters except common ones
+    cleaned = PATTERNS["C"]["Description Non-ASCII"].sub('', cleaned)
+    # Remove extra whitespace
+    return PATTERNS["C"]["Whitespace"].sub(' ', cleaned).strip()
+
+
+C = [
+    # Everything before " PO " is the Order Number
+    Field("Order Number", {
+        "Order Number": (1, lambda value: value.strip().rstrip("-").strip()),
+        "Purchase Order Number": 2,
+    }),
+    Field("Sold To", {"Sold To": 1}),
+    Field("Sold To Code", {"Sold To Code": 1}),
+    Field("Transport Mode", {"Transport Mode": 1}),
+    Field("Incoterms", {"Incoterms": 1}),
+    Field("Currency", {"Currency": 1}),
+    Field("Payment Terms", {"Payment Terms": 1}),
+    # Code on the sales number line and the description below it, or both
+    # on the line before Incoterms
+    Field(
+        "Sales Number", {"Product Code": 1},
+        then=[Field("Product Description", {"Product Description": (1, _clean_description)})],
+        otherwise=Field(
+            "Description Code", {"Product Description": (1, _clean_description), "Product Code": 2},
+            missing={"Product Code": None, "Product Description": None},
+        ),
+    ),
+    Field("Net Weight (Kg)", {"Net Weight (Kg)": (1, drop_commas)}),
+    Field("Price / Unit", {"Price / Unit": (1, quantity)}),
+    Field("Order Value", {"Order Value": 1}),
+    Field("Total Value", {"Total Value": 1}),
+    BANK_DETAILS,
+    Field(
+        "Contact", {"Contact": (1, strip, without(PATTERNS["C"]["Attn Prefix"]))},
+        otherwise=Field("Attn Line", {"Contact": 1}),
+    ),
+    Field("Email", {"Email": 1}),
+    Field("Cell Phone", {"Cell Phone": 1}, otherwise=Field("Phone Number", {"Cell Phone": 1})),
+]
+
+
+# --- PROFORMA INVOICE (Excel) (Format D) ---
+def _line_item(match):
+    """The row under the "ETA Destination" header, by column (dropped columns left out)"""
+    cells = match.group(1)
+    # Only the first len(LINE_ITEM_HEADERS) cells are read; the rest of the
+    # document is left unsplit
+    limit = len(LINE_ITEM_HEADERS)
+    row = cells.strip().split("\t", limit) if "\t" in cells else cells.split(None, limit)
+    return {
+        h: row[i] for i, h in enumerate(LINE_ITEM_HEADERS)
+        if i < len(row) and h not in DROPPED_HEADERS
+    }
+
+
+def _bank_address(raw_address):
+    # Rule 1: Remove any "words in ALL CAPS"
+    address = PATTERNS["D"]["All Caps Words"].sub("", raw_address)
+    # Rule 2: Remove extra spaces/commas
+    address = PATTERNS["D"]["Repeated Spaces"].sub(" ", address).strip()
+    return PATTERNS["D"]["Space Before Comma"].sub(",", address)
+
+
+D = [
+    Field("Order Number", {"Order Number": 1, "Purchase Order Number": 2}),
+    Field("Order Type", {"Order Type": 1}),
+    Field("Sold To", {"Sold To": 1}),
+    Field("Sold To Code", {"Sold To Code": 1}),
+    Field("Transport Mode", {"Transport Mode": 1}),
+    Field("Incoterms", {"Incoterms": 1}),
+    Field("Currency", {"Currency": 1}),
+    Field("Payment Terms", {"Payment Terms": 1}),
+    Field("Line Item", _line_item, missing=OMIT,
+          keys=[h for h in LINE_ITEM_HEADERS if h not in DROPPED_HEADERS]),
+    Field("Total Value", {"Total Value": 1}),
+    Field("Bank Name", {"Bank Name": 1}),
+    Field("Bank Address", {"Bank Address": (1, strip, _bank_address)}),
+    Field("Bank City", {"Bank City": 1}),
+    Field("Contact", {"Contact": (1, lambda value: value.replace("Attn:", "").strip())}),
+    Field("Email", {"Email": 1}),
+    Field("Cell Phone", {"Cell Phone": 1}),
+]
+
+
+# --- COA (Format E) ---
+E = [
+    Field("Product", {"Product Code": 1, "Product Description": 2}),
+    # Order Number and Purchase Order Number from Customer Reference
+    Field("Customer Reference", {"Order Number": 1, "Purchase Order Number": 2}),
+    Field("Material Number", {"Material Number": 1}),
+    Field("Specification Number", {"Specification Number": 1}),
+    Field("Net Weight (Kg)", {"Net Weight (Kg)": 1}),
+]
+
+
+# --- Packing List (Format F) ---
+F = [
+    Field("Customer Ref", {"Order Number": 1, "Purchase Order Number": 2}),
+    # Consignee block
+    Field("Sold To Code", {"Sold To Code": 1}),
+    Field("Sold To", {"Sold To": 1}),
+    Field("Incoterms", {"Incoterms": 1}),
+    Field("Transport Mode", {"Transport Mode": 1}),
+    Field("Net Weight (Kg)", {"Net Weight (Kg)": (1, quantity)}),
+]
+
+FIELDS = {"A": A, "B": B, "C": C, "D": D, "E": E, "F": F}
+
+SPECS = {format_type: compile_spec(format_type, fields, PATTERNS[format_type]) for format_type, fields in FIELDS.items()}
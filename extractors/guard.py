@@ -0,0 +1,358 @@
+"""
+Guarded regex execution for the extractors
+
+Every registered pattern is wrapped in a GuardedPattern, which enforces
+
+  * a per-document time budget (REGEX_DOCUMENT_BUDGET_MS): once it is
+    spent, the remaining fields are skipped and reported as missing;
+  * a per-field time budget (REGEX_FIELD_BUDGET_MS): a single search that
+    runs longer is interrupted and its field reported as missing. Python's
+    regex engine can only be interrupted by a signal, and signals only
+    reach the main thread, so this applies when extraction runs on a
+    process's main thread.
+
+extract_document() runs one document's extractor under these budgets. On
+any other thread (the job queue, the REST service, batch --executor
+thread) a long text is extracted in a helper process instead
+(REGEX_WORKERS of them, shared by every thread), whole and on that
+process's main thread, so the field budget applies there too and the
+extractor keeps its document index. Patterns searched directly from
+another thread only get the document budget.
+
+document_budget(time_fields=True) also sums the time spent on each field,
+for the pipeline's metrics.
+
+A pattern can also name a literal that every match must contain (e.g. the
+"\\nIncoterms:" a lazy description span runs up to); when the text lacks
+it the search is skipped, which is where those patterns are slowest.
+
+REGEX_ENGINE=re2 runs patterns on RE2 (google-re2), a linear-time engine,
+when it can compile them; patterns that use lookaround fall back to re.
+RE2 treats \\s, \\d, \\w and \\b as ASCII-only, so check the backend
+parity on real documents before switching it on.
+"""
+
+import contextlib
+import contextvars
+import logging
+import multiprocessing
+import os
+import re
+import signal
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+try:
+    import re2
+except ImportError:  # optional dependency
+    re2 = None
+
+from .index import current_index, leading_labels, literals, lookbehind_branches
+
+logger = logging.getLogger(__name__)
+
+DOCUMENT_BUDGET = float(os.getenv("REGEX_DOCUMENT_BUDGET_MS", "2000")) / 1000
+FIELD_BUDGET = float(os.getenv("REGEX_FIELD_BUDGET_MS", "250")) / 1000
+REGEX_WORKERS = int(os.getenv("REGEX_WORKERS") or os.cpu_count() or 2)
+ENGINE = os.getenv("REGEX_ENGINE", "re").lower()
+
+# Short texts cannot blow a budget with these patterns; skip the timer for them
+GUARD_MIN_CHARS = 10_000
+
+
+class RegexTimeout(Exception):
+    """Raised inside a search that ran past its field budget"""
+
+
+class Budget:
+    def __init__(self, seconds, time_fields=False):
+        self.deadline = time.perf_counter() + seconds
+        self.timeouts = []
+        # {field: seconds spent in its searches}, when asked for
+        self.field_seconds = {} if time_fields else None
+        # SIGALRM handler replaced by this document, restored when it ends
+        self.previous_handler = None
+
+    def remaining(self):
+        return self.deadline - time.perf_counter()
+
+
+_budget = contextvars.ContextVar("regex_budget", default=None)
+
+
+@contextlib.contextmanager
+def document_budget(seconds=None, time_fields=False):
+    """
+    Run one document's extraction under a time budget; fields skipped or
+    interrupted are listed in budget.timeouts afterwards, and with
+    time_fields the time each field took is summed in budget.field_seconds
+    """
+    budget = Budget(DOCUMENT_BUDGET if seconds is None else seconds, time_fields)
+    token = _budget.set(budget)
+    try:
+        yield budget
+    finally:
+        _budget.reset(token)
+        if budget.previous_handler is not None:
+            signal.signal(signal.SIGALRM, budget.previous_handler)
+
+
+def _raise_timeout(signum, frame):
+    raise RegexTimeout()
+
+
+def _can_interrupt():
+    return hasattr(signal, "setitimer") and threading.current_thread() is threading.main_thread()
+
+
+def _call_with_alarm(seconds, method, args, budget):
+    # Installing the handler costs more than most searches, so a document
+    # does it once, on its first timed field
+    if budget is None:
+        previous = signal.signal(signal.SIGALRM, _raise_timeout)
+    elif budget.previous_handler is None:
+        previous = signal.signal(signal.SIGALRM, _raise_timeout)
+        budget.previous_handler = signal.SIG_DFL if previous is None else previous
+    signal.setitimer(signal.ITIMER_REAL, max(seconds, 0.001))
+    try:
+        return method(*args)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        if budget is None:
+            signal.signal(signal.SIGALRM, previous)
+
+
+# --- Documents extracted off the main thread ---
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _helper_pool():
+    """The helper processes, started on first use"""
+    global _pool
+
+    with _pool_lock:
+        if _pool is None:
+            # spawn: forking a process that runs threads can copy held locks
+            _pool = ProcessPoolExecutor(REGEX_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def _reset_pool(broken):
+    global _pool
+
+    with _pool_lock:
+        if _pool is broken:
+            _pool = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+def _extract_in_helper(extract, text, seconds, time_fields):
+    """extract_document() in a helper process: (data, timeouts, field seconds)"""
+    with document_budget(seconds, time_fields) as budget:
+        data = extract(text)
+    return data, budget.timeouts, budget.field_seconds
+
+
+def extract_document(extract, text, seconds=None, time_fields=False):
+    """
+    extract(text) under a document budget (see document_budget); returns
+    (data, budget). extract must be a module-level function, as a long text
+    may be extracted in a helper process
+    """
+    if len(text) < GUARD_MIN_CHARS or _can_interrupt():
+        with document_budget(seconds, time_fields) as budget:
+            return extract(text), budget
+
+    budget = Budget(0, time_fields)
+    pool = _helper_pool()
+    try:
+        data, budget.timeouts, budget.field_seconds = pool.submit(
+            _extract_in_helper, extract, text, seconds, time_fields
+        ).result()
+    except BrokenProcessPool:
+        _reset_pool(pool)
+        logger.warning("Regex helper process died; reporting every field as missing")
+        data = {}
+        budget.timeouts.append("every field")
+    return data, budget
+
+
+def _re2_source(pattern, multiline):
+    """
+    Without MULTILINE, Python's $ also matches before a final newline while
+    RE2's matches only at the very end; spell the Python meaning out
+    """
+    if multiline:
+        return pattern
+    out = []
+    escaped = in_class = False
+    for ch in pattern:
+        if escaped:
+            escaped = False
+        elif ch == "\\":
+            escaped = True
+        elif in_class:
+            in_class = ch != "]"
+        elif ch == "[":
+            in_class = True
+        elif ch == "$":
+            out.append(r"(?:\n?\z)")
+            continue
+        out.append(ch)
+    return "".join(out)
+
+
+def _compile_re2(regex):
+    """RE2 version of a compiled pattern, or None when RE2 cannot run it"""
+    if re2 is None:
+        return None
+    inline = "".join(
+        letter for flag, letter in ((re.IGNORECASE, "i"), (re.MULTILINE, "m"), (re.DOTALL, "s"))
+        if regex.flags & flag
+    )
+    source = _re2_source(regex.pattern, regex.flags & re.MULTILINE)
+    options = re2.Options()
+    options.log_errors = False
+    try:
+        return re2.compile(f"(?{inline}){source}" if inline else source, options)
+    except re2.error:
+        return None
+
+
+def _compile(regex):
+    """The engine a compiled pattern runs on (see REGEX_ENGINE)"""
+    return (_compile_re2(regex) if ENGINE == "re2" else None) or regex
+
+
+class GuardedPattern:
+    """
+    Drop-in stand-in for a compiled pattern (search/match/sub) that runs
+    under the current document and field budgets, and searches through the
+    document's index (see index.py) when the extractor has one
+    """
+
+    __slots__ = ("regex", "field", "labels", "line_literal", "required", "_engine", "_anchors", "_located")
+
+    def __init__(self, regex, field, required=None, line_literal=None):
+        self.regex = regex
+        self.field = field
+        self.labels = leading_labels(regex.pattern)
+        self.line_literal = line_literal
+        self.required = required
+        self._engine = _compile(regex)
+        ignorecase = regex.flags & re.IGNORECASE
+        self._anchors = tuple(
+            literals(strings, ignorecase) if strings else None
+            for strings in (self.labels, line_literal and (line_literal,), required and (required,))
+        )
+        # Patterns like (?:Label|(?<=\n))rest: labels plus a search for
+        # each lookbehind branch with its literal made part of the match
+        branches = None if self.labels or line_literal else lookbehind_branches(regex.pattern)
+        self._located = None
+        if branches is not None:
+            labels, lookbehinds = branches
+            finders = tuple(
+                (_compile(re.compile(re.escape(literal) + rest, regex.flags)).search, len(literal))
+                for literal, rest in lookbehinds
+            )
+            self._located = (literals(labels, ignorecase) if labels else None, finders)
+
+    @property
+    def pattern(self):
+        return self.regex.pattern
+
+    @property
+    def flags(self):
+        return self.regex.flags
+
+    def search(self, string, pos=0, endpos=sys.maxsize):
+        index = current_index(string)
+        if index is not None and pos == 0 and endpos == sys.maxsize:
+            return self._run(self._search_indexed, (index,), string, index)
+        return self._run(self._engine.search, (string, pos, endpos), string)
+
+    def match(self, string, pos=0, endpos=sys.maxsize):
+        return self._run(self._engine.match, (string, pos, endpos), string)
+
+    def sub(self, repl, string, count=0):
+        return self.regex.sub(repl, string, count)
+
+    def _search_indexed(self, index):
+        labels, line_literal, _ = self._anchors
+        if labels is not None:
+            return index.search_labels(self._engine.match, labels)
+        if self._located is not None:
+            return index.search_located(self._engine.match, *self._located)
+        if line_literal is not None:
+            return index.search_from_line(self._engine.search, line_literal)
+        return self._engine.search(index.text)
+
+    def _lacks_required(self, string, index):
+        required = self._anchors[2]
+        if required is None:
+            return False
+        if index is not None:
+            return not index.contains(required)
+        return required.regex.search(string) is None
+
+    def _run(self, method, args, string, index=None):
+        budget = _budget.get()
+        limit = FIELD_BUDGET
+        if budget is not None:
+            remaining = budget.remaining()
+            if remaining <= 0:
+                budget.timeouts.append(self.field)
+                return None
+            limit = min(limit, remaining)
+            if budget.field_seconds is not None:
+                start = time.perf_counter()
+                try:
+                    return self._guarded(method, args, string, index, budget, limit)
+                finally:
+                    field_seconds = budget.field_seconds
+                    field_seconds[self.field] = field_seconds.get(self.field, 0.0) + time.perf_counter() - start
+        return self._guarded(method, args, string, index, budget, limit)
+
+    def _guarded(self, method, args, string, index, budget, limit):
+        if len(string) < GUARD_MIN_CHARS:
+            return method(*args)
+
+        if self._lacks_required(string, index):
+            return None
+
+        if not _can_interrupt():
+            return method(*args)
+
+        try:
+            return _call_with_alarm(limit, method, args, budget)
+        except RegexTimeout:
+            if budget is not None:
+                budget.timeouts.append(self.field)
+            logger.warning("Regex for %s timed out after %.0f ms", self.field, limit * 1000)
+            return None
+
+
+def guard_patterns(patterns, required=None, line_literals=None):
+    """
+    Wrap a {format: {field: compiled}} registry in GuardedPatterns;
+    required and line_literals are optional {format: {field: literal}} maps
+    (see GuardedPattern and index.DocumentIndex.search_from_line)
+    """
+    required = required or {}
+    line_literals = line_literals or {}
+    return {
+        format_type: {
+            field: GuardedPattern(
+                regex,
+                f"{format_type}/{field}",
+                required.get(format_type, {}).get(field),
+                line_literals.get(format_type, {}).get(field),
+            )
+            for field, regex in fields.items()
+        }
+        for format_type, fields in patterns.items()
+    }
@@ -0,0 +1,365 @@
+"""
+Per-document literal index
+
+Most extractor patterns start with a fixed label ("Incoterms", "BANK NAME:",
+"Sales number" ...) or need a literal somewhere on the line they start on
+(the "@" of an e-mail address, the "Bank" of an unlabelled bank name), so
+their leftmost match can only begin near one of those literals. A
+DocumentIndex records where each literal occurs in the text, found once per
+document as fields ask for it and shared between fields that use the same
+literal:
+
+  * a pattern with a leading label is tried with an anchored match at the
+    label's positions only;
+  * a pattern with a line literal is searched from the start of the first
+    line that contains it, skipping everything above.
+
+Either way the result is the match search() would have returned; the engine
+just no longer walks the whole text from offset 0 for every field.
+
+A pattern whose first branch may also be a bare lookbehind, like the phone
+number's (?:Cell Phone[:\s]*|(?<=\n)), is located by a search for the
+lookbehind's literal followed by the rest of the pattern, and otherwise at
+its labels, whichever comes first.
+
+The field-spec engine (spec.py) opens one index per document for all of a
+format's patterns; GuardedPattern.search picks it up for the text it is
+given.
+"""
+
+import contextlib
+import contextvars
+import re
+
+# Labels shorter than this are too common to be worth anchoring on
+MIN_LABEL_CHARS = 4
+
+# Below this many characters a plain search is cheaper than the bookkeeping
+INDEX_MIN_CHARS = 10_000
+
+_META = set(".^$*+?()[]{}|\\")
+_QUANTIFIERS = set("*+?{")
+_ESCAPES = {"n": "\n", "r": "\r", "t": "\t"}
+
+
+def _literal_prefix(pattern):
+    """
+    Literal text a pattern starts with (escapes resolved); a leading group
+    that is not quantified and has no alternation is looked into
+    """
+    out = []
+    i = 0
+    while i < len(pattern):
+        ch = pattern[i]
+        if ch == "(" and not out:
+            return _group_prefix(pattern)
+        if ch == "\\":
+            if i + 1 >= len(pattern) or pattern[i + 1].isalnum():
+                break
+            literal, step = pattern[i + 1], 2
+        elif ch in _META:
+            break
+        else:
+            literal, step = ch, 1
+        if i + step < len(pattern) and pattern[i + step] in _QUANTIFIERS:
+            break
+        out.append(literal)
+        i += step
+    return "".join(out)
+
+
+def _group_prefix(pattern):
+    """Literal prefix of the contents of the group pattern starts with"""
+    match = re.match(r"\((?:\?:|\?P<\w+>)?", pattern)
+    if pattern.startswith("(?") and match.end() == 1:
+        return ""  # lookaround, flags or a conditional
+    end = _group_end(pattern)
+    if end is None or (end + 1 < len(pattern) and pattern[end + 1] in _QUANTIFIERS):
+        return ""
+    body = pattern[match.end():end]
+    if len(_split_top_level(body)) > 1:
+        return ""
+    return _literal_prefix(body)
+
+
+def _split_top_level(pattern):
+    """Split a pattern on its top-level | (outside groups and classes)"""
+    parts, depth, start = [], 0, 0
+    escaped = in_class = False
+    for i, ch in enumerate(pattern):
+        if escaped:
+            escaped = False
+        elif ch == "\\":
+            escaped = True
+        elif in_class:
+            in_class = ch != "]"
+        elif ch == "[":
+            in_class = True
+        elif ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        elif ch == "|" and depth == 0:
+            parts.append(pattern[start:i])
+            start = i + 1
+    parts.append(pattern[start:])
+    return parts
+
+
+def _group_end(pattern):
+    """Index of the ) closing the group pattern starts with"""
+    depth = 0
+    escaped = in_class = False
+    for i, ch in enumerate(pattern):
+        if escaped:
+            escaped = False
+        elif ch == "\\":
+            escaped = True
+        elif in_class:
+            in_class = ch != "]"
+        elif ch == "[":
+            in_class = True
+        elif ch in "()":
+            depth += 1 if ch == "(" else -1
+            if depth == 0:
+                return i
+    return None
+
+
+def split_leading_group(pattern):
+    """
+    (branches, rest) for a pattern of the form (?:b1|b2|...)rest, or None
+    """
+    if not pattern.startswith("(?:") or len(_split_top_level(pattern)) > 1:
+        return None
+    end = _group_end(pattern)
+    if end is None or (end + 1 < len(pattern) and pattern[end + 1] in _QUANTIFIERS):
+        return None
+    return _split_top_level(pattern[3:end]), pattern[end + 1:]
+
+
+def _branch_label(branch, rest):
+    """
+    Literal a match through this branch starts with; a leading ^ is
+    zero-width, and an empty branch leaves the literal to what follows
+    """
+    if branch.startswith("^"):
+        branch = branch[1:]
+    return _literal_prefix(branch) if branch else _literal_prefix(rest)
+
+
+def leading_labels(pattern):
+    """
+    Literals one of which every match of the pattern starts with, e.g.
+    ("Incoterms",) or ("Contact:", "Attn:") for (?:Contact:|Attn:)...;
+    None when a match can start with anything else
+    """
+    split = split_leading_group(pattern)
+    if split is not None:
+        branches, rest = split
+        labels = [_branch_label(branch, rest) for branch in branches]
+    elif len(_split_top_level(pattern)) > 1:
+        return None
+    else:
+        labels = [_branch_label(pattern, "")]
+    if any(len(label.strip()) < MIN_LABEL_CHARS for label in labels):
+        return None
+    return tuple(labels)
+
+
+def lookbehind_branches(pattern):
+    """
+    For a pattern (?:b1|b2|...)rest whose branches either start with a
+    label or are a bare lookbehind for a literal, like the phone pattern's
+    (?:Cell Phone[:\s]*|(?<=\n)): (labels, [(literal, rest)]), where
+    labels may be empty. None for any other shape
+    """
+    split = split_leading_group(pattern)
+    if split is None:
+        return None
+    branches, rest = split
+    labels, lookbehinds = [], []
+    for branch in branches:
+        match = re.fullmatch(r"\(\?<=((?:\\[nrt]|\\\W|[^\\.^$*+?()\[\]{}|])+)\)", branch)
+        if match:
+            literal = re.sub(r"\\(.)", lambda m: _ESCAPES.get(m.group(1), m.group(1)), match.group(1))
+            lookbehinds.append((literal, rest))
+            continue
+        label = _branch_label(branch, rest)
+        if len(label.strip()) < MIN_LABEL_CHARS:
+            return None
+        labels.append(label)
+    if not lookbehinds:
+        return None
+    return tuple(labels), lookbehinds
+
+
+class Literals:
+    """
+    A set of literals to look up in a document, prepared once per pattern.
+    Instances are the index's cache keys, so patterns sharing a label share
+    one (see literals())
+    """
+
+    __slots__ = ("needles", "ignorecase", "regex")
+
+    def __init__(self, strings, ignorecase=False):
+        self.ignorecase = ignorecase
+        self.needles = tuple(s.lower() for s in strings) if ignorecase else tuple(strings)
+        self.regex = re.compile("|".join(map(re.escape, strings)), re.IGNORECASE if ignorecase else 0)
+
+
+_literals = {}
+
+
+def literals(strings, ignorecase=False):
+    """Shared Literals for a tuple of strings"""
+    key = (tuple(strings), bool(ignorecase))
+    if key not in _literals:
+        _literals[key] = Literals(*key)
+    return _literals[key]
+
+
+# Characters IGNORECASE matches against an ASCII letter they do not lower() to
+_CASE_ODDITIES = ("İ", "ı", "ſ")
+
+# Case-insensitive labels are found in a lower-cased copy of the text, built
+# in growing chunks so labels near the top do not pay for the whole document
+FOLD_CHUNK_CHARS = 16_384
+
+
+class DocumentIndex:
+    def __init__(self, text):
+        self.text = text
+        self._folded = ""
+        self._fold_chunk = FOLD_CHUNK_CHARS
+        self._occurrences = {}
+
+    def _fold_more(self):
+        """
+        Extend the lower-cased copy; False once lower() cannot stand in for
+        IGNORECASE on this text (the copy is then abandoned)
+        """
+        done = len(self._folded)
+        chunk = self.text[done:done + self._fold_chunk]
+        lowered = chunk.lower()
+        if len(lowered) != len(chunk) or any(ch in chunk for ch in _CASE_ODDITIES):
+            self._folded = None
+            return False
+        self._folded += lowered
+        self._fold_chunk *= 2
+        return True
+
+    def _find_folded(self, needle, start):
+        """Like str.find on the lower-cased text; None if it cannot be used"""
+        while self._folded is not None:
+            pos = self._folded.find(needle, start)
+            if pos != -1 or len(self._folded) == len(self.text):
+                return pos
+            start = max(start, len(self._folded) - len(needle) + 1)
+            self._fold_more()
+        return None
+
+    def _first_after(self, literals, start):
+        if literals.ignorecase:
+            find = self._find_folded
+        else:
+            find = self.text.find
+        found = []
+        for needle in literals.needles:
+            pos = find(needle, start)
+            if pos is None:
+                match = literals.regex.search(self.text, start)
+                return match.start() if match else -1
+            if pos != -1:
+                found.append(pos)
+        return min(found) if found else -1
+
+    def positions(self, literals):
+        """
+        Offsets where any of the literals occurs, in order. Found lazily and
+        remembered, so fields that share a label also share the scan
+        """
+        entry = self._occurrences.get(literals)
+        if entry is None:
+            entry = self._occurrences[literals] = [[], 0]
+        found = entry[0]
+        i = 0
+        while True:
+            if i < len(found):
+                yield found[i]
+                i += 1
+                continue
+            if entry[1] is None:
+                return
+            pos = self._first_after(literals, entry[1])
+            if pos == -1:
+                entry[1] = None
+                return
+            found.append(pos)
+            entry[1] = pos + 1
+
+    def contains(self, literals):
+        return next(self.positions(literals), None) is not None
+
+    def search_labels(self, match, labels):
+        """
+        Leftmost result of an anchored matcher (compiled.match) tried at the
+        positions of the leading labels
+        """
+        for pos in self.positions(labels):
+            result = match(self.text, pos)
+            if result is not None:
+                return result
+        return None
+
+    def search_located(self, match, labels, finders):
+        """
+        Leftmost result of an anchored matcher (compiled.match) when a match
+        can only start at a label or where one of the finders says: each is
+        (search, offset), a search for literal + rest standing in for a
+        (?<=literal)rest branch, whose match starts offset characters early
+        """
+        best = None
+        for search, offset in finders:
+            found = search(self.text)
+            if found is not None and (best is None or found.start() + offset < best):
+                best = found.start() + offset
+        if labels is not None:
+            for pos in self.positions(labels):
+                if best is not None and pos >= best:
+                    break
+                result = match(self.text, pos)
+                if result is not None:
+                    return result
+        return match(self.text, best) if best is not None else None
+
+    def search_from_line(self, search, literal):
+        """
+        search() started at the first line containing literal; every match
+        has the literal on the line it starts on, so nothing above can match
+        """
+        first = next(self.positions(literal), None)
+        if first is None:
+            return None
+        return search(self.text, self.text.rfind("\n", 0, first) + 1)
+
+
+_index = contextvars.ContextVar("document_index", default=None)
+
+
+def current_index(text):
+    """The index being used for this exact text, if any"""
+    index = _index.get()
+    return index if index is not None and index.text is text else None
+
+
+@contextlib.contextmanager
+def document_index(text):
+    index = DocumentIndex(text) if text and len(text) >= INDEX_MIN_CHARS else None
+    token = _index.set(index)
+    try:
+        yield index
+    finally:
+        _index.reset(token)
+
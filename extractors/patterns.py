@@ -0,0 +1,202 @@
+"""
+Precompiled regex registry for every extractor
+
+Patterns are compiled once at import time and keyed by format letter and
+field name, so extractors never depend on re's small internal cache. Each
+one is wrapped in a GuardedPattern (see guard.py) so a pathological input
+costs a bounded amount of time.
+
+Number, e-mail and order-number patterns start with a negative lookbehind
+for their own character class: the leftmost match can only begin at the
+edge of a run, so the lookbehind does not change any result but stops the
+engine from rescanning long runs from every position inside them. Blank-line
+terminators use [^\S\n]* instead of \s* for the same reason.
+"""
+
+import re
+
+from .guard import guard_patterns
+
+PATTERNS = {
+    # Purchase Order Terms & Conditions (Format A)
+    "A": {
+        "Purchase Order Number": re.compile(r"Purchase order\s*:\s*(\S+)"),
+        "Sold To": re.compile(r"Invoice To:\s*(.*?)(?:\n[^\S\n]*\n|$)", re.DOTALL),
+        "Currency": re.compile(r"Currency[:\s]+(\S+)"),
+        "Payment Terms": re.compile(r"Terms of Payment\s*:\s*([^\n_]+)"),
+        "Item": re.compile(r"^(\d+)\s", re.MULTILINE),
+        "Material Number": re.compile(r"^[^\S\n]*\d+\s+(\d+)", re.MULTILINE),
+        "Quantity Unit": re.compile(r"(?<![\d,])([\d,]+\.\d+)\s*(kg|g|l|ml)", re.IGNORECASE),
+        "Price Value": re.compile(r"(?<!\d)(\d+\.\d{2})\s+(\d+,\d+\.\d{2})"),
+        "Total Value": re.compile(r"Total net value excl\. tax\s+([\d,]+\.\d{2})"),
+        "Description Givaudan": re.compile(
+            r"\b\d+\s+\d+\s+(.+?)\s+(GIV(?:AUDAN)?)\s+(.+?)(?=\s*$)", re.IGNORECASE | re.MULTILINE
+        ),
+        "Description": re.compile(
+            r"\b\d+\s+\d+\s+(.+?)(?:\s+\d+(?:kg|g|l|ml)|\s+[\d,]+(?:\.\d*)?\s*g|\s*$)", re.IGNORECASE
+        ),
+        "Product Code Suffix": re.compile(r'^(.+?)([A-Z]?\d{6,7}[A-Z]?)$'),
+        "PO against Contract": re.compile(r"PO against Contract[:\s]+(.+?)(?:\n|$)"),
+        "Specification Number": re.compile(r"As per\s+[Ss]pecification number[:\s]+(\d+)"),
+    },
+
+    # Packing List Shipping Docs (Format B)
+    "B": {
+        "Sold To": re.compile(r"Customer\s+(?:Company\s*)?(.*?)(?:\n[^\S\n]*\n|$)", re.DOTALL | re.IGNORECASE),
+        "Sold To Code": re.compile(r"Code[:\s]+(.+?)(?:\n|$)"),
+        "Incoterms": re.compile(r"Incoterms[:\s]+(.+?)(?:\n|$)"),
+        "Payment Terms": re.compile(r"Payment\s*terms[:\s]+(.+?)(?:\n|$)", re.IGNORECASE),
+        "O/Order number": re.compile(r"(?<!\d)(\d+\s*/\s*\d+\s*/\s*\d+)"),
+        "Shipment Date": re.compile(r"(?<!\d)(\d+\s*/\s*\d+\s*/\s*\d+)\s+(\d+\s+\w+\s+\d+)"),
+        "Order Number": re.compile(r"(?<!\S)(\S+?)\s*\.?\s*PO\s+(\d+)", re.IGNORECASE),
+        "Order Net quantity": re.compile(r"(?<!\d)(\d+(?:\.\d*)?\s+[A-Z]+)"),
+        "Quantity Price Amount": re.compile(r"(?<!\d)(\d+(?:\.\d+)?\s*KG)\s+(\d+(?:\.\d+)?)\s+([\d,]+(?:\.\d*)?)"),
+        "Sales Line": re.compile(r'Sales number:\s*(.+?)(?=Tax|\n|$)', re.IGNORECASE),
+        "Sales Description Code": re.compile(r'^(.+?)\s+([A-Z0-9][\w\-]*[A-Z0-9])$', re.IGNORECASE),
+        "Product Description": re.compile(
+            r'Sales number:.*?Tax.*?(?:\n\s*\n|\n)(.*?)(?=\n\s*Packed:|\n\s*\||$)',
+            re.IGNORECASE | re.MULTILINE | re.DOTALL
+        ),
+        "Bank Name": re.compile(r"BANK NAME:\s*\n([^\n]+)", re.IGNORECASE),
+        "Bank Address": re.compile(r"BANK NAME:[\s\S]*?\n[^\n]+\n([^\n]+)\n([^\n]+)\n([^\n]+)", re.IGNORECASE),
+        "Bank Section": re.compile(
+            r"\b([A-Z][^\n]*Bank)\s*\n"  # Bank name - must start with capital letter, end with "Bank"
+            r"([^\n]+)\s*\n"              # Line 1: Trade Operations Dept.
+            r"([^\n]+)\s*\n"              # Line 2: No 65C, Dharmapala Mawatha,
+            r"([^\n]+)\s*\n"              # Line 3: Colombo 7
+            r"([^\n]+)",                  # Line 4: Sri Lanka
+            re.IGNORECASE
+        ),
+        "Contact": re.compile(r"(?:Contact:|Attn:)\s*(.+?)(?:\n|$)", re.IGNORECASE),
+        "Attn Prefix": re.compile(r"^Attn:\s*", re.IGNORECASE),
+        "Email": re.compile(r"(?<![\w.-])([\w\.-]+@[\w\.-]+\.\w+)"),
+        "Cell Phone": re.compile(r"(?:Cell Phone[:\s]*|(?<=\n))(\+?\d[\d\s]{10,}\d)", re.MULTILINE),
+        "Net Weight (Kg)": re.compile(r"Total net weight:\s*([\d,.]+)\s*KG", re.IGNORECASE),
+        "Currency": re.compile(r"Amount\s*\n\s*([A-Z]{3})\b"),
+        "Order Value": re.compile(r"Sub Total\s*([\d,.]+)"),
+        "Total Value": re.compile(r"Total Amount\s*USD\s*([\d,.]+)"),
+        "Transport Mode": re.compile(r"Mode of transport[:\s]*(.+?)(?=\s*\n|$)", re.IGNORECASE),
+        "Material Number": re.compile(r"Material numbers.*?=\s*(\d+)"),
+        "Specification Number": re.compile(r"Specification number.*?=\s*(\d+)"),
+    },
+
+    # Order Confirmation (Format C)
+    "C": {
+        "Order Number": re.compile(r"Order\s+(?:number|No)[:\s]+(.+?)\s+-?\s*PO\s+(\d+)", re.IGNORECASE),
+        "Sold To": re.compile(r"Customer\s+(?:Company\s*)?(.*?)(?:\n[^\S\n]*\n|$)", re.DOTALL | re.IGNORECASE),
+        "Sold To Code": re.compile(r"Code[:\s]+([\d/-]+)"),
+        "Transport Mode": re.compile(r"Mode of Transport[:\s]+(.+?)(?:\n|$)"),
+        "Incoterms": re.compile(r"Incoterms[:\s]+(.+?)(?:\n|$)"),
+        "Currency": re.compile(r"Total Amount\s+([A-Z]{3})"),
+        "Payment Terms": re.compile(r"Payment Terms[:\s]+(.+?)(?:\n|$)"),
+        "Description Non-ASCII": re.compile(r'[^\x00-\x7F]+'),
+        "Whitespace": re.compile(r'\s+'),
+        "Sales Number": re.compile(r"Sales number[:\s]+(.+?)(?:\n|$)", re.IGNORECASE),
+        "Product Description": re.compile(r"Sales number[:\s].*?\n(.*?)(?=\nIncoterms:)", re.IGNORECASE | re.DOTALL),
+        "Description Code": re.compile(r"KG\s+[\d.]+\s+[\d,.]+\s*\n(.+?)\s+([A-Z0-9]+)\s*\nIncoterms:", re.IGNORECASE),
+        "Net Weight (Kg)": re.compile(r"Total net weight[:\s]+([\d,.]+)\s*KG", re.IGNORECASE),
+        "Price / Unit": re.compile(r"(?<!\d)(\d+\.\d{4})"),
+        "Order Value": re.compile(r"(\d{1,3}(?:,\d{3})*\.\d{2})\b"),
+        "Total Value": re.compile(r"Total Amount USD[:\s]+([\d,.]+)", re.IGNORECASE),
+        "Bank Name": re.compile(r"BANK NAME:\s*\n([^\n]+)", re.IGNORECASE),
+        "Bank Address": re.compile(r"BANK NAME:[\s\S]*?\n[^\n]+\n([^\n]+)\n([^\n]+)\n([^\n]+)", re.IGNORECASE),
+        "Bank Section": re.compile(
+            r"\b([A-Z][^\n]*Bank)\s*\n"  # Bank name - must start with capital letter, end with "Bank"
+            r"([^\n]+)\s*\n"              # Line 1: Trade Operations Dept.
+            r"([^\n]+)\s*\n"              # Line 2: No 65C, Dharmapala Mawatha,
+            r"([^\n]+)\s*\n"              # Line 3: Colombo 7
+            r"([^\n]+)",                  # Line 4: Sri Lanka
+            re.IGNORECASE
+        ),
+        "Contact": re.compile(r"(?:Contact[:\s]+|^)(Attn:\s*.*?)(?:\n|$)", re.IGNORECASE | re.MULTILINE),
+        "Attn Prefix": re.compile(r"^Attn:\s*", re.IGNORECASE),
+        "Attn Line": re.compile(r"^Attn:\s*(.*)$", re.MULTILINE | re.IGNORECASE),
+        "Email": re.compile(r"(?<![A-Za-z0-9._%+-])([A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,})", re.IGNORECASE),
+        "Cell Phone": re.compile(r"Cell Phone[:\s]+(.+?)(?:\n|$)"),
+        "Phone Number": re.compile(r"(\+?\d{4}\s?\d{9}|\d{4}\s?\d{9})"),
+    },
+
+    # PROFORMA INVOICE (Excel) (Format D)
+    "D": {
+        "Order Number": re.compile(r"Order No\s+([^\s-]+(?:\s*-\s*[^\s-]+)*?)\s*-?\s*PO\s+(\d+)"),
+        "Order Type": re.compile(r"Order Type:\s*(.+)\s+Customer Ref"),
+        "Sold To": re.compile(r"Sold To:\s*(.+?)(?=\s+Transport Mode:)", re.S),
+        "Sold To Code": re.compile(r"Sold To Code\s+(\d+)"),
+        "Transport Mode": re.compile(r"Transport Mode:\s*(.+)"),
+        "Incoterms": re.compile(r"Incoterm:\s*(.+)"),
+        "Currency": re.compile(r"Currency:\s*(.+)"),
+        "Payment Terms": re.compile(r"Payment:\s*(.+)"),
+        "Line Item": re.compile(r"ETA Destination\s*\n(.*)", re.S),
+        "Total Value": re.compile(r"Total Value\s+([\d.,]+)"),
+        "Bank Name": re.compile(r"Name:\s*(.+)\s+Packing List"),
+        "Bank Address": re.compile(r"Address:\s*(.*?)\s*City:", re.S),
+        "All Caps Words": re.compile(r"\b[A-Z]{2,}(?:\s+[A-Z]{2,})*\b"),
+        "Repeated Spaces": re.compile(r"\s{2,}"),
+        "Space Before Comma": re.compile(r"\s+,"),
+        "Bank City": re.compile(r"City:\s*(.+)\s"),
+        "Contact": re.compile(r"Contact:\s*(.+)\s"),
+        "Email": re.compile(r"Email:\s*(.+)\s"),
+        "Cell Phone": re.compile(r"Cell Phone\s*(.+)\s"),
+    },
+
+    # COA (Format E)
+    "E": {
+        "Product": re.compile(
+            r"Certificate of Analysis\s+([A-Z0-9-]+)\s+([^\n]+?)\s+Order Information", re.IGNORECASE | re.DOTALL
+        ),
+        "Customer Reference": re.compile(
+            r"Customer Reference\s+([A-Z0-9]+(?:-[A-Z0-9]+)*)\s*-?\s*PO\s*(\d+)", re.IGNORECASE
+        ),
+        "Material Number": re.compile(r"Material number\s*=\s*(\d+)"),
+        "Specification Number": re.compile(r"Specification number\s*=\s*(\d+)"),
+        "Net Weight (Kg)": re.compile(r"Quantity\s*([\d,]+\.\d+)\s*KG", re.IGNORECASE),
+    },
+
+    # Packing List (Format F)
+    "F": {
+        "Customer Ref": re.compile(
+            r"Customer Ref\.\s*:\s*([A-Z0-9]+(?:-[A-Z0-9]+)*)\s*-?\s*PO\s+(\d+)", re.IGNORECASE
+        ),
+        "Sold To Code": re.compile(r"Consignee:\s*Code:\s*(\d+)"),
+        "Sold To": re.compile(r"Consignee:.*?Company\s*(.+?)\s*Customer Ref\.", re.DOTALL),
+        "Incoterms": re.compile(r"Incoterms[:\s]+(.+?)(?:\n|$)"),
+        "Transport Mode": re.compile(r"Mode of transport[:\s]+(.*?)(?=\s+Import licence|$)"),
+        "Net Weight (Kg)": re.compile(
+            r"(?:Total:\s*\d+\s*Packages\s+|Sales number:.*?\s[\d,]+\.\d{3}\s*KG\s+)([\d,]+\.\d{3})"
+        ),
+    },
+}
+
+# Literals a match cannot do without, for patterns whose lazy span would
+# otherwise run to the end of the text from every start when it is missing
+REQUIRED_LITERALS = {
+    "C": {
+        "Product Description": "\nIncoterms:",
+        "Description Code": "\nIncoterms:",
+    },
+    "D": {
+        "Sold To": "Transport Mode:",
+        "Bank Address": "City:",
+    },
+    "E": {
+        "Product": "Order Information",
+    },
+    "F": {
+        "Sold To": "Customer Ref.",
+    },
+}
+
+# Literals every match has on the line it starts on, for patterns that
+# cannot be anchored on a leading label
+LINE_LITERALS = {
+    "B": {
+        "Bank Section": "Bank",
+        "Email": "@",
+    },
+    "C": {
+        "Bank Section": "Bank",
+        "Email": "@",
+    },
+}
+
+PATTERNS = guard_patterns(PATTERNS, REQUIRED_LITERALS, LINE_LITERALS)
@@ -1,78 +1,87 @@
-import re
+import datetime
+
+from openpyxl import load_workbook
+
+from .fields import DROPPED_HEADERS, LINE_ITEM_HEADERS, SPECS
+
+SPEC = SPECS["D"]
 
 def extract_proforma_invoice(text):
     """Extract data from PROFORMA INVOICE (Excel) (Format D)"""
-    data = {}
+    return SPEC.extract(text)
+
+
+def _cell_text(cell):
+    """Render a cell the way it reads in the sheet (honouring 0.00 / #,##0.00 formats)"""
+    value = cell.value
+    if value is None:
+        return ""
+    if isinstance(value, datetime.datetime):
+        return value.date().isoformat() if value.time() == datetime.time() else value.isoformat()
+    if isinstance(value, datetime.date):
+        return value.isoformat()
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        number_format = getattr(cell, "number_format", None) or "General"
+        if "0" in number_format:
+            section = number_format.split(";")[0]
+            decimals = section.split(".", 1)[1].count("0") if "." in section else 0
+            separator = "," if "," in number_format else ""
+            return f"{value:{separator}.{decimals}f}"
+        if isinstance(value, float) and value.is_integer():
+            return str(int(value))
+    return str(value).strip()
+
+
+def extract_proforma_invoice_xlsx(file):
+    """Extract data from a PROFORMA INVOICE workbook by cell (Format D)
+
+    Streams the active sheet in openpyxl read-only mode. Header and footer
+    rows are joined into tab-separated lines for the label patterns; the
+    line item is read by column from the row under the "ETA Destination"
+    header, and the rest of the item table is skipped without being kept.
+    """
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        sheet = workbook.active
+        lines = []
+        columns = None      # {header: column index} once the table header is seen
+        line_item = None
+        in_table = False
+
+        for cells in sheet.iter_rows():
+            values = [_cell_text(cell) for cell in cells]
+            filled = sum(1 for value in values if value)
+            if not filled:
+                in_table = False
+                continue
+
+            if columns is None and "ETA Destination" in values:
+                columns = {value: i for i, value in enumerate(values) if value}
+                in_table = True
+            elif in_table and (line_item is None or filled * 2 >= len(columns)):
+                # First row under the header is the line item; further item rows are skipped
+                if line_item is None:
+                    line_item = values
+            else:
+                in_table = False
+                lines.append("\t".join(value for value in values if value))
+    finally:
+        workbook.close()
+
+    data = extract_proforma_invoice("\n".join(lines) + "\n")
 
-    # Header details
-    match = re.search(r"Order No\s+([^\s-]+(?:\s*-\s*[^\s-]+)*?)\s*-?\s*PO\s+(\d+)", text)
-    if match:
-        data = {}
-        data["Order Number"] = match.group(1).strip()
-        data["Purchase Order Number"] = match.group(2).strip()
-        print(data)
-    else:
-        data = {}
-        data["Order Number"] = None
-        data["Purchase Order Number"] = None
-        
-    data["Order Type"] = re.search(r"Order Type:\s*(.+)\s+Customer Ref", text)
-    
-    # Sold To & Ship To
-    data["Sold To"] = re.search(r"Sold To:\s*(.+?)(?=\s+Transport Mode:)", text, re.S)
-    
-    data["Sold To Code"] = re.search(r"Sold To Code\s+(\d+)", text)
-    
-    # Transport / Delivery
-    data["Transport Mode"] = re.search(r"Transport Mode:\s*(.+)", text)
-    data["Incoterms"] = re.search(r"Incoterm:\s*(.+)", text)
-    data["Currency"] = re.search(r"Currency:\s*(.+)", text)
-    data["Payment Terms"] = re.search(r"Payment:\s*(.+)", text)
-    
-    # Product line item
-    def extract_value(header, text):
-        pattern = rf"{header}\s+([^\t\n]+)"
-        match = re.search(pattern, text)
-        return match.group(1).strip() if match else None
-    # Extracting each field like your Subtotal example
-    match = re.search(r"ETA Destination\s*\n(.*)", text, re.S)
-    if match:
-        row = match.group(1).strip().split("\t") if "\t" in match.group(1) else match.group(1).strip().split()
-        headers = ["Sales Org","Del Plant","DG Status","Product Description","Form","Pk Size (KG)",
-                   "Product Code","Net Weight (Kg)","Sales Currency","Price / Unit","Sales Incoterm","Order Value",
-                   "Cust. Reference","ETA Destination"]
-        # Map values one by one
-        for i, h in enumerate(headers):
-            if i < len(row):
-                data[h] = row[i]
-    headers_none = ["Sales Org","Del Plant","DG Status","Form","Pk Size (KG)",
-                   "Sales Currency","Sales Incoterm",
-                   "Cust. Reference","ETA Destination"]
-    
-    for h in headers_none:
-        data.pop(h, None)
-    
-    # Totals
-    data["Total Value"] = re.search(r"Total Value\s+([\d.,]+)", text)
-    # Banking & Payment Info
-    data["Bank Name"] =  re.search(r"Name:\s*(.+)\s+Packing List", text)
-    clean_address = None  
-    # Extract raw block between Address and City
-    match = re.search(r"Address:\s*(.*?)\s*City:", text, re.S)
-    if match:
-        raw_address = match.group(1).strip()
-        # Rule 1: Remove any "words in ALL CAPS" 
-        clean_address = re.sub(r"\b[A-Z]{2,}(?:\s+[A-Z]{2,})*\b", "", raw_address)
-        # Rule 2: Remove extra spaces/commas
-        clean_address = re.sub(r"\s{2,}", " ", clean_address).strip()
-        clean_address = re.sub(r"\s+,", ",", clean_address)
-    data["Bank Address"] = clean_address
-    
-    data["Bank City"] =  re.search(r"City:\s*(.+)\s", text)
-    
-    match = re.search(r"Contact:\s*(.+)\s", text)
-    data["Contact"] = match.group(1).replace("Attn:", "").strip() if match else None
-    data["Email"] =  re.search(r"Email:\s*(.+)\s", text)
-    data["Cell Phone"] =  re.search(r"Cell Phone\s*(.+)\s", text)
+    if line_item is not None:
+        for position, h in enumerate(LINE_ITEM_HEADERS):
+            if h in DROPPED_HEADERS:
+                continue
+            # Prefer the column whose header cell names the field; fall back to sheet order
+            i = columns.get(h)
+            if i is None:
+                filled = [value for value in line_item if value]
+                value = filled[position] if position < len(filled) else None
+            else:
+                value = line_item[i] if i < len(line_item) else None
+            if value:
+                data[h] = value
 
-    return data
\ No newline at end of file
+    return data
@@ -0,0 +1,169 @@
+"""
+Typed, compact result records
+
+Each format's fields go into a record class of its own (RecordA ...
+RecordF) with one slot per key its spec can fill, instead of a dict per
+document. Records read and write like a dict keyed by the field names the
+rest of the app uses (record["Net Weight (Kg)"], .get, .items, dict(record)),
+with the same key order for every document, and a key never set (a field
+left out with OMIT) is absent as it would be from a dict.
+
+Values are converted once, as they are set: strings are stripped, regex
+matches are reduced to their text so they cannot keep the document alive,
+and the NUMERIC_KEYS are parsed to Decimal when they hold a plain number
+("12,500.00" -> Decimal("12500.00"); anything else stays a string).
+Values of the SHARED_KEYS (parties, terms, bank details) are interned.
+"""
+
+import re
+import sys
+from collections.abc import MutableMapping
+from decimal import Decimal, InvalidOperation
+
+# Fields holding amounts, prices or weights
+NUMERIC_KEYS = frozenset({
+    "Net Weight (Kg)", "Price / Unit", "Order Value", "Total Value", "Amount",
+})
+
+# Fields with few distinct values across documents (parties, terms, bank
+# details): their strings are interned, so every record holding the same
+# value shares one copy
+SHARED_KEYS = frozenset({
+    "Sold To", "Sold To Code", "Currency", "Payment Terms", "Incoterms", "Transport Mode", "Order Type",
+    "Bank Name", "Bank Address", "Bank City", "Contact", "Email", "Cell Phone",
+})
+
+_NUMBER = re.compile(r"[+-]?(?:\d[\d,]*(?:\.\d*)?|\.\d+)")
+
+
+def to_decimal(value):
+    """Decimal for a plain number such as "1,250.500", else None"""
+    if not _NUMBER.fullmatch(value):
+        return None
+    try:
+        return Decimal(value.replace(",", ""))
+    except InvalidOperation:
+        return None
+
+
+def _convert(key, value):
+    if isinstance(value, str):
+        value = value.strip()
+    elif value is None or isinstance(value, Decimal):
+        return value
+    elif hasattr(value, "group"):
+        # A regex match (re or RE2): group 1 if there is one, else the whole match
+        try:
+            value = value.group(1)
+        except IndexError:
+            value = value.group(0)
+        if value is None:
+            return None
+        value = value.strip()
+    elif isinstance(value, (int, float)) and key in NUMERIC_KEYS:
+        return Decimal(str(value))
+    else:
+        return None
+    if key in NUMERIC_KEYS:
+        number = to_decimal(value)
+        if number is not None:
+            return number
+    elif key in SHARED_KEYS:
+        return sys.intern(value)
+    return value
+
+
+def display(value):
+    """A record value as the text shown for it (Decimals with thousands separators)"""
+    if isinstance(value, Decimal):
+        return f"{value:,f}"
+    return value
+
+
+class Record(MutableMapping):
+    """Base of the per-format record classes built by record_type()"""
+
+    __slots__ = ()
+    format_type = None
+    _attributes = {}    # key -> slot name
+    _fields = ()        # (key, slot name) in key order
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, self._attributes[key])
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __setitem__(self, key, value):
+        setattr(self, self._attributes[key], _convert(key, value))
+
+    def __delitem__(self, key):
+        try:
+            delattr(self, self._attributes[key])
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __iter__(self):
+        for key, name in self._fields:
+            if hasattr(self, name):
+                yield key
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __contains__(self, key):
+        name = self._attributes.get(key)
+        return name is not None and hasattr(self, name)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({dict(self.items())!r})"
+
+    def to_json(self):
+        """A dict of JSON-ready values (Decimals as their plain digits)"""
+        return {key: str(value) if isinstance(value, Decimal) else value for key, value in self.items()}
+
+
+def _attribute(key):
+    """Slot name for a field key: "Price / Unit" -> "price_unit" """
+    return re.sub(r"\W+", "_", key).strip("_").lower()
+
+
+RECORD_TYPES = {}
+
+
+def record_type(format_type, keys):
+    """The record class of a format, created on the first call"""
+    keys = tuple(keys)
+    cls = RECORD_TYPES.get(format_type)
+    if cls is not None:
+        if tuple(key for key, _ in cls._fields) != keys:
+            raise ValueError(f"Format {format_type}: record already defined with other keys")
+        return cls
+
+    fields = tuple((key, _attribute(key)) for key in keys)
+    names = [name for _, name in fields]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Format {format_type}: field keys {keys} collide as attribute names")
+    name = f"Record{format_type}"
+    cls = type(name, (Record,), {
+        "__slots__": tuple(names),
+        "__module__": __name__,
+        "__qualname__": name,
+        "format_type": format_type,
+        "_attributes": dict(fields),
+        "_fields": fields,
+    })
+    # Module-level, so records pickle by name
+    globals()[name] = RECORD_TYPES[format_type] = cls
+    return cls
+
+
+def as_record(format_type, data):
+    """data as the format's record (a record of that format is returned as it is)"""
+    cls = RECORD_TYPES[format_type]
+    if isinstance(data, cls):
+        return data
+    record = cls()
+    for key, value in data.items():
+        record[key] = value
+    return record
@@ -0,0 +1,251 @@
+"""
+Declarative field specs and the engine that runs them
+
+A format's extractor is a list of Field rules (see fields.py): which
+registered pattern to search, which output keys to fill from its groups
+and how to normalise them, and what to do when it finds nothing (report
+the keys as None, leave them out, or fall back on another rule). A rule
+can also carry follow-up rules that run only when it matched, on the
+document or on one of its groups.
+
+compile_spec() resolves a format's rules against its patterns once, at
+import. FormatSpec.extract() then runs them for one document with a single
+DocumentIndex (see index.py) shared by every pattern of the format, so the
+literal scans behind all of its labels are done once per document, and
+fills the format's typed record (records.py).
+"""
+
+from .index import INDEX_MIN_CHARS, document_index
+from .records import record_type
+
+# Marker for Field(missing=OMIT): leave the output keys out when nothing matched
+OMIT = object()
+
+
+# --- Normalizers (str -> str) ---
+def strip(value):
+    return value.strip()
+
+
+def quantity(value):
+    """'1,250.500' -> '1250.5': thousands separators and trailing decimal zeros dropped"""
+    value = value.replace(",", "")
+    if "." in value:
+        value = value.rstrip("0").rstrip(".")
+    return value
+
+
+def drop_commas(value):
+    return value.replace(",", "")
+
+
+def collapse_spaces(value):
+    return " ".join(value.split())
+
+
+def without(regex):
+    """Normalizer removing every match of a compiled pattern"""
+    return lambda value: regex.sub("", value)
+
+
+# --- Group getters (match -> str) ---
+def joined(*groups):
+    """The stripped groups joined by a space, e.g. two address lines"""
+    return lambda match: " ".join(match.group(group).strip() for group in groups)
+
+
+def const(value):
+    def get(match):
+        return value
+    # A key filled with a constant may legitimately stay empty (see FormatSpec.required)
+    get.constant = True
+    return get
+
+
+class Field:
+    """
+    One extraction rule.
+
+    pattern   name of a pattern in the format's registry, or None to reuse
+              the match of the rule this one follows
+    outputs   {key: value}, where value is a group number (its text is
+              stripped), a getter taking the match, or a tuple (group number
+              or getter, *normalizers); or a function of the match returning
+              the {key: value} dict
+    source    a group of the parent match to search instead of the document
+              (same forms as an output value); anchored uses match() there
+    then      rules run after this one matched, with its match as parent
+    otherwise rule run instead when nothing matched
+    missing   when nothing matched and there is no fallback: None sets every
+              output key to None, OMIT leaves them out, a dict is used as is
+    keys      for outputs given as a function, the keys it can fill
+    """
+
+    __slots__ = ("pattern", "outputs", "source", "anchored", "then", "otherwise", "missing", "keys")
+
+    def __init__(self, pattern, outputs, *, source=None, anchored=False, then=(), otherwise=None, missing=None,
+                 keys=()):
+        self.pattern = pattern
+        self.outputs = outputs
+        self.source = source
+        self.anchored = anchored
+        self.then = tuple(then)
+        self.otherwise = otherwise
+        self.missing = missing
+        self.keys = tuple(keys)
+
+
+def _output_keys(field):
+    """Every key a rule and the rules under it can fill, in order (may repeat)"""
+    yield from field.keys if callable(field.outputs) else field.outputs
+    if isinstance(field.missing, dict):
+        yield from field.missing
+    for then in field.then:
+        yield from _output_keys(then)
+    if field.otherwise is not None:
+        yield from _output_keys(field.otherwise)
+
+
+def _optional_keys(field):
+    """Keys a rule and the rules under it may leave out or fill with a constant"""
+    if field.missing is OMIT:
+        yield from field.keys if callable(field.outputs) else field.outputs
+    elif not callable(field.outputs):
+        for key, spec in field.outputs.items():
+            if getattr(spec[0] if isinstance(spec, tuple) else spec, "constant", False):
+                yield key
+    for then in field.then:
+        yield from _optional_keys(then)
+    if field.otherwise is not None:
+        yield from _optional_keys(field.otherwise)
+
+
+def _getter(spec):
+    """Compile an output value spec (other than a bare group number) into a function of the match"""
+    if callable(spec):
+        return spec
+    group, *normalizers = spec
+
+    def get(match):
+        value = match.group(group) if isinstance(group, int) else group(match)
+        for normalize in normalizers:
+            if value is None:
+                break
+            value = normalize(value)
+        return value
+    return get
+
+
+class _Rule:
+    """A Field resolved against a pattern registry"""
+
+    __slots__ = ("search", "outputs", "build", "source", "then", "otherwise", "missing")
+
+
+def _compile(field, patterns, format_type):
+    rule = _Rule()
+    if field.pattern is None:
+        rule.search = None
+    elif field.pattern not in patterns:
+        raise KeyError(f"Format {format_type}: no pattern named {field.pattern!r}")
+    else:
+        pattern = patterns[field.pattern]
+        rule.search = pattern.match if field.anchored else pattern.search
+
+    if callable(field.outputs):
+        if field.missing is None and field.otherwise is None:
+            raise ValueError(f"Format {format_type}: {field.pattern!r} builds its outputs, so say what is missing")
+        rule.build = field.outputs
+        rule.outputs = ()
+    else:
+        rule.build = None
+        # (key, group, None) for a stripped group, (key, None, getter) otherwise
+        rule.outputs = tuple(
+            (key, spec, None) if isinstance(spec, int) else (key, None, _getter(spec))
+            for key, spec in field.outputs.items()
+        )
+
+    if field.source is None:
+        rule.source = None
+    elif isinstance(field.source, int):
+        rule.source = _getter((field.source, strip))
+    else:
+        rule.source = _getter(field.source)
+    rule.then = tuple(_compile(then, patterns, format_type) for then in field.then)
+    rule.otherwise = None if field.otherwise is None else (_compile(field.otherwise, patterns, format_type),)
+    if field.missing is OMIT:
+        rule.missing = {}
+    elif field.missing is None:
+        rule.missing = dict.fromkeys(key for key, _, _ in rule.outputs)
+    else:
+        rule.missing = dict(field.missing)
+    return rule
+
+
+def _apply(rules, text, parent, data):
+    """Run rules in order, filling data; parent is the match they follow, if any"""
+    for rule in rules:
+        if rule.search is None:
+            match = parent
+        elif rule.source is None:
+            match = rule.search(text)
+        else:
+            subject = rule.source(parent)
+            match = rule.search(subject) if subject is not None else None
+
+        if match is None:
+            if rule.otherwise is not None:
+                _apply(rule.otherwise, text, parent, data)
+            elif rule.missing:
+                data.update(rule.missing)
+            continue
+
+        if rule.build is not None:
+            data.update(rule.build(match))
+        for key, group, get in rule.outputs:
+            if get is None:
+                value = match.group(group)
+                data[key] = value.strip() if value is not None else None
+            else:
+                data[key] = get(match)
+        if rule.then:
+            _apply(rule.then, text, match, data)
+
+
+class FormatSpec:
+    """
+    A format's compiled rules; extract() returns the fields of one
+    document as a record (see records.py) of every key it can fill.
+    required lists the keys a complete document always has a value for
+    (not left out or filled with a constant by any rule)
+    """
+
+    __slots__ = ("format_type", "fields", "rules", "keys", "required", "record")
+
+    def __init__(self, format_type, fields, rules):
+        self.format_type = format_type
+        self.fields = fields
+        self.rules = rules
+        self.keys = tuple(dict.fromkeys(key for field in fields for key in _output_keys(field)))
+        optional = {key for field in fields for key in _optional_keys(field)}
+        self.required = tuple(key for key in self.keys if key not in optional)
+        self.record = record_type(format_type, self.keys)
+
+    def extract(self, text):
+        """The format's record, as the extractors return it"""
+        data = self.record()
+        if text and len(text) >= INDEX_MIN_CHARS:
+            with document_index(text):
+                _apply(self.rules, text, None, data)
+        else:
+            _apply(self.rules, text, None, data)
+        return data
+
+
+def compile_spec(format_type, fields, patterns):
+    """
+    Resolve a format's Field list against {name: pattern}; the patterns
+    only need search() and match(), so raw compiled regexes work as well
+    as the guarded registry
+    """
+    return FormatSpec(format_type, tuple(fields), tuple(_compile(field, patterns, format_type) for field in fields))
@@ -0,0 +1,283 @@
+"""
+Background extraction jobs
+
+Process All hands the uploaded documents to a JobQueue instead of
+extracting them on the Streamlit script thread. Jobs are recorded in a
+SQLite database under JOBS_DIR (uploads are spooled next to it until their
+document is done) and run on one bounded pool of JOB_WORKERS threads
+shared by every session of the server process. The app polls a job by the
+id it keeps in the page URL, so a browser refresh picks the job up again.
+
+  * A document whose bytes and format were already extracted by the
+    current extractors (EXTRACTOR_VERSION), in an earlier job or in any
+    earlier session (the results store, store.py), reuses that result
+    instead of being queued again.
+    Documents this process extracts are added to the store; the extraction
+    service (EXTRACTION_SERVICE_URL) adds those it extracts itself.
+  * Documents still queued or running when the process stopped are queued
+    again when the next JobQueue opens the database.
+  * Jobs older than JOBS_KEEP_HOURS are deleted.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from extractors.records import as_record
+from service_client import LocalExtraction, extraction_backend
+from store import EXTRACTOR_VERSION, get_result_store
+from streams import content_digest, iter_chunks
+from tika_client import TikaError
+
+logger = logging.getLogger(__name__)
+
+PENDING = ("queued", "running")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    created REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS documents (
+    job_id TEXT NOT NULL REFERENCES jobs(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    slot TEXT,                  -- document type of the uploader, NULL if classified
+    requested TEXT,             -- format letter asked for, NULL to classify
+    file_name TEXT,
+    digest TEXT NOT NULL,
+    status TEXT NOT NULL,       -- queued, running, done or failed
+    format_type TEXT,
+    confidence REAL,
+    result TEXT,                -- extracted fields as JSON
+    error TEXT,
+    finished REAL,
+    version TEXT,               -- EXTRACTOR_VERSION of the result
+    PRIMARY KEY (job_id, position)
+);
+CREATE INDEX IF NOT EXISTS documents_digest ON documents (digest, status);
+"""
+
+
+class JobQueue:
+    def __init__(self, directory, workers=8, keep_seconds=24 * 3600, store=None):
+        self.directory = directory
+        self.store = store
+        self.uploads = os.path.join(directory, "uploads")
+        self.keep_seconds = keep_seconds
+        self._lock = threading.Lock()
+        os.makedirs(self.uploads, exist_ok=True)
+
+        self._db = sqlite3.connect(os.path.join(directory, "jobs.sqlite"), check_same_thread=False, timeout=30)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA foreign_keys=ON")
+        self._db.executescript(_SCHEMA)
+        columns = {row["name"] for row in self._db.execute("PRAGMA table_info(documents)")}
+        if "version" not in columns:
+            # Databases from before results were versioned; their results are never reused
+            self._db.execute("ALTER TABLE documents ADD COLUMN version TEXT")
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job")
+
+        self._prune()
+        # Left over from a process that stopped before finishing them
+        with self._lock, self._db:
+            self._db.execute("UPDATE documents SET status = 'queued' WHERE status = 'running'")
+            leftover = self._db.execute(
+                "SELECT job_id, position FROM documents WHERE status = 'queued' ORDER BY rowid"
+            ).fetchall()
+        for row in leftover:
+            self._executor.submit(self._run, row["job_id"], row["position"])
+
+    def _upload_path(self, digest):
+        return os.path.join(self.uploads, digest)
+
+    def _spool(self, stream, digest):
+        """Copy an upload to disk (once per content) for a worker to read"""
+        path = self._upload_path(digest)
+        if os.path.exists(path):
+            return
+        partial = f"{path}.{uuid.uuid4().hex}.part"
+        with open(partial, "wb") as out:
+            for chunk in iter_chunks(stream):
+                out.write(chunk)
+        os.replace(partial, path)
+
+    def submit(self, documents):
+        """
+        Queue a job for documents given as (slot, format letter or None to
+        classify, file name, stream); returns its id
+        """
+        documents = [
+            (slot, requested, file_name, stream, content_digest(stream))
+            for slot, requested, file_name, stream in documents
+        ]
+        self._prune()
+        job_id = uuid.uuid4().hex
+        queued = []
+        with self._lock, self._db:
+            self._db.execute("INSERT INTO jobs (id, created) VALUES (?, ?)", (job_id, time.time()))
+            for position, (slot, requested, file_name, stream, digest) in enumerate(documents):
+                done = self._db.execute(
+                    "SELECT format_type, confidence, result FROM documents"
+                    " WHERE digest = ? AND requested IS ? AND status = 'done' AND version = ?"
+                    " ORDER BY finished DESC LIMIT 1",
+                    (digest, requested, EXTRACTOR_VERSION),
+                ).fetchone()
+                if done is None and self.store is not None:
+                    # Only classified results answer a request to classify
+                    stored = self.store.latest(digest, requested, classified=requested is None)
+                    if stored is not None:
+                        done = {
+                            "format_type": stored["format_type"], "confidence": stored["confidence"],
+                            "result": json.dumps(stored["fields"].to_json(), ensure_ascii=False),
+                        }
+                if done is not None:
+                    self._db.execute(
+                        "INSERT INTO documents (job_id, position, slot, requested, file_name, digest, status,"
+                        " format_type, confidence, result, finished, version)"
+                        " VALUES (?, ?, ?, ?, ?, ?, 'done', ?, ?, ?, ?, ?)",
+                        (job_id, position, slot, requested, file_name, digest,
+                         done["format_type"], done["confidence"], done["result"], time.time(), EXTRACTOR_VERSION),
+                    )
+                    continue
+                self._spool(stream, digest)
+                self._db.execute(
+                    "INSERT INTO documents (job_id, position, slot, requested, file_name, digest, status)"
+                    " VALUES (?, ?, ?, ?, ?, ?, 'queued')",
+                    (job_id, position, slot, requested, file_name, digest),
+                )
+                queued.append(position)
+        for position in queued:
+            self._executor.submit(self._run, job_id, position)
+        return job_id
+
+    def _run(self, job_id, position):
+        with self._lock, self._db:
+            row = self._db.execute(
+                "SELECT requested, digest, file_name FROM documents"
+                " WHERE job_id = ? AND position = ? AND status = 'queued'",
+                (job_id, position),
+            ).fetchone()
+            if row is None:
+                return  # job deleted meanwhile
+            self._db.execute(
+                "UPDATE documents SET status = 'running' WHERE job_id = ? AND position = ?", (job_id, position)
+            )
+
+        requested, digest = row["requested"], row["digest"]
+        backend = extraction_backend()
+        values = {"format_type": requested, "confidence": None, "result": None, "error": None}
+        try:
+            with open(self._upload_path(digest), "rb") as file:
+                if requested is None:
+                    values["format_type"], values["confidence"], data = backend.process_unsorted_document(
+                        file, row["file_name"]
+                    )
+                else:
+                    data = backend.process_document(file, requested, row["file_name"])
+            values["result"] = json.dumps(data.to_json(), ensure_ascii=False)
+            status = "done"
+            # The extraction service records what it extracts itself
+            if self.store is not None and backend is LocalExtraction:
+                self.store.record(digest, values["format_type"], data, row["file_name"], values["confidence"], "app")
+        except (TikaError, ValueError, OSError) as e:
+            values["error"] = str(e)
+            status = "failed"
+        except Exception as e:
+            logger.exception("Job %s document %d failed", job_id, position)
+            values["error"] = f"{type(e).__name__}: {e}"
+            status = "failed"
+
+        with self._lock, self._db:
+            self._db.execute(
+                "UPDATE documents SET status = ?, format_type = ?, confidence = ?, result = ?, error = ?,"
+                " finished = ?, version = ? WHERE job_id = ? AND position = ?",
+                (status, values["format_type"], values["confidence"], values["result"], values["error"],
+                 time.time(), EXTRACTOR_VERSION, job_id, position),
+            )
+            self._release(digest)
+
+    def _release(self, digest):
+        """Delete a spooled upload once no pending document needs it (lock held)"""
+        pending = self._db.execute(
+            "SELECT 1 FROM documents WHERE digest = ? AND status IN (?, ?) LIMIT 1", (digest, *PENDING)
+        ).fetchone()
+        if pending is None:
+            try:
+                os.remove(self._upload_path(digest))
+            except FileNotFoundError:
+                pass
+
+    def get(self, job_id):
+        """
+        The job's documents in submission order, as dicts with the columns
+        above and result as the format's record; None for an unknown (or
+        expired) job
+        """
+        with self._lock:
+            if self._db.execute("SELECT 1 FROM jobs WHERE id = ?", (job_id,)).fetchone() is None:
+                return None
+            rows = self._db.execute(
+                "SELECT * FROM documents WHERE job_id = ? ORDER BY position", (job_id,)
+            ).fetchall()
+        documents = []
+        for row in rows:
+            document = dict(row)
+            if document["result"] is not None:
+                document["result"] = as_record(document["format_type"], json.loads(document["result"]))
+            documents.append(document)
+        return documents
+
+    def counts(self, job_id):
+        """{status: documents} for a job, without reading its results; None for an unknown job"""
+        with self._lock:
+            if self._db.execute("SELECT 1 FROM jobs WHERE id = ?", (job_id,)).fetchone() is None:
+                return None
+            return dict(self._db.execute(
+                "SELECT status, COUNT(*) FROM documents WHERE job_id = ? GROUP BY status", (job_id,)
+            ).fetchall())
+
+    def _prune(self):
+        with self._lock, self._db:
+            expired = time.time() - self.keep_seconds
+            digests = [
+                row["digest"] for row in self._db.execute(
+                    "SELECT DISTINCT digest FROM documents WHERE job_id IN (SELECT id FROM jobs WHERE created < ?)",
+                    (expired,),
+                )
+            ]
+            self._db.execute("DELETE FROM jobs WHERE created < ?", (expired,))
+            for digest in digests:
+                self._release(digest)
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._db.close()
+
+
+def queue_from_env():
+    return JobQueue(
+        os.getenv("JOBS_DIR", ".jobs"),
+        workers=int(os.getenv("JOB_WORKERS", "8")),
+        keep_seconds=float(os.getenv("JOBS_KEEP_HOURS", "24")) * 3600,
+        store=get_result_store(),
+    )
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_job_queue():
+    """Return the process-wide JobQueue, creating it on first use"""
+    global _queue
+
+    with _queue_lock:
+        if _queue is None:
+            _queue = queue_from_env()
+        return _queue
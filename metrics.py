@@ -0,0 +1,311 @@
+"""
+Pipeline timing and size metrics
+
+Every pipeline stage (text extraction, regex extraction, table
+rendering) records its latency and the bytes it handled into histograms
+labelled by stage and format; regex extraction also records the time
+spent on each field, and page-limited text extraction (see
+text_backends.py) the parsing time it saved or wasted. The numbers can be
+read out as
+
+  * Prometheus text exposition: render_prometheus(), or an HTTP /metrics
+    endpoint on METRICS_PORT (see serve());
+  * JSON lines, one per finished stage or field, appended to the file
+    named by METRICS_JSONL;
+  * quantile estimates per stage and format (summary()), e.g. p50/p99.
+
+Histograms are per process; worker processes can ship theirs to the
+parent with snapshot() and merge(). METRICS_FIELDS=0 turns the per-field
+timings off.
+"""
+
+import bisect
+import contextlib
+import http.server
+import json
+import os
+import threading
+import time
+
+# Histogram names
+STAGE_SECONDS = "extraction_stage_seconds"
+STAGE_BYTES = "extraction_stage_bytes"
+FIELD_SECONDS = "extraction_field_seconds"
+TEXT_SAVED_SECONDS = "extraction_text_saved_seconds"
+TEXT_WASTED_SECONDS = "extraction_text_wasted_seconds"
+TEXT_PAGES_SKIPPED = "extraction_text_pages_skipped"
+
+# 10 µs (single regex fields) to 60 s (Tika on a large scan)
+SECONDS_BUCKETS = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+    0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+# 1 KiB to 64 MiB
+BYTES_BUCKETS = tuple(1024 * 4 ** i for i in range(9))
+PAGES_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+# name -> (help text, bucket upper bounds)
+METRICS = {
+    STAGE_SECONDS: ("Latency of a pipeline stage per document", SECONDS_BUCKETS),
+    STAGE_BYTES: ("Bytes handled by a pipeline stage per document", BYTES_BUCKETS),
+    FIELD_SECONDS: ("Regex time per extracted field", SECONDS_BUCKETS),
+    TEXT_SAVED_SECONDS: ("Estimated parsing time saved per document read only up to its page limit", SECONDS_BUCKETS),
+    TEXT_WASTED_SECONDS: ("Page-limited read thrown away before reading the whole document", SECONDS_BUCKETS),
+    TEXT_PAGES_SKIPPED: ("Pages not parsed per document read only up to its page limit", PAGES_BUCKETS),
+}
+
+FIELD_TIMINGS = os.getenv("METRICS_FIELDS", "1") != "0"
+JSONL_PATH = os.getenv("METRICS_JSONL") or None
+
+
+class Histogram:
+    """Counts per bucket (not cumulative; +Inf is the last slot), sum and count"""
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q):
+        """
+        Estimate of the q-quantile, interpolated within its bucket the way
+        Prometheus' histogram_quantile does; None when empty
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                if i == len(self.bounds):
+                    return self.bounds[-1]
+                lower = self.bounds[i - 1] if i else 0.0
+                return lower + (self.bounds[i] - lower) * (rank - seen) / count
+            seen += count
+        return self.bounds[-1]
+
+
+_histograms = {}
+_lock = threading.Lock()
+
+
+def _labels_key(labels):
+    return tuple(sorted((name, str(value)) for name, value in labels.items() if value is not None))
+
+
+def _histogram(key):
+    """The histogram for (name, labels key); call with _lock held"""
+    histogram = _histograms.get(key)
+    if histogram is None:
+        histogram = _histograms[key] = Histogram(METRICS[key[0]][1])
+    return histogram
+
+
+def observe(name, value, **labels):
+    """Add one observation to the named histogram (labels with value None are left out)"""
+    key = (name, _labels_key(labels))
+    with _lock:
+        _histogram(key).observe(value)
+
+
+# --- JSON lines ---
+_jsonl_fd = None
+
+
+def log_event(event):
+    """Append one JSON line to METRICS_JSONL (a no-op when it is unset)"""
+    global _jsonl_fd
+    if JSONL_PATH is None:
+        return
+    line = (json.dumps({"ts": round(time.time(), 6), **event}, ensure_ascii=False) + "\n").encode("utf-8")
+    with _lock:
+        if _jsonl_fd is None:
+            _jsonl_fd = os.open(JSONL_PATH, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        # One write per line on an O_APPEND descriptor, so lines from
+        # several worker processes do not interleave
+        os.write(_jsonl_fd, line)
+
+
+# --- Stage timing ---
+class StageTiming:
+    """Yielded by stage(); set .bytes when the size is only known at the end"""
+
+    __slots__ = ("bytes",)
+
+    def __init__(self, size=None):
+        self.bytes = size
+
+
+@contextlib.contextmanager
+def stage(name, format_type=None, size=None):
+    """
+    Time a pipeline stage for one document and record its latency and
+    size, also when it raises (the JSON line then carries the error type)
+    """
+    timing = StageTiming(size)
+    start = time.perf_counter()
+    error = None
+    try:
+        yield timing
+    except Exception as e:
+        error = type(e).__name__
+        raise
+    finally:
+        seconds = time.perf_counter() - start
+        observe(STAGE_SECONDS, seconds, stage=name, format=format_type)
+        if timing.bytes is not None:
+            observe(STAGE_BYTES, timing.bytes, stage=name, format=format_type)
+        event = {"stage": name, "format": format_type, "seconds": round(seconds, 6), "bytes": timing.bytes}
+        if error:
+            event["error"] = error
+        log_event(event)
+
+
+def observe_fields(format_type, field_seconds):
+    """Record per-field regex time ({field: seconds}, as collected by the document budget)"""
+    # Guarded patterns name their fields "<format>/<field>"
+    fields = [(field.split("/", 1)[-1], seconds) for field, seconds in field_seconds.items()]
+    with _lock:
+        for field, seconds in fields:
+            _histogram((FIELD_SECONDS, _labels_key({"field": field, "format": format_type}))).observe(seconds)
+    if JSONL_PATH is not None:
+        for field, seconds in fields:
+            log_event({"stage": "field", "format": format_type, "field": field, "seconds": round(seconds, 6)})
+
+
+def text_bytes(text):
+    """UTF-8 size of a text without encoding it when it is plain ASCII"""
+    if not text:
+        return 0
+    return len(text) if text.isascii() else len(text.encode("utf-8"))
+
+
+# --- Read-out ---
+def _escape_label(value):
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels, extra=()):
+    pairs = [*labels, *extra]
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape_label(value)}"' for name, value in pairs) + "}"
+
+
+def _format_number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render_prometheus():
+    """All histograms in the Prometheus text exposition format"""
+    with _lock:
+        items = sorted(
+            (key, list(h.counts), h.sum, h.count, h.bounds) for key, h in _histograms.items()
+        )
+    lines = []
+    current = None
+    for (name, labels), counts, total, count, bounds in items:
+        if name != current:
+            current = name
+            lines.append(f"# HELP {name} {METRICS[name][0]}")
+            lines.append(f"# TYPE {name} histogram")
+        cumulative = 0
+        for bound, bucket_count in zip((*bounds, "+Inf"), counts):
+            cumulative += bucket_count
+            le = bound if bound == "+Inf" else _format_number(bound)
+            lines.append(f"{name}_bucket{_format_labels(labels, [('le', le)])} {cumulative}")
+        lines.append(f"{name}_sum{_format_labels(labels)} {_format_number(total)}")
+        lines.append(f"{name}_count{_format_labels(labels)} {count}")
+    return "\n".join(lines) + "\n" if lines else ""
+
+
+def summary(name=STAGE_SECONDS, quantiles=(0.5, 0.99)):
+    """
+    One row per label set of a histogram: its labels, count, mean and the
+    estimated quantiles (keys "p50", "p99", ...)
+    """
+    with _lock:
+        items = sorted((labels, h) for (metric, labels), h in _histograms.items() if metric == name)
+    rows = []
+    for labels, histogram in items:
+        row = dict(labels)
+        row["count"] = histogram.count
+        row["mean"] = histogram.sum / histogram.count if histogram.count else None
+        for q in quantiles:
+            row[f"p{q * 100:g}"] = histogram.quantile(q)
+        rows.append(row)
+    return rows
+
+
+def totals(name):
+    """(observations, sum) of a histogram over all of its label sets"""
+    with _lock:
+        histograms = [h for (metric, _), h in _histograms.items() if metric == name]
+        return sum(h.count for h in histograms), sum(h.sum for h in histograms)
+
+
+def snapshot():
+    """Picklable copy of every histogram, for merge() in another process"""
+    with _lock:
+        return {key: (list(h.counts), h.sum, h.count) for key, h in _histograms.items()}
+
+
+def merge(snapshot):
+    """Add a snapshot() taken elsewhere (e.g. in a worker process) to this process's histograms"""
+    with _lock:
+        for (name, labels), (counts, total, count) in snapshot.items():
+            histogram = _histogram((name, labels))
+            histogram.counts = [a + b for a, b in zip(histogram.counts, counts)]
+            histogram.sum += total
+            histogram.count += count
+
+
+def reset():
+    with _lock:
+        _histograms.clear()
+
+
+# --- /metrics endpoint ---
+class _MetricsHandler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_server = None
+
+
+def serve(port=None):
+    """
+    Serve /metrics on a background thread (once per process; later calls
+    are no-ops). The port defaults to METRICS_PORT; returns False when
+    neither is set
+    """
+    global _server
+    port = port or os.getenv("METRICS_PORT")
+    if not port:
+        return False
+    with _lock:
+        if _server is None:
+            _server = http.server.ThreadingHTTPServer(("0.0.0.0", int(port)), _MetricsHandler)
+            _server.daemon_threads = True
+            threading.Thread(target=_server.serve_forever, name="metrics-http", daemon=True).start()
+    return True
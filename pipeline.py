@@ -0,0 +1,133 @@
+"""
+Document processing pipeline shared by the Streamlit app and headless entry points
+"""
+
+import logging
+
+# Import the extractors
+from extractors import (
+    extract_purchase_order,
+    extract_packing_list,
+    extract_order_confirmation,
+    extract_proforma_invoice,
+    extract_proforma_invoice_xlsx,
+    extract_coa,
+    extract_packing_list_f
+)
+from extractors.fields import SPECS
+from extractors.guard import extract_document
+from extractors.records import as_record
+from classifier import classify
+import metrics
+from streams import stream_size
+from text_backends import extract_text
+
+logger = logging.getLogger(__name__)
+
+# Document type shown in the UI for each format letter
+DOCUMENT_TYPES = {
+    "A": "Purchase Order",
+    "B": "Invoice - Shipping Document",
+    "C": "Order Confirmation",
+    "D": "Proforma Invoice",
+    "E": "Certificate of Analysis",
+    "F": "Packing List",
+}
+
+
+# Extractor for each format letter
+EXTRACTORS = {
+    "A": extract_purchase_order,        # Purchase Order Terms & Conditions   PO
+    "B": extract_packing_list,          # Packing List  Shipping Docs
+    "C": extract_order_confirmation,    # Order Confirmation
+    "D": extract_proforma_invoice,      # PROFORMA INVOICE (Excel)
+    "E": extract_coa,                   # COA
+    "F": extract_packing_list_f,        # Packing List
+}
+
+
+def fields_filled(text, format_type):
+    """
+    Whether the text gives the format every field its spec requires
+    (page-limited text is only used when it does)
+    """
+    data, _ = extract_document(EXTRACTORS[format_type], text)
+    return all(data.get(key) not in (None, "") for key in SPECS[format_type].required)
+
+
+def classified_and_filled(text):
+    format_type, _ = classify(text)
+    return format_type is not None and fields_filled(text, format_type)
+
+
+def extract_items(text, format_type):
+    """
+    Main extraction function that routes to appropriate extractor
+    """
+    extractor = EXTRACTORS.get(format_type)
+    with metrics.stage("extract", format_type, metrics.text_bytes(text)):
+        if extractor is None:
+            return {}
+        data, budget = extract_document(extractor, text, time_fields=metrics.FIELD_TIMINGS)
+    if budget.timeouts:
+        logger.warning(
+            "Format %s: regex budget exceeded, reporting as missing: %s",
+            format_type, ", ".join(budget.timeouts)
+        )
+    if budget.field_seconds:
+        metrics.observe_fields(format_type, budget.field_seconds)
+
+    # Extractors fill their format's typed record already (see extractors/records.py)
+    return as_record(format_type, data)
+
+# -------------------
+# Text extraction
+# -------------------
+def extract_text_from_file(file, format_type=None, complete=None):
+    # Local PDF text layer or the shared Tika client, per TEXT_BACKENDS in .env.
+    # The file object itself is passed down so uploads are streamed, not copied.
+    # complete(text) lets long PDFs be read only up to their page limit.
+    with metrics.stage("text", format_type or "unknown", stream_size(file)):
+        return extract_text(file, format_type, complete=complete)
+
+
+def is_xlsx(file):
+    """Peek at the upload: XLSX workbooks are zip archives"""
+    position = file.tell()
+    signature = file.read(4)
+    file.seek(position)
+    return signature == b"PK\x03\x04"
+
+
+def extract_xlsx(file):
+    """Read a Proforma Invoice workbook"""
+    with metrics.stage("xlsx", "D", stream_size(file)):
+        return as_record("D", extract_proforma_invoice_xlsx(file))
+
+
+def process_document(file, format_type):
+    """
+    Extract text and run the matching extractor (safe to run in a worker thread)
+    """
+    # Proforma workbooks are read cell by cell instead of going through Tika
+    if format_type == "D" and is_xlsx(file):
+        return extract_xlsx(file)
+
+    text = extract_text_from_file(file, format_type, complete=lambda text: fields_filled(text, format_type))
+    return extract_items(text, format_type)
+
+
+def process_unsorted_document(file):
+    """
+    Classify a document of unknown format, then extract it like
+    process_document; returns (format_type, confidence, data)
+    """
+    # Proforma Invoices are the only workbooks the app takes
+    if is_xlsx(file):
+        return "D", 1.0, extract_xlsx(file)
+
+    text = extract_text_from_file(file, complete=classified_and_filled)
+    format_type, confidence = classify(text)
+    if format_type is None:
+        raise ValueError(f"could not tell the document format (confidence {confidence:.2f})")
+    return format_type, confidence, extract_items(text, format_type)
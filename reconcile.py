@@ -0,0 +1,319 @@
+"""
+Cross-document reconciliation
+
+Checks every field of a shipment's documents against the Proforma
+Invoice, or the Purchase Order where the PI has no value, the same rule
+the comparison table shows, for one shipment or thousands at once. The
+values of all shipments are gathered into one long array, normalised per
+kind of field (each distinct value once), scattered into a wide array
+with one row per (shipment, field) and one column per document, and
+compared column-wise with numpy:
+
+  number    amounts, prices, weights (NUMERIC_KEYS): the number without
+            thousands separators or trailing zeros, so "1,000.00", "1000"
+            and Decimal("1000.0") agree
+  code      order, product, material and phone numbers: letters and
+            digits only, upper case ("4500-123 456" == "4500123456")
+  currency  ISO code, with the common symbols mapped ("US$" == "usd")
+  text      everything else: whitespace collapsed, case folded
+
+Statuses are REFERENCE (the reference column's own value), MATCH,
+MISMATCH and EMPTY (no value). The renderer and the shipment overview only
+display them.
+
+A single shipment's table is checked by shipment_statuses(), the same
+rules without the arrays: for a few dozen cells their set-up costs far
+more than the comparisons.
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+from extractors.records import NUMERIC_KEYS
+
+# Columns every other column is checked against, in order of preference
+REFERENCE_DOCUMENT = "Proforma Invoice"
+SECONDARY_DOCUMENT = "Purchase Order"
+
+# Cell statuses
+REFERENCE = "reference"
+MATCH = "match"
+MISMATCH = "mismatch"
+EMPTY = ""
+
+# Field kinds, by how their values are normalised before comparing
+NUMBER, CODE, CURRENCY, TEXT = "number", "code", "currency", "text"
+
+FIELD_KINDS = {key: NUMBER for key in NUMERIC_KEYS}
+FIELD_KINDS.update({
+    key: CODE for key in (
+        "Order Number", "Purchase Order Number", "Sold To Code", "Product Code",
+        "Material Number", "Specification Number", "Cell Phone",
+    )
+})
+FIELD_KINDS["Currency"] = CURRENCY
+
+CURRENCY_ALIASES = {"$": "USD", "US$": "USD", "USD$": "USD", "€": "EUR", "£": "GBP", "¥": "JPY", "RS": "LKR"}
+
+
+_space = re.compile(r"\s+")
+_not_code = re.compile(r"[\W_]+")
+_number = re.compile(r"[+-]?(?:\d[\d,]*(?:\.\d*)?|\.\d+)")
+
+
+# -------------------
+# Normalisers (str -> str)
+# -------------------
+def normalize_text(value):
+    return _space.sub(" ", value).strip().casefold()
+
+
+def normalize_code(value):
+    return _not_code.sub("", value).upper()
+
+
+def normalize_currency(value):
+    code = _space.sub("", value).upper()
+    return CURRENCY_ALIASES.get(code, code)
+
+
+def normalize_number(value):
+    """The first number in the value, in a canonical form; text without one is compared as text"""
+    match = _number.search(value)
+    if match is None:
+        return normalize_text(value)
+    whole, _, fraction = match.group().replace(",", "").partition(".")
+    whole, fraction = whole.lstrip("0") or "0", fraction.rstrip("0")
+    return f"{whole}.{fraction}" if fraction else whole
+
+
+NORMALIZERS = {
+    NUMBER: normalize_number,
+    CODE: normalize_code,
+    CURRENCY: normalize_currency,
+    TEXT: normalize_text,
+}
+
+
+class Reconciliation:
+    """
+    One row per (shipment, field) with a value, one column per document:
+    the values as extracted, as compared (normalized; None where empty) and
+    their statuses, as numpy object arrays and, on demand, DataFrames
+    """
+
+    __slots__ = ("shipments", "fields", "documents", "rows", "_values", "_normalized", "_status")
+
+    def __init__(self, shipments, fields, documents, rows, values, normalized, status):
+        self.shipments = shipments      # shipment keys, in order
+        self.fields = fields            # field names, in order
+        self.documents = documents      # column names
+        self.rows = rows                # (shipment index, field index) per row, sorted
+        self._values = values
+        self._normalized = normalized
+        self._status = status
+
+    def _frame(self, array):
+        index = pd.MultiIndex.from_arrays(
+            [np.asarray(self.shipments, dtype=object)[self.rows[:, 0]],
+             np.asarray(self.fields, dtype=object)[self.rows[:, 1]]],
+            names=["shipment", "field"],
+        )
+        return pd.DataFrame(array, index=index, columns=pd.Index(self.documents, dtype=object, name="document"))
+
+    @property
+    def values(self):
+        return self._frame(self._values)
+
+    @property
+    def normalized(self):
+        return self._frame(self._normalized)
+
+    @property
+    def status(self):
+        return self._frame(self._status)
+
+    def statuses(self, shipment=None):
+        """{field: [status per document]} for one shipment (the first by default)"""
+        if not len(self.rows):
+            return {}
+        number = 0 if shipment is None else self.shipments.index(shipment)
+        selected = self.rows[:, 0] == number
+        return dict(zip(
+            (self.fields[field] for field in self.rows[selected, 1]),
+            self._status[selected].tolist(),
+        ))
+
+    def mismatches(self):
+        """{shipment: [fields with a mismatch]} in field order, for shipments that have any"""
+        result = {}
+        for shipment, field in self.rows[(self._status == MISMATCH).any(axis=1)].tolist():
+            result.setdefault(self.shipments[shipment], []).append(self.fields[field])
+        return result
+
+    def summary(self):
+        """One row per shipment: documents with values, fields compared and fields that disagree"""
+        shipments = self.rows[:, 0]
+        count = len(self.shipments)
+        documents = np.zeros((count, len(self.documents)), dtype=bool)
+        np.logical_or.at(documents, shipments, self._status != EMPTY)
+        return pd.DataFrame({
+            "documents": documents.sum(axis=1),
+            "fields": np.bincount(shipments, minlength=count),
+            "mismatches": np.bincount(shipments, weights=(self._status == MISMATCH).any(axis=1),
+                                      minlength=count).astype(int),
+        }, index=pd.Index(self.shipments, dtype=object, name="shipment"))
+
+    def cells(self):
+        """(shipment, field, document, value, normalized, status) per filled cell, row by row"""
+        for row, (shipment, field) in enumerate(self.rows.tolist()):
+            shipment, field = self.shipments[shipment], self.fields[field]
+            for column, status in enumerate(self._status[row].tolist()):
+                if status != EMPTY:
+                    yield (shipment, field, self.documents[column],
+                           self._values[row, column], self._normalized[row, column], status)
+
+
+def normalize(fields, values):
+    """
+    Normalised text for values (stringified) of the given fields, per field
+    kind; each distinct value is normalised once, as parties, terms and
+    agreeing columns repeat the same values many times over
+    """
+    text = np.empty(len(values), dtype=object)
+    text[:] = list(map(str, values))
+    kinds = pd.Series(fields, dtype=object).map(FIELD_KINDS).fillna(TEXT).to_numpy()
+    normalized = np.empty(len(text), dtype=object)
+    for kind, normalizer in NORMALIZERS.items():
+        selected = kinds == kind
+        if selected.any():
+            codes, distinct = pd.factorize(text[selected])
+            distinct_normalized = np.empty(len(distinct), dtype=object)
+            distinct_normalized[:] = list(map(normalizer, distinct))
+            normalized[selected] = distinct_normalized[codes]
+    return normalized
+
+
+def reconcile(shipments, documents=None, fields=None, reference=REFERENCE_DOCUMENT, secondary=SECONDARY_DOCUMENT):
+    """
+    Reconcile {shipment: {document: record or dict}}. documents orders the
+    columns (by default as they first appear); fields limits and orders the
+    rows (by default every field present, as it first appears)
+    """
+    if documents is None:
+        documents = list(dict.fromkeys(document for results in shipments.values() for document in results))
+    columns = {document: number for number, document in enumerate(documents)}
+
+    # Long form: the filled (field, value) items of every document, with
+    # their shipment and document numbers repeated per item
+    items, owners, counts = [], [], []
+    for shipment, results in enumerate(shipments.values()):
+        for document, data in results.items():
+            column = columns.get(document)
+            if column is None or not data:
+                continue
+            filled = [item for item in data.items() if item[1] is not None and item[1] != ""]
+            items += filled
+            owners.append((shipment, column))
+            counts.append(len(filled))
+    cell_fields = [field for field, _ in items]
+    values = [value for _, value in items]
+    owners = np.array(owners, dtype=np.int64).reshape(-1, 2).repeat(counts, axis=0)
+
+    # Field numbers in the given order, or in order of first appearance
+    fields = list(dict.fromkeys(cell_fields if fields is None else fields))
+    cell_numbers = pd.Index(fields, dtype=object).get_indexer(cell_fields) if items else np.empty(0, dtype=np.int64)
+    if (cell_numbers < 0).any():
+        kept = cell_numbers >= 0
+        cell_fields = [field for field, keep in zip(cell_fields, kept) if keep]
+        values = [value for value, keep in zip(values, kept) if keep]
+        owners, cell_numbers = owners[kept], cell_numbers[kept]
+    cell_columns = owners[:, 1]
+
+    # Rows are the (shipment, field) pairs with a value, in shipment then field order
+    width = max(len(fields), 1)
+    row_keys, row_of_cell = np.unique(owners[:, 0] * width + cell_numbers, return_inverse=True)
+    rows = np.column_stack((row_keys // width, row_keys % width))
+    shape = (len(rows), len(documents))
+    wide_values = np.full(shape, None, dtype=object)
+    compared = np.full(shape, None, dtype=object)
+    if values:
+        cells = np.empty(len(values), dtype=object)
+        cells[:] = values
+        wide_values[row_of_cell, cell_columns] = cells
+        compared[row_of_cell, cell_columns] = normalize(cell_fields, values)
+
+    filled = np.zeros(shape, dtype=bool)
+    filled[row_of_cell, cell_columns] = True
+
+    def column(document):
+        number = columns.get(document)
+        if number is None:
+            return None, np.full(len(rows), None, dtype=object), np.zeros(len(rows), dtype=bool)
+        return number, compared[:, number], filled[:, number]
+
+    reference_column, reference_values, reference_filled = column(reference)
+    secondary_column, secondary_values, secondary_filled = column(secondary)
+    basis = np.where(reference_filled, reference_values, secondary_values)
+    basis_filled = reference_filled | secondary_filled
+
+    crossed = filled & basis_filled[:, None] & (compared != basis[:, None])
+    if secondary_column is not None:
+        # The Purchase Order is only held against the Proforma Invoice
+        crossed[:, secondary_column] = secondary_filled & reference_filled & (secondary_values != reference_values)
+
+    status = np.full(shape, EMPTY, dtype=object)
+    status[filled] = MATCH
+    status[crossed] = MISMATCH
+    if reference_column is not None:
+        status[reference_filled, reference_column] = REFERENCE
+
+    return Reconciliation(list(shipments), fields, list(documents), rows,
+                          wide_values, compared, status)
+
+
+def shipment_statuses(results, documents, fields, reference=REFERENCE_DOCUMENT, secondary=SECONDARY_DOCUMENT):
+    """
+    {field: [status per document]} for one shipment's {document: record},
+    for the given fields that have a value: reconcile({"": results},
+    documents, fields).statuses() without the arrays
+    """
+    docs = [results.get(document) or {} for document in documents]
+    reference = documents.index(reference) if reference in documents else None
+    secondary = documents.index(secondary) if secondary in documents else None
+    normalized = {}     # (field kind, value) -> normalised text, as columns repeat values
+    statuses = {}
+    for field in fields:
+        values = [doc.get(field) for doc in docs]
+        if all(value is None or value == "" for value in values):
+            continue
+        kind = FIELD_KINDS.get(field, TEXT)
+        compared = []
+        for value in values:
+            if value is None or value == "":
+                compared.append(None)
+                continue
+            text = str(value)
+            key = (kind, text)
+            if key not in normalized:
+                normalized[key] = NORMALIZERS[kind](text)
+            compared.append(normalized[key])
+
+        reference_value = compared[reference] if reference is not None else None
+        secondary_value = compared[secondary] if secondary is not None else None
+        basis = reference_value if reference_value is not None else secondary_value
+        row = []
+        for number, value in enumerate(compared):
+            if value is None:
+                row.append(EMPTY)
+            elif number == reference:
+                row.append(REFERENCE)
+            elif number == secondary:
+                # The Purchase Order is only held against the Proforma Invoice
+                row.append(MISMATCH if reference_value is not None and value != reference_value else MATCH)
+            else:
+                row.append(MISMATCH if basis is not None and value != basis else MATCH)
+        statuses[field] = row
+    return statuses
@@ -0,0 +1,177 @@
+"""
+HTML renderer for the results comparison table
+
+The table is one header row plus one HTML table per field category; every
+document column gets a tick or a cross from reconcile.py, which compares
+it against the Proforma Invoice (or the Purchase Order when the PI has no
+value) after normalising the values. The renderer only displays them.
+
+Markup is assembled from precomputed fragments with str.join; the status
+icons and all styling live in static/results_table.css, read once at import
+and sent once per page run, so a cell is a few dozen bytes. Rendered tables
+are cached by a hash of the results, so a Streamlit rerun with the same
+results costs one hash and a dict lookup.
+"""
+
+import collections
+import hashlib
+from html import escape
+import os
+import pickle
+import threading
+
+from extractors.records import display
+from reconcile import EMPTY, MATCH, MISMATCH, REFERENCE, reconcile, shipment_statuses
+
+# Field rows of the table, grouped into collapsible categories
+FIELD_CATEGORIES = {
+    "🛒 Order Details": [
+        "Order Number", "Order Type", "Purchase Order Number", "Price / Unit",
+        "Order Value", "Customer Reference", "Product Description", "Product Code",
+        "Material Number", "Specification Number", "Net Weight (Kg)", "Sold To", "Sold To Code", "Total Value"
+    ],
+    "🚢 Commercial & Shipping Details": [
+        "Currency", "Payment Terms", "Incoterms", "Transport Mode"
+    ],
+    "🏦 Bank Details": [
+        "Bank Name", "Bank Address", "Bank City", "Contact", "Cell Phone", "Email"
+    ],
+}
+
+# (results key, header cell HTML) per document column, in table order
+COLUMNS = (
+    ("Proforma Invoice", "💰 Proforma Invoice<br>(PI)"),
+    ("Order Confirmation", "📝 Order Confirmation<br>(OC)"),
+    ("Purchase Order", "📑 Purchase Order<br>(PO)"),
+    ("Invoice - Shipping Document", "📦 Invoice"),
+    ("Certificate of Analysis", "📑 Certificate of Analysis<br>(COA)"),
+    ("Packing List", "📦 Packing List<br>(PL)"),
+)
+
+# Rendered tables kept in memory, least recently used dropped first
+RENDER_CACHE_ENTRIES = 32
+
+with open(os.path.join(os.path.dirname(__file__), "static", "results_table.css"), encoding="utf-8") as f:
+    TABLE_STYLE = f"<style>\n{f.read()}</style>"
+
+# --- Precomputed fragments ---
+# The icons themselves are drawn by the stylesheet (.status-icon.tick etc.)
+_CELL_OPEN = '<td><div class="data-cell"><span class="text-content">'
+_REFERENCE_CLOSE = '</span><span class="status-icon reference-tick"></span></div></td>'
+_TICK_CLOSE = '</span><span class="status-icon tick"></span></div></td>'
+_CROSS_CLOSE = '</span><span class="status-icon cross"></span></div></td>'
+_EMPTY_CELL = "<td>-</td>"
+_CLOSES = {REFERENCE: _REFERENCE_CLOSE, MATCH: _TICK_CLOSE, MISMATCH: _CROSS_CLOSE}
+
+
+def _container(columns, body):
+    return f'<div class="table-container" style="--columns: {len(columns)}">{body}</div>'
+
+
+def render_header(columns=COLUMNS):
+    """Sticky header row naming the document columns"""
+    cells = "".join(f"<th>{label}</th>" for _, label in columns)
+    return _container(
+        columns,
+        f'<div class="main-header"><table class="main-header-table"><tr><th>Data Field</th>{cells}</tr></table></div>',
+    )
+
+
+def _row(field, values, statuses, escaped):
+    """
+    One table row; values are the column values for the field and statuses
+    their reconcile statuses. escaped memoises html.escape over the render,
+    since agreeing columns repeat the same values
+    """
+    parts = [f'<tr><td class="field-column">{field}</td>']
+    for value, status in zip(values, statuses):
+        if status == EMPTY:
+            parts.append(_EMPTY_CELL)
+            continue
+        if not isinstance(value, str):
+            # Record numbers (Decimal) are shown with thousands separators
+            text = escape(display(value), quote=False)
+        else:
+            text = escaped.get(value)
+            if text is None:
+                text = escaped[value] = escape(value, quote=False)
+        parts.append(f"{_CELL_OPEN}{text}{_CLOSES[status]}")
+    parts.append("</tr>")
+    return "".join(parts)
+
+
+def render_category(fields, results, statuses, columns=COLUMNS, escaped=None):
+    """
+    Table of the given fields, or None when no document has any of them;
+    statuses is {field: [status per column]} (Reconciliation.statuses) for
+    the fields with a value, every other row is shown empty
+    """
+    present = set()
+    for data in results.values():
+        present.update(data)
+    rows = [field for field in fields if field in present]
+    if not rows:
+        return None
+
+    docs = [results.get(key) or {} for key, _ in columns]
+    empty = [EMPTY] * len(columns)
+    escaped = {} if escaped is None else escaped
+    body = "".join(
+        _row(field, [doc.get(field) for doc in docs], statuses.get(field, empty), escaped) for field in rows
+    )
+    return _container(columns, f'<table class="comparison-table">{body}</table>')
+
+
+def _table_fields(categories):
+    return list(dict.fromkeys(field for fields in categories.values() for field in fields))
+
+
+def table_reconciliation(shipments, columns=COLUMNS, categories=None):
+    """reconcile() over the table's columns and fields for {shipment: results}, for many shipments"""
+    categories = FIELD_CATEGORIES if categories is None else categories
+    return reconcile(shipments, [key for key, _ in columns], _table_fields(categories))
+
+
+def render_tables(results, columns=COLUMNS, categories=None):
+    """
+    (header HTML, [(category name, table HTML)]) for the results, skipping
+    categories without data
+    """
+    categories = FIELD_CATEGORIES if categories is None else categories
+    statuses = shipment_statuses(results, [key for key, _ in columns], _table_fields(categories))
+    tables = []
+    escaped = {}
+    for category_name, fields in categories.items():
+        table = render_category(fields, results, statuses, columns, escaped=escaped)
+        if table is not None:
+            tables.append((category_name, table))
+    return render_header(columns), tuple(tables)
+
+
+# --- Cache of rendered tables ---
+_cache = collections.OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def results_digest(results, columns=COLUMNS):
+    """
+    SHA-256 of the results and column layout. Pickling is several times
+    cheaper than a sorted JSON dump; equal results built in a different
+    key order only cost a cache miss
+    """
+    return hashlib.sha256(pickle.dumps((results, columns), protocol=pickle.HIGHEST_PROTOCOL)).hexdigest()
+
+
+def cached_tables(results, columns=COLUMNS):
+    """render_tables(), reusing the HTML rendered earlier for equal results"""
+    key = results_digest(results, columns)
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+    rendered = render_tables(results, columns)
+    with _cache_lock:
+        _cache[key] = rendered
+        while len(_cache) > RENDER_CACHE_ENTRIES:
+            _cache.popitem(last=False)
+    return rendered
@@ -0,0 +1,257 @@
+"""
+Extraction REST service
+
+An async HTTP front end to the pipeline the Streamlit app runs (Tika text
+extraction through the pooled client and its cache, then extract_items),
+for other systems and for the app itself (EXTRACTION_SERVICE_URL, see
+service_client.py). Blocking work runs on SERVICE_WORKERS threads; request
+bodies are spooled to a temp file past SERVICE_SPOOL_MB.
+
+  POST /extract?format=C    one document: the file as the request body, or
+                            a multipart form with a "file" part. Without a
+                            format the document is classified first.
+                            -> {"file_name", "format", "document_type",
+                                "confidence", "data"}
+  POST /text?format=C       the document's text (text/plain)
+  POST /batch               multipart form with one part per document,
+                            named by its format letter or type ("auto" to
+                            classify); streams one JSON line per document,
+                            {"index", "file_name", ...} as /extract returns
+                            or {"index", "file_name", "error", "status"},
+                            in the order they finish
+  GET  /health              liveness and the Tika pool's nodes
+  GET  /metrics             stage timings in Prometheus format (metrics.py)
+
+Every extraction is added to the results store (store.py).
+
+Errors are JSON {"error": ...}: 400 for a bad request, 422 when the format
+cannot be told, 502 when Tika fails.
+
+Run:
+    python service.py --port 8000
+    python service.py --port 8000 --workers 4     (uvicorn worker processes)
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from dotenv import load_dotenv
+from starlette.applications import Starlette
+from starlette.datastructures import UploadFile
+from starlette.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from starlette.routing import Route
+
+# Before the modules below, which read their settings when imported
+load_dotenv()
+
+import metrics
+from pipeline import DOCUMENT_TYPES, extract_text_from_file, process_document, process_unsorted_document
+from store import get_result_store
+from streams import content_digest
+from tika_client import TikaError, get_tika_client
+
+WORKERS = int(os.getenv("SERVICE_WORKERS", "16"))
+SPOOL_BYTES = int(float(os.getenv("SERVICE_SPOOL_MB", "8")) * 1024 * 1024)
+MAX_BATCH_FILES = int(os.getenv("SERVICE_MAX_BATCH_FILES", "500"))
+
+_executor = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix="extract")
+
+# Format letters by letter, document type name, or "auto" (classify)
+_FORMATS = {letter.lower(): letter for letter in DOCUMENT_TYPES}
+_FORMATS.update({name.lower(): letter for letter, name in DOCUMENT_TYPES.items()})
+_AUTO = ("", "auto", "file")
+
+
+class BadRequest(Exception):
+    """A request the service cannot act on (answered with 400)"""
+
+
+def parse_format(value):
+    """Format letter for a query value or part name; None to classify"""
+    value = (value or "").strip().lower()
+    if value in _AUTO:
+        return None
+    if value not in _FORMATS:
+        raise BadRequest(f"unknown format {value!r}")
+    return _FORMATS[value]
+
+
+def run_document(stream, format_type, file_name=None):
+    """Extract one document (on the worker pool); the /extract result without file_name"""
+    store = get_result_store()
+    digest = content_digest(stream) if store is not None else None
+    if format_type is None:
+        format_type, confidence, data = process_unsorted_document(stream)
+    else:
+        data = process_document(stream, format_type)
+        confidence = None
+    if store is not None:
+        store.record(digest, format_type, data, file_name, confidence, "service")
+    return {
+        "format": format_type,
+        "document_type": DOCUMENT_TYPES[format_type],
+        "confidence": confidence,
+        "data": data.to_json(),
+    }
+
+
+def _in_thread(fn, *args):
+    return asyncio.get_running_loop().run_in_executor(_executor, fn, *args)
+
+
+def _failure(e):
+    """(status, message) for an exception raised while extracting"""
+    if isinstance(e, BadRequest):
+        return 400, str(e)
+    if isinstance(e, TikaError):
+        return 502, str(e)
+    if isinstance(e, ValueError):
+        return 422, str(e)
+    return 500, f"{type(e).__name__}: {e}"
+
+
+def _error_response(e):
+    status, message = _failure(e)
+    return JSONResponse({"error": message}, status_code=status)
+
+
+@contextlib.asynccontextmanager
+async def _document(request):
+    """(stream, file name) for the document in a request body or its "file" part"""
+    if request.headers.get("content-type", "").startswith("multipart/form-data"):
+        form = await request.form(max_files=1)
+        try:
+            upload = form.get("file")
+            if not isinstance(upload, UploadFile):
+                raise BadRequest("the multipart form needs a 'file' part")
+            yield upload.file, upload.filename
+        finally:
+            await form.close()
+        return
+
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_BYTES)
+    try:
+        async for chunk in request.stream():
+            spool.write(chunk)
+        spool.seek(0)
+        yield spool, request.query_params.get("filename")
+    finally:
+        spool.close()
+
+
+# -------------------
+# Endpoints
+# -------------------
+async def extract(request):
+    try:
+        format_type = parse_format(request.query_params.get("format"))
+        async with _document(request) as (stream, file_name):
+            result = await _in_thread(run_document, stream, format_type, file_name)
+    except Exception as e:
+        return _error_response(e)
+    return JSONResponse({"file_name": file_name, **result})
+
+
+async def text(request):
+    try:
+        format_type = parse_format(request.query_params.get("format"))
+        async with _document(request) as (stream, _):
+            body = await _in_thread(extract_text_from_file, stream, format_type)
+    except Exception as e:
+        return _error_response(e)
+    return PlainTextResponse(body or "")
+
+
+async def batch(request):
+    if not request.headers.get("content-type", "").startswith("multipart/form-data"):
+        return _error_response(BadRequest("send the documents as a multipart form"))
+    form = await request.form(max_files=MAX_BATCH_FILES)
+    try:
+        documents = [
+            (index, upload, parse_format(name))
+            for index, (name, upload) in enumerate(
+                (name, value) for name, value in form.multi_items() if isinstance(value, UploadFile)
+            )
+        ]
+        if not documents:
+            raise BadRequest("no documents in the form")
+    except BadRequest as e:
+        await form.close()
+        return _error_response(e)
+
+    async def one(index, upload, format_type):
+        line = {"index": index, "file_name": upload.filename}
+        try:
+            line.update(await _in_thread(run_document, upload.file, format_type, upload.filename))
+        except Exception as e:
+            line["status"], line["error"] = _failure(e)
+        return line
+
+    async def lines():
+        tasks = [asyncio.ensure_future(one(*document)) for document in documents]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                yield json.dumps(await finished, ensure_ascii=False) + "\n"
+        finally:
+            for task in tasks:
+                task.cancel()
+            await form.close()
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+async def health(request):
+    try:
+        client = await _in_thread(get_tika_client)
+        nodes = client.pool.stats()
+    except TikaError:
+        nodes = None
+    return JSONResponse({"status": "ok", "tika": nodes})
+
+
+async def prometheus(request):
+    return PlainTextResponse(metrics.render_prometheus(), media_type="text/plain; version=0.0.4")
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    # Build the Tika client (and warm its nodes up) before taking requests
+    try:
+        await _in_thread(get_tika_client)
+    except TikaError:
+        pass
+    yield
+    _executor.shutdown(wait=False, cancel_futures=True)
+
+
+app = Starlette(
+    routes=[
+        Route("/extract", extract, methods=["POST"]),
+        Route("/text", text, methods=["POST"]),
+        Route("/batch", batch, methods=["POST"]),
+        Route("/health", health),
+        Route("/metrics", prometheus),
+    ],
+    lifespan=lifespan,
+)
+
+
+def main(argv=None):
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Run the extraction REST service", epilog=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default=os.getenv("SERVICE_HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("SERVICE_PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    args = parser.parse_args(argv)
+    uvicorn.run("service:app" if args.workers > 1 else app, host=args.host, port=args.port, workers=args.workers)
+
+
+if __name__ == "__main__":
+    main()
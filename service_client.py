@@ -0,0 +1,98 @@
+"""
+Client for the extraction REST service (service.py)
+
+With EXTRACTION_SERVICE_URL set, the Streamlit app sends documents to the
+service instead of running Tika and the extractors in its own process;
+extraction_backend() returns whichever applies. Both offer
+process_document() and process_unsorted_document() with the pipeline's
+signatures and errors, plus the document's original file name (file_name),
+which the service records with the result.
+"""
+
+import os
+import threading
+
+import requests
+
+import pipeline
+from extractors.records import as_record
+from tika_client import TikaError
+
+
+class ServiceError(TikaError):
+    """Raised when the extraction service cannot return a result"""
+
+
+class LocalExtraction:
+    """The pipeline in this process"""
+
+    @staticmethod
+    def process_document(file, format_type, file_name=None):
+        return pipeline.process_document(file, format_type)
+
+    @staticmethod
+    def process_unsorted_document(file, file_name=None):
+        return pipeline.process_unsorted_document(file)
+
+
+class ExtractionService:
+    def __init__(self, url, connect_timeout=5.0, read_timeout=300.0):
+        self.url = url.rstrip("/")
+        self.timeout = (connect_timeout, read_timeout)
+        self.session = requests.Session()
+
+    def _extract(self, file, format_type=None, file_name=None):
+        """POST the file's bytes to /extract (the stream is left where it was)"""
+        position = file.tell()
+        params = {"filename": file_name}
+        if format_type:
+            params["format"] = format_type
+        try:
+            response = self.session.post(
+                f"{self.url}/extract",
+                params=params,
+                data=file,
+                headers={"Content-Type": "application/octet-stream"},
+                timeout=self.timeout,
+            )
+        except requests.RequestException as e:
+            raise ServiceError(f"extraction service unreachable: {e}") from e
+        finally:
+            file.seek(position)
+
+        try:
+            body = response.json()
+        except ValueError:
+            body = {}
+        if response.ok:
+            return body
+        message = body.get("error") or f"extraction service answered {response.status_code}"
+        # The same errors the pipeline raises in-process
+        if response.status_code in (400, 422):
+            raise ValueError(message)
+        raise ServiceError(message)
+
+    def process_document(self, file, format_type, file_name=None):
+        return as_record(format_type, self._extract(file, format_type, file_name)["data"])
+
+    def process_unsorted_document(self, file, file_name=None):
+        result = self._extract(file, file_name=file_name)
+        return result["format"], result["confidence"], as_record(result["format"], result["data"])
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def extraction_backend():
+    """The shared ExtractionService when EXTRACTION_SERVICE_URL is set, else LocalExtraction"""
+    global _service
+    url = os.getenv("EXTRACTION_SERVICE_URL")
+    if not url:
+        return LocalExtraction
+    with _service_lock:
+        if _service is None or _service.url != url.rstrip("/"):
+            _service = ExtractionService(
+                url, read_timeout=float(os.getenv("EXTRACTION_SERVICE_TIMEOUT", "300"))
+            )
+        return _service
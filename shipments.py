@@ -0,0 +1,100 @@
+"""
+Shipments: extracted documents grouped by purchase order
+
+In the app's many-shipments mode every upload is classified, and the
+documents that name the same Purchase Order Number (compared without
+spaces or punctuation, case-insensitively) form one shipment, with one
+column per document type as in the single-shipment table. A shipment
+takes one document per type; further ones are listed in its notes.
+Documents without a PO number, or that failed, are kept apart.
+"""
+
+import re
+
+from pipeline import DOCUMENT_TYPES
+from renderer import table_reconciliation
+
+# Short column names for the shipment overview, in renderer column order
+ABBREVIATIONS = {
+    "Proforma Invoice": "PI",
+    "Order Confirmation": "OC",
+    "Purchase Order": "PO",
+    "Invoice - Shipping Document": "INV",
+    "Certificate of Analysis": "COA",
+    "Packing List": "PL",
+}
+
+# Label for documents without a PO number
+UNASSIGNED = "(no PO number)"
+
+
+class Shipment:
+    """One purchase order's documents: {document type: record} and their file names"""
+
+    __slots__ = ("key", "po_number", "results", "files", "notes")
+
+    def __init__(self, key, po_number):
+        self.key = key
+        self.po_number = po_number
+        self.results = {}
+        self.files = {}
+        self.notes = []
+
+    def add(self, doc_type, file_name, data):
+        if doc_type in self.results:
+            self.notes.append(f"extra {ABBREVIATIONS[doc_type]}: {file_name}")
+            return
+        self.results[doc_type] = data
+        self.files[doc_type] = file_name
+
+
+def shipment_key(po_number):
+    """Grouping key for a PO number ("PO 4500-123456" and "po4500123456" agree)"""
+    key = re.sub(r"[\W_]+", "", po_number or "").upper()
+    return key.removeprefix("PO") or None
+
+
+def group_documents(documents):
+    """
+    {key: Shipment} in order of first appearance for finished job documents
+    (see jobs.JobQueue.get), and [(file name, reason)] for those that fit
+    no shipment
+    """
+    shipments = {}
+    unassigned = []
+    for document in documents:
+        file_name = document["file_name"]
+        if document["status"] == "failed":
+            unassigned.append((file_name, document["error"]))
+            continue
+        if document["status"] != "done":
+            continue
+        data = document["result"]
+        po_number = data.get("Purchase Order Number")
+        key = shipment_key(po_number)
+        if key is None:
+            unassigned.append((file_name, f"{DOCUMENT_TYPES[document['format_type']]} without a PO number"))
+            continue
+        shipment = shipments.get(key)
+        if shipment is None:
+            shipment = shipments[key] = Shipment(key, po_number)
+        shipment.add(DOCUMENT_TYPES[document["format_type"]], file_name, data)
+    return shipments, unassigned
+
+
+def overview_rows(shipments):
+    """One row per shipment for the overview grid: documents present and fields that disagree"""
+    # Every shipment reconciled in one pass
+    mismatched = table_reconciliation({key: shipment.results for key, shipment in shipments.items()}).mismatches()
+    rows = []
+    for key, shipment in shipments.items():
+        mismatches = mismatched.get(key, [])
+        row = {"PO Number": shipment.po_number}
+        for doc_type, abbreviation in ABBREVIATIONS.items():
+            row[abbreviation] = doc_type in shipment.results
+        row["Documents"] = len(shipment.results)
+        row["Mismatches"] = len(mismatches)
+        row["Mismatched fields"] = ", ".join(mismatches)
+        row["Notes"] = "; ".join(shipment.notes)
+        rows.append(row)
+    return rows
@@ -0,0 +1,232 @@
+"""
+Local store of every extraction
+
+Finished extractions are kept in a SQLite database (RESULTS_DB, empty to
+turn the store off): the SHA-256 of the document, its format, the
+extractor version, its fields as JSON, the file name, where it was
+extracted (app, batch or service) and when. The Purchase Order Number,
+Order Number and Product Code are kept again in indexed columns,
+normalised as shipments are grouped (letters and digits only, upper case,
+no "PO" prefix on PO numbers), so a history lookup or a duplicate check is
+an index seek however many rows the store holds.
+
+Writes are queued to one writer thread, which commits them in batches of
+up to STORE_BATCH_ROWS rows (or whatever arrived within
+STORE_FLUSH_SECONDS), so the threads extracting documents never wait on
+the database. Queued rows are written before the process exits.
+
+EXTRACTOR_VERSION defaults to a hash of the extractor sources, so a stored
+result is only reused while the code that produced it is unchanged.
+"""
+
+import atexit
+import glob
+import hashlib
+import json
+import logging
+import os
+import queue
+import re
+import sqlite3
+import threading
+import time
+from decimal import Decimal
+
+from extractors.records import as_record
+from shipments import shipment_key
+
+logger = logging.getLogger(__name__)
+
+_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS extractions (
+    id INTEGER PRIMARY KEY,
+    digest TEXT NOT NULL,
+    format_type TEXT NOT NULL,
+    confidence REAL,            -- NULL when the format was given, not classified
+    version TEXT NOT NULL,
+    file_name TEXT,
+    source TEXT,
+    po_key TEXT,
+    order_key TEXT,
+    product_key TEXT,
+    fields TEXT NOT NULL,       -- extracted fields as JSON
+    created REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS extractions_po ON extractions (po_key, created);
+CREATE INDEX IF NOT EXISTS extractions_order ON extractions (order_key, created);
+CREATE INDEX IF NOT EXISTS extractions_product ON extractions (product_key, created);
+CREATE INDEX IF NOT EXISTS extractions_digest ON extractions (digest, version, created);
+"""
+
+_COLUMNS = "id, digest, format_type, confidence, version, file_name, source, fields, created"
+
+
+def _source_version():
+    """Short hash of the code that turns text into fields"""
+    digest = hashlib.sha256()
+    paths = sorted(glob.glob(os.path.join(_ROOT, "extractors", "*.py")))
+    paths += [os.path.join(_ROOT, "pipeline.py"), os.path.join(_ROOT, "classifier.py")]
+    for path in paths:
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:12]
+
+
+EXTRACTOR_VERSION = os.getenv("EXTRACTOR_VERSION") or _source_version()
+
+
+def lookup_key(value):
+    """An Order Number or Product Code as stored for lookups ("ab-12 3" -> "AB123")"""
+    return re.sub(r"[\W_]+", "", value or "").upper() or None
+
+
+def _json_fields(data):
+    if hasattr(data, "to_json"):
+        return data.to_json()
+    return {key: str(value) if isinstance(value, Decimal) else value for key, value in data.items()}
+
+
+class ResultStore:
+    def __init__(self, path, batch_rows=500, flush_seconds=1.0):
+        self.path = path
+        self.batch_rows = batch_rows
+        self.flush_seconds = flush_seconds
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._db = self._connect()
+        self._db.executescript(_SCHEMA)
+        self._queue = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name="result-store", daemon=True)
+        self._writer.start()
+
+    def _connect(self):
+        db = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        db.row_factory = sqlite3.Row
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        return db
+
+    # --- Writing ---
+    def record(self, digest, format_type, data, file_name=None, confidence=None, source=None):
+        """Queue an extraction for the writer thread (returns at once)"""
+        self._queue.put((digest, format_type, data, file_name, confidence, source, time.time()))
+
+    def _row(self, digest, format_type, data, file_name, confidence, source, created):
+        fields = _json_fields(data)
+        return (
+            digest, format_type, confidence, EXTRACTOR_VERSION, file_name, source,
+            shipment_key(fields.get("Purchase Order Number")),
+            lookup_key(fields.get("Order Number")),
+            lookup_key(fields.get("Product Code")),
+            json.dumps(fields, ensure_ascii=False), created,
+        )
+
+    def _write_loop(self):
+        db = self._connect()
+        stop = False
+        while not stop:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_seconds
+            while len(batch) < self.batch_rows and batch[-1] is not None:
+                try:
+                    batch.append(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            if batch[-1] is None:
+                stop = True
+            rows = [item for item in batch if item is not None]
+            try:
+                with db:
+                    db.executemany(
+                        "INSERT INTO extractions (digest, format_type, confidence, version, file_name, source,"
+                        " po_key, order_key, product_key, fields, created) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        [self._row(*item) for item in rows],
+                    )
+            except Exception:
+                logger.exception("Could not store %d extraction(s)", len(rows))
+            for _ in batch:
+                self._queue.task_done()
+        db.close()
+
+    def flush(self):
+        """Wait until every queued extraction is written"""
+        self._queue.join()
+
+    def close(self):
+        if self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join()
+        self._db.close()
+
+    # --- Reading ---
+    def _extractions(self, where, params, limit):
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT {_COLUMNS} FROM extractions WHERE {where} ORDER BY created DESC LIMIT ?", (*params, limit)
+            ).fetchall()
+        extractions = []
+        for row in rows:
+            extraction = dict(row)
+            extraction["fields"] = as_record(extraction["format_type"], json.loads(extraction["fields"]))
+            extractions.append(extraction)
+        return extractions
+
+    def find(self, purchase_order=None, order_number=None, product_code=None, limit=200):
+        """
+        Stored extractions, newest first, with any of the given Purchase Order
+        Number, Order Number or Product Code (compared as stored, see above);
+        dicts of the table's columns with fields as the format's record
+        """
+        conditions, params = [], []
+        for column, key in (
+            ("po_key", shipment_key(purchase_order)),
+            ("order_key", lookup_key(order_number)),
+            ("product_key", lookup_key(product_code)),
+        ):
+            if key is not None:
+                conditions.append(f"{column} = ?")
+                params.append(key)
+        if not conditions:
+            return []
+        return self._extractions(" OR ".join(conditions), params, limit)
+
+    def latest(self, digest, format_type=None, classified=False):
+        """
+        The newest extraction of these bytes by the current extractors (of
+        that format, or only classified ones), or None
+        """
+        where, params = "digest = ? AND version = ?", [digest, EXTRACTOR_VERSION]
+        if format_type is not None:
+            where += " AND format_type = ?"
+            params.append(format_type)
+        if classified:
+            where += " AND confidence IS NOT NULL"
+        extractions = self._extractions(where, params, 1)
+        return extractions[0] if extractions else None
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_result_store():
+    """The process-wide ResultStore, created on first use; None when RESULTS_DB is empty"""
+    global _store
+
+    with _store_lock:
+        if _store is None:
+            path = os.getenv("RESULTS_DB", os.path.join(".results", "results.sqlite"))
+            if not path:
+                return None
+            _store = ResultStore(
+                path,
+                batch_rows=int(os.getenv("STORE_BATCH_ROWS", "500")),
+                flush_seconds=float(os.getenv("STORE_FLUSH_SECONDS", "1")),
+            )
+            atexit.register(_store.close)
+        return _store
@@ -0,0 +1,76 @@
+"""
+Helpers for handling uploaded documents as streams instead of byte copies
+"""
+
+import hashlib
+import io
+import os
+import tempfile
+
+CHUNK_SIZE = 64 * 1024
+
+
+def as_stream(source):
+    """
+    Return a seekable binary stream for bytes or a file-like object
+    (BytesIO over bytes shares the buffer until written to)
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return io.BytesIO(source)
+    return source
+
+
+def peek(stream, size):
+    position = stream.tell()
+    head = stream.read(size)
+    stream.seek(position)
+    return head
+
+
+def stream_size(stream):
+    """Number of bytes from the current position to the end of the stream"""
+    if hasattr(stream, "getbuffer"):
+        with stream.getbuffer() as view:
+            return view.nbytes - stream.tell()
+    try:
+        # fileno() would move a SpooledTemporaryFile still in memory to disk
+        if isinstance(stream, tempfile.SpooledTemporaryFile):
+            raise io.UnsupportedOperation
+        return os.fstat(stream.fileno()).st_size - stream.tell()
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        position = stream.tell()
+        end = stream.seek(0, io.SEEK_END)
+        stream.seek(position)
+        return end - position
+
+
+def iter_chunks(stream, chunk_size=CHUNK_SIZE):
+    """
+    Yield the stream's remaining bytes in chunks without moving its position.
+    In-memory buffers are sliced through a memoryview, so nothing is copied.
+    """
+    position = stream.tell()
+    if hasattr(stream, "getbuffer"):
+        with stream.getbuffer() as view:
+            for start in range(position, view.nbytes, chunk_size):
+                chunk = view[start:start + chunk_size]
+                yield chunk
+                chunk.release()
+        return
+
+    try:
+        while True:
+            chunk = stream.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        stream.seek(position)
+
+
+def content_digest(stream):
+    """SHA-256 hex digest of the stream's remaining bytes (position unchanged)"""
+    digest = hashlib.sha256()
+    for chunk in iter_chunks(stream):
+        digest.update(chunk)
+    return digest.hexdigest()
@@ -0,0 +1,230 @@
+"""
+Pluggable text-extraction backends
+
+"tika"  - the Apache Tika server (handles every file type, including scans)
+"local" - in-process PDF text layer reader (pypdf); no JVM round-trip
+
+Backends are chosen per format with TEXT_BACKENDS, e.g. "A=local,C=local".
+A local backend returns None for anything it cannot read (scanned PDFs,
+spreadsheets, encrypted files) and the document falls back to Tika.
+
+Page limits: the fields are nearly always on the first page or two, so a
+PDF longer than TEXT_PAGE_LIMIT pages (per format with TEXT_PAGE_LIMITS,
+e.g. "E=1,B=3"; 0 reads everything) is first read only that far, when the
+caller passes complete(text) to say whether the text has all its fields:
+
+  * Tika gets a copy of the PDF cut down to its first pages;
+  * the local backend reads page by page and stops at the first page
+    where the text is complete.
+
+When the limited text is not complete, the whole document is read after
+all. The parsing time saved (estimated from the pages skipped) and the
+time thrown away on limited reads that fell short are recorded in
+metrics.py.
+"""
+
+import io
+import os
+import time
+
+import metrics
+from streams import as_stream, peek
+from tika_client import get_tika_client
+
+try:
+    from pypdf import PdfReader, PdfWriter
+    from pypdf.errors import PdfReadError
+except ImportError:  # optional dependency
+    PdfReader = PdfWriter = None
+    PdfReadError = Exception
+
+# Below this many characters per page a PDF is treated as scanned
+MIN_CHARS_PER_PAGE = 20
+
+# Errors pypdf raises on malformed files besides PdfReadError
+_PDF_ERRORS = (PdfReadError, ValueError, KeyError, TypeError)
+
+
+def _is_pdf(stream):
+    return PdfReader is not None and peek(stream, 5) == b"%PDF-"
+
+
+def _record_limited(format_type, backend, seconds, pages_read, pages, complete):
+    """Metrics for one page-limited read (the full read's time is estimated per page)"""
+    format_type = format_type or "unknown"
+    if complete:
+        saved = seconds * (pages / pages_read - 1)
+        metrics.observe(metrics.TEXT_SAVED_SECONDS, saved, format=format_type, backend=backend)
+        metrics.observe(metrics.TEXT_PAGES_SKIPPED, pages - pages_read, format=format_type, backend=backend)
+        metrics.log_event({"stage": "pages", "format": format_type, "backend": backend,
+                           "pages_read": pages_read, "pages": pages, "saved_seconds": round(saved, 6)})
+    else:
+        metrics.observe(metrics.TEXT_WASTED_SECONDS, seconds, format=format_type, backend=backend)
+        metrics.log_event({"stage": "pages", "format": format_type, "backend": backend,
+                           "pages_read": pages_read, "pages": pages, "wasted_seconds": round(seconds, 6)})
+
+
+def first_pages(stream, count):
+    """
+    (PDF bytes of the first count pages, page count of the whole document),
+    or None when the stream is not a readable PDF longer than that
+    """
+    if not _is_pdf(stream):
+        return None
+    position = stream.tell()
+    try:
+        reader = PdfReader(stream)
+        if reader.is_encrypted or len(reader.pages) <= count:
+            return None
+        writer = PdfWriter()
+        for page in reader.pages[:count]:
+            writer.add_page(page)
+        cut = io.BytesIO()
+        writer.write(cut)
+        return cut.getvalue(), len(reader.pages)
+    except _PDF_ERRORS:
+        return None
+    finally:
+        stream.seek(position)
+
+
+class TikaBackend:
+    name = "tika"
+
+    def extract(self, source, pages=0, complete=None, format_type=None):
+        """
+        The document's text; with pages and complete, first from a copy
+        holding only the first pages, and from the whole document when
+        that text is not complete
+        """
+        client = get_tika_client()
+        if pages and complete is not None:
+            stream = as_stream(source)
+            start = time.perf_counter()
+            cut = first_pages(stream, pages)
+            if cut is not None:
+                head, total = cut
+                parse_start = time.perf_counter()
+                text = client.extract_text(head)
+                parse_seconds = time.perf_counter() - parse_start
+                done = complete(text)
+                # Saved: scaled from Tika's time alone; wasted: everything spent here
+                seconds = parse_seconds if done else time.perf_counter() - start
+                _record_limited(format_type, self.name, seconds, pages, total, done)
+                if done:
+                    return text
+            source = stream
+        return client.extract_text(source)
+
+
+class LocalPdfBackend:
+    name = "local"
+
+    def extract(self, source, pages=0, complete=None, format_type=None):
+        """
+        Return the PDF text layer, or None when the file needs Tika
+        (the stream is read in place and left where it was). With pages
+        and complete, stops after the first of those pages where the text
+        so far is complete
+        """
+        stream = as_stream(source)
+        if not _is_pdf(stream):
+            return None
+
+        position = stream.tell()
+        start = time.perf_counter()
+        texts = []
+        try:
+            reader = PdfReader(stream)
+            if reader.is_encrypted:
+                return None
+            total = len(reader.pages)
+            check = pages and complete is not None and total > 1
+            for page in reader.pages:
+                texts.append(page.extract_text() or "")
+                if check and len(texts) <= pages and len(texts) < total:
+                    text = "\n".join(texts)
+                    if len(text.strip()) < MIN_CHARS_PER_PAGE * len(texts):
+                        check = False  # scanned so far; leave it to the full-document test
+                    elif complete(text):
+                        _record_limited(format_type, self.name, time.perf_counter() - start, len(texts), total, True)
+                        return text
+        except _PDF_ERRORS:
+            return None
+        finally:
+            stream.seek(position)
+
+        text = "\n".join(texts)
+        if len(text.strip()) < MIN_CHARS_PER_PAGE * max(len(texts), 1):
+            return None
+        return text
+
+
+BACKENDS = {
+    "tika": TikaBackend(),
+    "local": LocalPdfBackend(),
+}
+
+
+def backends_from_env():
+    """
+    Parse TEXT_BACKENDS ("A=local,B=tika,...") into {format: backend name}
+    """
+    selection = {}
+    for item in os.getenv("TEXT_BACKENDS", "").split(","):
+        if "=" not in item:
+            continue
+        format_type, name = (part.strip() for part in item.split("=", 1))
+        if name in BACKENDS:
+            selection[format_type.upper()] = name
+    return selection
+
+
+def page_limits_from_env():
+    """
+    Parse TEXT_PAGE_LIMITS ("E=1,B=3,...") into {format: pages}; None
+    holds TEXT_PAGE_LIMIT, the limit for the other formats and for
+    documents whose format is not known yet
+    """
+    limits = {None: int(os.getenv("TEXT_PAGE_LIMIT", "2"))}
+    for item in os.getenv("TEXT_PAGE_LIMITS", "").split(","):
+        if "=" not in item:
+            continue
+        format_type, pages = (part.strip() for part in item.split("=", 1))
+        if pages.isdigit():
+            limits[format_type.upper()] = int(pages)
+    return limits
+
+
+_selection = None
+_page_limits = None
+
+
+def backend_for(format_type):
+    global _selection
+    if _selection is None:
+        _selection = backends_from_env()
+    return BACKENDS[_selection.get(format_type, "tika")]
+
+
+def page_limit(format_type):
+    global _page_limits
+    if _page_limits is None:
+        _page_limits = page_limits_from_env()
+    return _page_limits.get(format_type, _page_limits[None])
+
+
+def extract_text(source, format_type=None, backend=None, complete=None):
+    """
+    Extract text with the backend configured for this format, falling back
+    to Tika when the local backend cannot handle the file. With complete
+    (a test of the text), long PDFs are read only up to the format's page
+    limit when that text passes it
+    """
+    chosen = BACKENDS[backend] if backend else backend_for(format_type)
+    pages = page_limit(format_type) if complete is not None else 0
+    if chosen.name != "tika":
+        text = chosen.extract(source, pages, complete, format_type)
+        if text is not None:
+            return text
+    return BACKENDS["tika"].extract(source, pages, complete, format_type)
@@ -0,0 +1,136 @@
+"""
+Content-addressed on-disk cache of Tika text output
+
+Entries are keyed on the SHA-256 of the uploaded bytes plus the Tika
+endpoint and request headers, stored zlib-compressed, and evicted least
+recently used first once the cache grows past its size cap.
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+import zlib
+
+from streams import as_stream, iter_chunks
+
+
+class TikaCache:
+    def __init__(self, directory, max_bytes=256 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(directory, exist_ok=True)
+        self._size = sum(size for _, size, _ in self._entries())
+
+    @staticmethod
+    def make_key(source, url, headers=None):
+        """
+        SHA-256 over the document bytes, the endpoint and the request headers
+        (the document is hashed chunk by chunk without moving its position)
+        """
+        digest = hashlib.sha256()
+        for chunk in iter_chunks(as_stream(source)):
+            digest.update(chunk)
+        digest.update(b"\0" + url.encode("utf-8"))
+        for name, value in sorted((headers or {}).items()):
+            digest.update(f"\0{name.lower()}:{value}".encode("utf-8"))
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + ".z")
+
+    def _entries(self):
+        """
+        Yield (path, size, last_used) for every cached entry
+        """
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.is_file() and entry.name.endswith(".z"):
+                    stat = entry.stat()
+                    yield entry.path, stat.st_size, stat.st_mtime
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                text = zlib.decompress(f.read()).decode("utf-8")
+        except (OSError, zlib.error):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        # Touch the entry so LRU eviction sees it as recently used
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        with self._lock:
+            self.hits += 1
+        return text
+
+    def put(self, key, text):
+        payload = zlib.compress(text.encode("utf-8"), 6)
+        if len(payload) > self.max_bytes:
+            return
+
+        path = self._path(key)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(payload)
+
+        with self._lock:
+            try:
+                self._size -= os.path.getsize(path)
+            except OSError:
+                pass
+            os.replace(tmp_path, path)
+            self._size += len(payload)
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        # Oldest access time first; stop once we are back under the cap
+        for path, size, _ in sorted(self._entries(), key=lambda e: e[2]):
+            if self._size <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                self._size -= size
+            except OSError:
+                pass
+
+    def clear(self):
+        with self._lock:
+            for path, _, _ in list(self._entries()):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            self._size = 0
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size_bytes": self._size,
+                "max_bytes": self.max_bytes,
+            }
+
+
+def cache_from_env():
+    """
+    Build the cache from TIKA_CACHE_* environment variables (None when disabled)
+    """
+    if os.getenv("TIKA_CACHE", "1").lower() in ("0", "false", "no", "off"):
+        return None
+    return TikaCache(
+        os.getenv("TIKA_CACHE_DIR", ".tika_cache"),
+        max_bytes=int(float(os.getenv("TIKA_CACHE_MAX_MB", "256")) * 1024 * 1024),
+    )
@@ -0,0 +1,234 @@
+"""
+Pooled Apache Tika client
+
+One keep-alive requests.Session per process, with connect/read timeouts,
+bounded retries (with backoff) for 5xx responses and dropped connections,
+and a cap on how many requests may be in flight at once.
+
+Documents are streamed to Tika straight from their buffer or file, the
+reply is read incrementally (spilling to a temp file past TIKA_SPILL_MB),
+and a per-process memory budget holds back requests that would not fit.
+
+With several Tika endpoints (see tika_pool.py) each request goes to the
+least busy healthy one and moves on to the next if that one fails; the
+concurrency cap then applies per endpoint.
+"""
+
+import io
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from tika_cache import TikaCache, cache_from_env
+from tika_pool import TikaPool, pool_from_env
+from streams import CHUNK_SIZE, as_stream, stream_size
+
+
+class TikaError(Exception):
+    """Raised when Tika cannot return text for a document"""
+
+
+class MemoryBudget:
+    """
+    Caps the bytes of document data held by in-flight requests in this process
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.in_use = 0
+        self._condition = threading.Condition()
+
+    @contextmanager
+    def reserve(self, nbytes):
+        # A document bigger than the whole budget runs alone
+        nbytes = min(nbytes, self.max_bytes)
+        with self._condition:
+            self._condition.wait_for(lambda: self.in_use + nbytes <= self.max_bytes)
+            self.in_use += nbytes
+        try:
+            yield
+        finally:
+            with self._condition:
+                self.in_use -= nbytes
+                self._condition.notify_all()
+
+
+class TikaClient:
+    def __init__(self, url=None, connect_timeout=5.0, read_timeout=120.0, max_retries=3,
+                 backoff_factor=0.5, max_concurrency=6, cache=None,
+                 memory_budget=512 * 1024 * 1024, spill_bytes=8 * 1024 * 1024, pool=None):
+        if pool is None:
+            if not url:
+                raise TikaError("TIKA_URL is not configured")
+            pool = TikaPool([url])
+
+        self.pool = pool
+        # Cache keys name the endpoints, not the node that happened to answer
+        self.url = ",".join(sorted(node.url for node in pool.nodes))
+        self.timeout = (connect_timeout, read_timeout)
+        self.cache = cache
+        self.memory = MemoryBudget(memory_budget)
+        self.spill_bytes = spill_bytes
+        self._slots = threading.BoundedSemaphore(max_concurrency * len(pool.nodes))
+
+        if len(pool.nodes) > 1:
+            # A failing node is left for the next one rather than retried at length
+            max_retries = min(max_retries, 1)
+        retry = Retry(
+            total=max_retries,
+            connect=max_retries,
+            read=max_retries,
+            status=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(500, 502, 503, 504),
+            allowed_methods=frozenset({"GET", "PUT"}),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=len(pool.nodes),
+            # With nodes ejected, the survivors take all of the slots
+            pool_maxsize=max_concurrency * len(pool.nodes),
+            max_retries=retry,
+        )
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def extract_text(self, source, headers=None):
+        """
+        Stream a document (bytes or binary file object) to Tika and return
+        the plain text (served from the on-disk cache when the same bytes
+        were seen before)
+        """
+        request_headers = {"Accept": "text/plain"}
+        if headers:
+            request_headers.update(headers)
+
+        stream = as_stream(source)
+        start = stream.tell()
+
+        cache_key = None
+        if self.cache is not None:
+            cache_key = TikaCache.make_key(stream, self.url, request_headers)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        # Budget the upload plus roughly as much again for the decoded reply
+        size = stream_size(stream)
+        with self._slots, self.memory.reserve(size * 2):
+            try:
+                text = self._send(stream, start, request_headers)
+            finally:
+                stream.seek(start)
+
+        if cache_key is not None:
+            self.cache.put(cache_key, text)
+        return text
+
+    def _send(self, stream, start, headers):
+        """
+        PUT the document to the pool's least busy node, moving on to the
+        next one when a node fails (connection errors and 5xx replies, after
+        the session's own retries); a 4xx reply is about the document and
+        is not retried elsewhere
+        """
+        tried = []
+        error = None
+        for _ in range(self.pool.attempts()):
+            with self.pool.acquire(exclude=tried) as node:
+                tried.append(node)
+                stream.seek(start)
+                try:
+                    response = self.session.put(
+                        node.url,
+                        headers=headers,
+                        data=stream,
+                        timeout=self.timeout,
+                        stream=True
+                    )
+                    try:
+                        response.raise_for_status()
+                        text = self._read_text(response)
+                    finally:
+                        response.close()
+                except requests.HTTPError as e:
+                    if e.response is not None and e.response.status_code < 500:
+                        self.pool.report(node, ok=True)
+                        raise TikaError(f"Tika request failed: {e}") from e
+                    self.pool.report(node, ok=False)
+                    error = e
+                    continue
+                except requests.RequestException as e:
+                    self.pool.report(node, ok=False)
+                    error = e
+                    continue
+            self.pool.report(node, ok=True)
+            return text
+        raise TikaError(f"Tika request failed: {error}") from error
+
+    def _read_text(self, response):
+        """
+        Read the reply in chunks, spilling to disk past spill_bytes, and decode once
+        """
+        with tempfile.SpooledTemporaryFile(max_size=self.spill_bytes) as spool:
+            for chunk in response.iter_content(CHUNK_SIZE):
+                spool.write(chunk)
+            spool.seek(0)
+            reader = io.TextIOWrapper(spool, encoding=response.encoding or "utf-8", errors="replace", newline="")
+            try:
+                return reader.read()
+            finally:
+                reader.detach()
+
+    def close(self):
+        self.session.close()
+        self.pool.close()
+
+
+# -------------------
+# Shared per-process client
+# -------------------
+_client = None
+_client_pid = None
+_client_lock = threading.Lock()
+
+
+def client_from_env():
+    """
+    Build a TikaClient from TIKA_* environment variables (TIKA_URL may list
+    several endpoints; see tika_pool.py for TIKA_SPAWN and the pool settings)
+    """
+    pool = pool_from_env()
+    if pool is None:
+        raise TikaError("TIKA_URL is not configured")
+    return TikaClient(
+        pool=pool,
+        connect_timeout=float(os.getenv("TIKA_CONNECT_TIMEOUT", "5")),
+        read_timeout=float(os.getenv("TIKA_READ_TIMEOUT", "120")),
+        max_retries=int(os.getenv("TIKA_MAX_RETRIES", "3")),
+        backoff_factor=float(os.getenv("TIKA_RETRY_BACKOFF", "0.5")),
+        max_concurrency=int(os.getenv("TIKA_MAX_CONCURRENCY", "6")),
+        cache=cache_from_env(),
+        memory_budget=int(float(os.getenv("TIKA_MEMORY_BUDGET_MB", "512")) * 1024 * 1024),
+        spill_bytes=int(float(os.getenv("TIKA_SPILL_MB", "8")) * 1024 * 1024),
+    )
+
+
+def get_tika_client():
+    """
+    Return the process-wide TikaClient, creating it on first use
+    (a forked child gets its own client and connection pool)
+    """
+    global _client, _client_pid
+
+    with _client_lock:
+        if _client is None or _client_pid != os.getpid():
+            _client = client_from_env()
+            _client_pid = os.getpid()
+        return _client
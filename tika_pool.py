@@ -0,0 +1,280 @@
+"""
+Pool of Tika server endpoints
+
+TikaClient sends each document to one node of a TikaPool: the healthy node
+with the fewest requests in flight (ties go round-robin). Nodes come from
+TIKA_URL, which may list several endpoints separated by commas, and from
+TIKA_SPAWN=N, which starts N local tika-server JVMs from TIKA_JAR on ports
+TIKA_SPAWN_PORT, TIKA_SPAWN_PORT + 1, ... A port that already answers (say,
+a server another worker process started) is used as it is.
+
+  * Every node gets TIKA_WARMUP_REQUESTS small PDFs when the pool starts,
+    so the first real document does not pay for class loading and JIT
+    compilation.
+  * A node is ejected after TIKA_EJECT_AFTER failed requests in a row or a
+    failed health check (a GET on its URL). With more than one node, a
+    background thread re-checks every TIKA_HEALTH_INTERVAL seconds and
+    brings ejected nodes back once they answer.
+  * When every node is ejected, requests go to all of them again rather
+    than failing outright.
+"""
+
+import atexit
+import logging
+import os
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+
+def _warmup_pdf():
+    """A one-page PDF with a line of text, enough to run Tika's PDF parser"""
+    content = b"BT /F1 12 Tf 72 720 Td (Tika warm-up) Tj ET"
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R"
+        b" /Resources << /Font << /F1 5 0 R >> >> >>",
+        b"<< /Length %d >>\nstream\n%s\nendstream" % (len(content), content),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    pdf = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(pdf))
+        pdf += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(pdf)
+    pdf += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    pdf += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    pdf += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(pdf)
+
+
+WARMUP_DOCUMENT = _warmup_pdf()
+
+
+class TikaNode:
+    """One Tika endpoint and its bookkeeping (guarded by the pool's lock)"""
+
+    def __init__(self, url, process=None):
+        self.url = url
+        self.process = process      # the JVM, when this pool started it
+        self.in_flight = 0
+        self.healthy = True
+        self.failures = 0           # failed requests in a row
+        self.requests = 0
+        self.last_used = 0          # pool sequence number, for round-robin ties
+
+    def stats(self):
+        return {
+            "url": self.url,
+            "healthy": self.healthy,
+            "in_flight": self.in_flight,
+            "requests": self.requests,
+            "failures": self.failures,
+            "spawned": self.process is not None,
+        }
+
+
+class TikaPool:
+    def __init__(self, nodes, eject_after=2, health_interval=10.0, health_timeout=5.0,
+                 warmup_requests=3, warmup_timeout=60.0):
+        if not nodes:
+            raise ValueError("a Tika pool needs at least one endpoint")
+        self.nodes = [node if isinstance(node, TikaNode) else TikaNode(node) for node in nodes]
+        self.eject_after = eject_after
+        self.health_interval = health_interval
+        self.health_timeout = health_timeout
+        self.warmup_requests = warmup_requests
+        self.warmup_timeout = warmup_timeout
+        self._lock = threading.Lock()
+        self._sequence = 0
+        self._stop = threading.Event()
+        self._health_thread = None
+
+    # --- Balancing ---
+    def _pick(self, exclude):
+        candidates = [node for node in self.nodes if node.healthy and node not in exclude]
+        if not candidates:
+            # Everything is ejected (or already tried): better a stale verdict than no answer
+            candidates = [node for node in self.nodes if node not in exclude] or self.nodes
+        return min(candidates, key=lambda node: (node.in_flight, node.last_used))
+
+    @contextmanager
+    def acquire(self, exclude=()):
+        """The node to send the next request to, counted as busy until the block ends"""
+        with self._lock:
+            node = self._pick(exclude)
+            self._sequence += 1
+            node.last_used = self._sequence
+            node.in_flight += 1
+            node.requests += 1
+        try:
+            yield node
+        finally:
+            with self._lock:
+                node.in_flight -= 1
+
+    def attempts(self):
+        """How many nodes a request may try before giving up"""
+        with self._lock:
+            return max(1, sum(1 for node in self.nodes if node.healthy))
+
+    def report(self, node, ok):
+        """Record a request's outcome; enough failures in a row eject the node"""
+        with self._lock:
+            if ok:
+                node.failures = 0
+                return
+            node.failures += 1
+            if node.healthy and node.failures >= self.eject_after and len(self.nodes) > 1:
+                node.healthy = False
+                logger.warning("Tika node %s ejected after %d failed requests", node.url, node.failures)
+
+    # --- Health ---
+    def check(self, node):
+        """GET the node's URL; marks it healthy or ejected and returns which"""
+        try:
+            response = requests.get(node.url, timeout=self.health_timeout)
+            healthy = response.ok
+            response.close()
+        except requests.RequestException:
+            healthy = False
+        with self._lock:
+            if healthy and not node.healthy:
+                logger.info("Tika node %s is back", node.url)
+            elif not healthy and node.healthy:
+                logger.warning("Tika node %s failed its health check", node.url)
+            node.healthy = healthy
+            if healthy:
+                node.failures = 0
+        return healthy
+
+    def _health_loop(self):
+        while not self._stop.wait(self.health_interval):
+            for node in self.nodes:
+                self.check(node)
+
+    def warm_up(self, node):
+        """Send the node a few small PDFs so its parsers are loaded and compiled"""
+        for _ in range(self.warmup_requests):
+            try:
+                response = requests.put(
+                    node.url, data=WARMUP_DOCUMENT, headers={"Accept": "text/plain"},
+                    timeout=(self.health_timeout, self.warmup_timeout),
+                )
+                response.close()
+            except requests.RequestException as e:
+                logger.warning("Tika node %s failed its warm-up: %s", node.url, e)
+                self.report(node, ok=False)
+                return False
+        return True
+
+    def start(self):
+        """Warm every node up (in parallel) and start the health checks"""
+        if self.warmup_requests:
+            with ThreadPoolExecutor(max_workers=len(self.nodes)) as executor:
+                list(executor.map(self.warm_up, self.nodes))
+        if len(self.nodes) > 1 and self.health_interval > 0 and self._health_thread is None:
+            self._health_thread = threading.Thread(target=self._health_loop, name="tika-health", daemon=True)
+            self._health_thread.start()
+        return self
+
+    def stats(self):
+        with self._lock:
+            return [node.stats() for node in self.nodes]
+
+    def close(self):
+        """Stop the health checks and the JVMs this pool started"""
+        self._stop.set()
+        for node in self.nodes:
+            if node.process is not None and node.process.poll() is None:
+                node.process.terminate()
+                try:
+                    node.process.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    node.process.kill()
+
+
+# -------------------
+# Local instances
+# -------------------
+def _answers(url, timeout=2.0):
+    try:
+        response = requests.get(url, timeout=timeout)
+        response.close()
+        return response.ok
+    except requests.RequestException:
+        return False
+
+
+def spawn_nodes(count, jar, host="127.0.0.1", base_port=9998, java="java", timeout=60.0):
+    """
+    TikaNodes for count local tika-server instances on consecutive ports,
+    starting a JVM for each port that does not answer yet and waiting until
+    it does (up to timeout seconds). Nodes whose JVM does not come up are
+    returned ejected, for the health checks to pick up later
+    """
+    nodes = []
+    for port in range(base_port, base_port + count):
+        url = f"http://{host}:{port}/tika"
+        if _answers(url):
+            nodes.append(TikaNode(url))
+            continue
+        process = subprocess.Popen(
+            [java, "-jar", jar, "-p", str(port), "-host", host],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        nodes.append(TikaNode(url, process))
+
+    deadline = time.monotonic() + timeout
+    for node in nodes:
+        if node.process is None:
+            continue
+        while not _answers(node.url):
+            if node.process.poll() is not None:
+                # Lost the port to another process's JVM, or failed to start
+                node.process = None
+                node.healthy = _answers(node.url)
+                break
+            if time.monotonic() > deadline:
+                logger.warning("Tika at %s did not come up within %.0f s", node.url, timeout)
+                node.healthy = False
+                break
+            time.sleep(0.25)
+    return nodes
+
+
+def pool_from_env():
+    """
+    Build (and start) a TikaPool from TIKA_URL and TIKA_SPAWN; None when
+    neither names an endpoint
+    """
+    nodes = [TikaNode(url.strip()) for url in os.getenv("TIKA_URL", "").split(",") if url.strip()]
+    spawn = int(os.getenv("TIKA_SPAWN", "0"))
+    if spawn > 0:
+        nodes += spawn_nodes(
+            spawn,
+            os.getenv("TIKA_JAR", "tika-server.jar"),
+            host=os.getenv("TIKA_SPAWN_HOST", "127.0.0.1"),
+            base_port=int(os.getenv("TIKA_SPAWN_PORT", "9998")),
+            java=os.getenv("TIKA_JAVA", "java"),
+            timeout=float(os.getenv("TIKA_SPAWN_TIMEOUT", "60")),
+        )
+    if not nodes:
+        return None
+    pool = TikaPool(
+        nodes,
+        eject_after=int(os.getenv("TIKA_EJECT_AFTER", "2")),
+        health_interval=float(os.getenv("TIKA_HEALTH_INTERVAL", "10")),
+        warmup_requests=int(os.getenv("TIKA_WARMUP_REQUESTS", "3")),
+    )
+    atexit.register(pool.close)
+    return pool.start()
+